@@ -1,19 +1,77 @@
-from flask import Flask, g
-from flask_cors import CORS
+import importlib
+import threading
 
-from lib.db import Db
+# Route modules, each registering its views with load(app)
+ROUTE_MODULES = (
+    'routes.words',
+    'routes.groups',
+    'routes.study_sessions',
+    'routes.dashboard',
+    'routes.study_activities',
+    'routes.health',
+    'routes.jobs',
+    'routes.changes',
+    'routes.events',
+    'routes.metrics',
+    'routes.batch',
+)
 
-import routes.words
-import routes.groups
-import routes.study_sessions
-import routes.dashboard
-import routes.study_activities
+class LazyApp:
+    """WSGI app that creates the real app on its first request.
+
+    Any attribute access (e.g. lazy_app.jobs) creates it too. Until then
+    neither Flask nor the routes and services have been imported.
+    """
+
+    def __init__(self, test_config=None):
+        self.test_config = test_config
+        self._app = None
+        self._lock = threading.Lock()
+
+    @property
+    def app(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = create_app(self.test_config)
+        return self._app
+
+    def __call__(self, environ, start_response):
+        return self.app(environ, start_response)
+
+    def __getattr__(self, name):
+        return getattr(self.app, name)
+
+def create_app(test_config=None, lazy=False):
+    """Create the app, or with lazy=True a LazyApp that creates it on first use."""
+    if lazy:
+        return LazyApp(test_config)
+
+    # Imported here so importing this module (test collection, CLI
+    # commands, WSGI servers before fork) does not load Flask and every
+    # route and service
+    from flask import Flask
+    from flask_cors import CORS
+    from lib.db import Db
+    from lib.vocab import DEFAULT_VOCAB_MMAP_SIZE
+    from lib.jobs import JobRunner, JobScheduler
+    from lib.events import EventBroker, ChangeLogTail
+    from lib.singleflight import SingleFlight
+    from lib.slowlog import SlowRequestSampler
+    from lib.profiler import RequestProfiler
+    from lib.budget import QueryBudgets
+    from lib.ratelimit import RateLimiter
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    from services.group_pack_service import PackCache
+    from services.change_feed_service import ChangeFeedService
+    from services.dashboard_event_service import DashboardEventSource
+    from services.job_handlers import register_default_jobs
 
-def create_app(test_config=None):
     app = Flask(__name__)
     
     # More explicit CORS configuration
     CORS(app, 
+         resources=[r'^/(?!api/admin/).*'],  # Admin endpoints are not for browsers
          origins=["http://localhost:5173"],  # Explicitly allow your React app
          supports_credentials=False,
          methods=["GET", "POST", "OPTIONS"])
@@ -26,7 +84,88 @@ def create_app(test_config=None):
         app.config.update(test_config)
     
     # Initialize database
-    app.db = Db(database=app.config['DATABASE'])
+    # VOCAB_DATABASE splits the read-mostly vocabulary into a file of its
+    # own, attached read-only (see cmd/migrate.py split-vocab)
+    vocab = {
+        'vocab_database': app.config.get('VOCAB_DATABASE'),
+        'vocab_mmap_size': app.config.get('VOCAB_MMAP_SIZE', DEFAULT_VOCAB_MMAP_SIZE),
+        'vocab_immutable': app.config.get('VOCAB_IMMUTABLE', False),
+    }
+    app.db = Db(database=app.config['DATABASE'],
+                pool_size=app.config.get('DB_POOL_SIZE', 0),
+                **vocab)
+
+    # Background jobs; call app.jobs.start() to resume jobs left by a restart
+    app.jobs = JobRunner(app.config['DATABASE'],
+                         max_workers=app.config.get('JOB_WORKERS', 2),
+                         max_pending=app.config.get('JOB_MAX_PENDING', 100),
+                         **vocab)
+    register_default_jobs(app.jobs, export_dir=app.config.get('EXPORT_DIR', 'exports'))
+
+    # Periodic database maintenance; call app.scheduler.start() to run it
+    app.scheduler = JobScheduler(app.jobs)
+    maintenance_interval = app.config.get('MAINTENANCE_INTERVAL', 6 * 3600)
+    if maintenance_interval:
+        app.scheduler.every('maintenance', maintenance_interval)
+    # Keeps the change log behind /api/changes small
+    compact_interval = app.config.get('CHANGES_COMPACT_INTERVAL', 3600)
+    if compact_interval:
+        app.scheduler.every('compact_changes', compact_interval,
+                            {'retention_days': app.config.get('CHANGES_RETENTION_DAYS', 30)})
+
+    # Live updates for /api/events, fanned out to this process's clients
+    app.events = EventBroker(max_queue=app.config.get('EVENTS_MAX_QUEUE', 100),
+                             max_subscribers=app.config.get('EVENTS_MAX_CLIENTS', 100))
+    # Fed from the change log, so writes made by other workers reach them too
+    app.event_tail = ChangeLogTail(app.events, app.db.connect, DashboardEventSource(),
+                                   poll_interval=app.config.get('EVENTS_POLL_INTERVAL', 0.5))
+
+    # Built group packs, rebuilt when the change log shows their words changed
+    app.packs = PackCache(max_entries=app.config.get('PACK_CACHE_SIZE', 64))
+
+    # Coalesce identical concurrent reads; the latest change seq versions them
+    app.singleflight = SingleFlight(version=lambda: ChangeFeedService(app.db).latest_seq())
+
+    # Keep slow requests with their SQL and query plans; None turns it off
+    threshold_ms = app.config.get('SLOW_REQUEST_MS', 500)
+    if threshold_ms is not None:
+        app.slow_requests = SlowRequestSampler(threshold_ms=threshold_ms,
+                                               max_entries=app.config.get('SLOW_REQUEST_MAX', 100),
+                                               log_path=app.config.get('SLOW_REQUEST_LOG'),
+                                               capture_parameters=app.config.get('SLOW_REQUEST_PARAMETERS', False))
+        app.slow_requests.init_app(app)
+
+    # Behind PROXY_COUNT reverse proxies, the client address is taken from
+    # X-Forwarded-For rather than being the proxy's
+    if app.config.get('PROXY_COUNT'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_COUNT'])
+
+    # Token buckets per client for the write endpoints listed (429 beyond them)
+    if app.config.get('RATE_LIMITS'):
+        app.rate_limiter = RateLimiter(limits=app.config['RATE_LIMITS'])
+        app.rate_limiter.init_app(app)
+
+    # Interrupt statements that run longer than their endpoint's budget (503)
+    if app.config.get('QUERY_BUDGET_MS') is not None or app.config.get('QUERY_BUDGETS'):
+        app.query_budgets = QueryBudgets(default_ms=app.config.get('QUERY_BUDGET_MS'),
+                                         budgets=app.config.get('QUERY_BUDGETS'))
+        app.query_budgets.init_app(app)
+
+    # Opt-in cProfile of requests sent with X-Profile: <ADMIN_TOKEN> or sampled at PROFILE_SAMPLE_RATE
+    if app.config.get('PROFILE_DIR'):
+        app.profiler = RequestProfiler(app.config['PROFILE_DIR'],
+                                       sample_rate=app.config.get('PROFILE_SAMPLE_RATE', 0.0),
+                                       max_per_minute=app.config.get('PROFILE_MAX_PER_MINUTE', 6),
+                                       token=app.config.get('ADMIN_TOKEN'))
+        app.profiler.init_app(app)
+
+    # Optional NumPy engine for review statistics on the dashboard
+    if app.config.get('ANALYTICS_ENGINE') == 'numpy':
+        from lib.analytics import ReviewAnalytics
+        app.analytics = ReviewAnalytics()
+
+    # Production entry points flip this once warmup has run
+    app.ready = not app.config.get('WARMUP', False)
 
     # Close database connection
     @app.teardown_appcontext
@@ -34,15 +173,13 @@ def create_app(test_config=None):
         app.db.close()
 
     # load routes -----------
-    routes.words.load(app)
-    routes.groups.load(app)
-    routes.study_sessions.load(app)
-    routes.dashboard.load(app)
-    routes.study_activities.load(app)
+    for module in ROUTE_MODULES:
+        importlib.import_module(module).load(app)
     
     return app
 
-app = create_app()
-
 if __name__ == '__main__':
+    app = create_app()
+    app.jobs.start()
+    app.scheduler.start()
     app.run(debug=True, port=5001)  # debug=True will show detailed errors
\ No newline at end of file
@@ -0,0 +1,122 @@
+import click
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.analytics import ReviewAnalytics
+
+SQL_QUERIES = {
+    'total_words_studied': '''
+        SELECT COUNT(DISTINCT word_id)
+        FROM word_review_items wri
+        JOIN study_sessions ss ON wri.study_session_id = ss.id
+    ''',
+    'mastered_words': '''
+        WITH word_stats AS (
+            SELECT
+                word_id,
+                COUNT(*) as total_attempts,
+                SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as success_rate
+            FROM word_review_items wri
+            JOIN study_sessions ss ON wri.study_session_id = ss.id
+            GROUP BY word_id
+            HAVING total_attempts >= 5
+        )
+        SELECT COUNT(*) FROM word_stats WHERE success_rate >= 0.8
+    ''',
+    'success_rate': '''
+        SELECT SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*)
+        FROM word_review_items wri
+        JOIN study_sessions ss ON wri.study_session_id = ss.id
+    ''',
+}
+
+def populate(conn, rows, words, sessions, chunk=500_000):
+    """Fill a fresh database with random review history"""
+    conn.executescript('''
+        CREATE TABLE study_sessions (id INTEGER PRIMARY KEY, group_id INTEGER, created_at TIMESTAMP);
+        CREATE TABLE word_review_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            study_session_id INTEGER NOT NULL,
+            word_id INTEGER NOT NULL,
+            correct BOOLEAN NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        );
+    ''')
+    rng = np.random.default_rng(0)
+    conn.executemany('INSERT INTO study_sessions (id, group_id, created_at) VALUES (?, ?, ?)',
+                     ((i, i % 50, '2025-01-01') for i in range(1, sessions + 1)))
+    start_day = np.datetime64('2024-01-01')
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        session_ids = np.sort(rng.integers(1, sessions + 1, n))
+        word_ids = rng.integers(1, words + 1, n)
+        correct = rng.random(n) < 0.7
+        days = (start_day + (session_ids * 365 // sessions).astype('timedelta64[D]')).astype(str)
+        conn.executemany(
+            'INSERT INTO word_review_items (study_session_id, word_id, correct, created_at) VALUES (?, ?, ?, ?)',
+            zip(session_ids.tolist(), word_ids.tolist(), correct.tolist(), days.tolist())
+        )
+        conn.commit()
+
+def numpy_summary(conn, analytics):
+    """The dashboard's NumPy path: ids of the sessions the loaded reviews
+    can refer to, then the vectorized summary"""
+    session_ids = [row[0] for row in conn.execute(
+        'SELECT id FROM study_sessions WHERE id BETWEEN ? AND ?', analytics.session_bounds)]
+    return analytics.summary(session_ids=session_ids)
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+@click.command()
+@click.option('--rows', default=10_000_000, show_default=True, help='Review rows to generate')
+@click.option('--words', default=50_000, show_default=True, help='Distinct words')
+@click.option('--sessions', default=200_000, show_default=True, help='Study sessions')
+@click.option('--database', type=click.Path(), help='Reuse (or create) this database file')
+def bench(rows, words, sessions, database):
+    """Compare dashboard review statistics in SQL and in the NumPy engine"""
+    path = Path(database) if database else Path(tempfile.mkdtemp()) / 'bench.db'
+    conn = sqlite3.connect(path)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'word_review_items'").fetchone():
+        click.echo(f"Generating {rows:,} reviews in {path} ...")
+        _, elapsed = timed(lambda: populate(conn, rows, words, sessions))
+        click.echo(f"  done in {elapsed:.1f}s")
+
+    click.echo("\nSQL aggregates:")
+    sql_total = 0
+    sql_results = {}
+    for name, query in SQL_QUERIES.items():
+        sql_results[name], elapsed = timed(lambda: conn.execute(query).fetchone()[0])
+        sql_total += elapsed
+        click.echo(f"  {name:<20} {elapsed * 1000:9.1f} ms")
+    click.echo(f"  {'total':<20} {sql_total * 1000:9.1f} ms")
+
+    analytics = ReviewAnalytics()
+    click.echo("\nNumPy engine:")
+    _, elapsed = timed(lambda: analytics.refresh(conn))
+    click.echo(f"  {'initial load':<20} {elapsed * 1000:9.1f} ms ({analytics.size:,} rows)")
+    summary, elapsed = timed(lambda: numpy_summary(conn, analytics))
+    click.echo(f"  {'summary':<20} {elapsed * 1000:9.1f} ms")
+
+    conn.execute('''
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (1, 1, 1, '2025-01-01')
+    ''')
+    conn.commit()
+    _, elapsed = timed(lambda: analytics.refresh(conn))
+    click.echo(f"  {'incremental refresh':<20} {elapsed * 1000:9.1f} ms")
+
+    click.echo("\nResults match SQL (before the extra review):")
+    for name, value in sql_results.items():
+        click.echo(f"  {name:<20} sql={value} numpy={summary[name]}")
+
+if __name__ == '__main__':
+    bench()
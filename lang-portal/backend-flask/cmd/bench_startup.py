@@ -0,0 +1,75 @@
+import click
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from db.init_db import init_db
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Import + create_app + first request, in milliseconds, in a fresh interpreter
+STARTUP_BUDGET_MS = 1500
+
+# Run in a fresh interpreter so nothing is imported beforehand
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+flask_on_import = 'flask' in sys.modules
+app = app_module.create_app({'DATABASE': sys.argv[1], 'MAINTENANCE_INTERVAL': 0})
+created = time.perf_counter()
+response = app.test_client().get('/api/study-activities')
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'first_request_ms': (finished - created) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'status': response.status_code,
+    'flask_on_import': flask_on_import,
+}))
+'''
+
+def measure_startup(database):
+    """Time one cold start of the app in a new interpreter"""
+    env = {**os.environ, 'PYTHONPATH': str(BACKEND_DIR)}
+    output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, str(database)],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+@click.command()
+@click.option('--runs', default=5, show_default=True, help='Cold starts to time')
+@click.option('--budget-ms', default=STARTUP_BUDGET_MS, show_default=True,
+              help='Fail when the median total exceeds this')
+@click.option('--json', 'as_json', is_flag=True, help='Print the median timings as JSON')
+def bench(runs, budget_ms, as_json):
+    """Time importing the app, creating it and serving its first request"""
+    database = Path(tempfile.mkdtemp()) / 'startup.db'
+    init_db(db_path=database)
+    samples = [measure_startup(database) for _ in range(runs)]
+
+    phases = ('import_ms', 'create_ms', 'first_request_ms', 'total_ms')
+    medians = {phase: round(statistics.median(sample[phase] for sample in samples), 1) for phase in phases}
+    medians['status'] = samples[-1]['status']
+    medians['flask_on_import'] = any(sample['flask_on_import'] for sample in samples)
+
+    if as_json:
+        click.echo(json.dumps(medians))
+    else:
+        click.echo(f"Median of {runs} cold starts:")
+        for phase in phases:
+            click.echo(f"  {phase[:-3]:<15} {medians[phase]:9.1f} ms")
+        click.echo(f"  Flask imported by 'import app': {medians['flask_on_import']}")
+
+    if medians['status'] != 200 or medians['total_ms'] > budget_ms:
+        raise click.ClickException(f"Startup took {medians['total_ms']} ms "
+                                   f"(status {medians['status']}); budget is {budget_ms} ms")
+
+if __name__ == '__main__':
+    bench()
@@ -1,24 +1,41 @@
 import click
 import sqlite3
 from pathlib import Path
+from services.maintenance_service import MaintenanceService, MAINTENANCE_TASKS
 
-@click.command()
-def check_db():
-    """Check database status and contents"""
-    db_path = Path(__file__).parent.parent / 'words.db'
-    if not db_path.exists():
-        click.echo("Database file not found!")
-        return
-    
-    conn = sqlite3.connect(db_path)
+DB_PATH = Path(__file__).parent.parent / 'words.db'
+
+def connect(db_path):
+    if not Path(db_path).exists():
+        raise click.ClickException("Database file not found!")
+    conn = sqlite3.connect(db_path, timeout=30)
     conn.row_factory = sqlite3.Row
+    return conn
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+@click.group(invoke_without_command=True)
+@click.option('--db', 'db_path', default=str(DB_PATH), show_default=True,
+              type=click.Path(dir_okay=False), help="Database file")
+@click.pass_context
+def check_db(ctx, db_path):
+    """Check database status and contents, or run maintenance"""
+    ctx.obj = db_path
+    if ctx.invoked_subcommand is not None:
+        return
+
+    conn = connect(db_path)
     cursor = conn.cursor()
-    
+
     # Check tables
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
     tables = [row['name'] for row in cursor.fetchall()]
     click.echo(f"\nTables found: {', '.join(tables)}")
-    
+
     # Check groups and word counts
     cursor.execute("""
         SELECT g.name, COUNT(w.id) as word_count
@@ -30,11 +47,50 @@ def check_db():
     click.echo("\nWord counts by group:")
     for row in cursor.fetchall():
         click.echo(f"  {row['name']}: {row['word_count']} words")
-    
+
     # Check study activities
     cursor.execute("SELECT name FROM study_activities")
     activities = [row['name'] for row in cursor.fetchall()]
     click.echo(f"\nStudy activities: {', '.join(activities)}")
 
+@check_db.command()
+@click.option('--top', default=20, show_default=True, help="Tables and indexes to list")
+@click.pass_obj
+def size(db_path, top):
+    """Report file, WAL and freelist sizes and the largest tables and indexes"""
+    report = MaintenanceService(connect(db_path)).size_report()
+    page_size = report['page_size']
+
+    click.echo(f"File:      {format_bytes(report['file_bytes'] or 0)} "
+               f"({report['page_count']} pages of {page_size} bytes)")
+    click.echo(f"Free:      {format_bytes(report['freelist_count'] * page_size)} "
+               f"({report['freelist_count']} pages, auto_vacuum {report['auto_vacuum']})")
+    click.echo(f"WAL:       {format_bytes(report['wal_bytes'])} (journal_mode {report['journal_mode']})")
+
+    if report['objects'] is None:
+        click.echo("\nPer-table sizes need SQLite built with dbstat")
+        return
+    click.echo(f"\n{'name':<40} {'type':<6} {'pages':>8} {'size':>10} {'unused':>10}")
+    for obj in report['objects'][:top]:
+        click.echo(f"{obj['name']:<40} {obj['type']:<6} {obj['pages']:>8} "
+                   f"{format_bytes(obj['bytes']):>10} {format_bytes(obj['unused_bytes']):>10}")
+
+@check_db.command()
+@click.option('--task', 'tasks', multiple=True, type=click.Choice(MAINTENANCE_TASKS),
+              help="Task to run (repeatable); all of them by default")
+@click.pass_obj
+def maintain(db_path, tasks):
+    """Run ANALYZE, PRAGMA optimize, a WAL checkpoint and an incremental vacuum"""
+    service = MaintenanceService(connect(db_path))
+    before = service.size_report()
+    results = service.run(list(tasks or MAINTENANCE_TASKS))
+    for task, result in results.items():
+        details = ', '.join(f"{key} {value}" for key, value in result.items() if key != 'seconds')
+        click.echo(f"{task:<11} {result['seconds']:>7.3f}s  {details}")
+
+    after = service.size_report()
+    click.echo(f"\nFile: {format_bytes(before['file_bytes'] or 0)} -> {format_bytes(after['file_bytes'] or 0)}, "
+               f"WAL: {format_bytes(before['wal_bytes'])} -> {format_bytes(after['wal_bytes'])}")
+
 if __name__ == '__main__':
-    check_db() 
\ No newline at end of file
+    check_db()
@@ -1,5 +1,13 @@
 import click
-from db.init_db import init_db, main as seed_db
+from pathlib import Path
+from db.init_db import init_db, split_vocab as split_vocab_db, main as seed_db
+
+DB_PATH = Path(__file__).parent.parent / 'words.db'
+
+# The vocabulary database of the split layout, if the deployment uses one
+vocab_option = click.option('--vocab', 'vocab_path', envvar='VOCAB_DATABASE',
+                            type=click.Path(dir_okay=False),
+                            help="Vocabulary database of the split layout")
 
 @click.group()
 def cli():
@@ -7,14 +15,47 @@ def cli():
     pass
 
 @cli.command()
-def migrate():
+@vocab_option
+def migrate(vocab_path):
     """Run database migrations"""
-    init_db()
+    init_db(vocab_path=vocab_path)
 
 @cli.command()
-def seed():
+@vocab_option
+def seed(vocab_path):
     """Seed database with initial data"""
-    seed_db()
+    seed_db(vocab_path=vocab_path)
+
+@cli.command('split-vocab')
+@click.argument('path', type=click.Path(dir_okay=False))
+def split_vocab(path):
+    """Move words, groups and study activities into a vocabulary database at PATH"""
+    if not DB_PATH.exists():
+        raise click.ClickException("Database file not found!")
+    try:
+        split_vocab_db(DB_PATH, path)
+    except (FileExistsError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Serve it with VOCAB_DATABASE={path}")
+
+@cli.command()
+@click.argument('path', type=click.Path(dir_okay=False))
+def snapshot(path):
+    """Copy the database to PATH while it stays in use"""
+    # Db pulls in Flask; only these commands need it
+    from lib.db import Db
+    if not DB_PATH.exists():
+        raise click.ClickException("Database file not found!")
+    Db(database=str(DB_PATH)).snapshot(path)
+    click.echo(f"Snapshot written to {path}")
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def restore(path):
+    """Replace the database with the snapshot at PATH"""
+    from lib.db import Db
+    Db(database=str(DB_PATH)).restore(path)
+    click.echo(f"Database restored from {path}; restart the server to drop its caches")
 
 if __name__ == '__main__':
-    cli() 
\ No newline at end of file
+    cli()
@@ -1,42 +1,256 @@
 import sqlite3
 import os
+import re
 import json
+import time
+import importlib.util
 from pathlib import Path
+from lib.vocab import VOCAB_TABLES, VOCAB_SCHEMA, attach_vocab
 
-def init_db():
-    """Initialize the database and run migrations"""
-    db_path = Path(__file__).parent.parent / 'words.db'
-    migrations_path = Path(__file__).parent / 'migrations'
-    
-    # Connect to database (creates it if it doesn't exist)
-    conn = sqlite3.connect(db_path)
+# Ids processed per transaction by batched backfill migrations
+DEFAULT_BACKFILL_BATCH_SIZE = 5000
+
+# Word group seeds, as (seed file, group name)
+SEEDS = [
+    ('db/seeds/animals.json', 'Animals'),
+    ('db/seeds/colors.json', 'Colors'),
+    ('db/seeds/numbers.json', 'Numbers'),
+    ('db/seeds/food.json', 'Food'),
+    ('db/seeds/family.json', 'Family')
+]
+
+# CREATE INDEX and CREATE TRIGGER naming their table; the name is
+# qualified for vocabulary tables
+VOCAB_INDEX_PATTERN = re.compile(
+    r'(CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?)(\w+)(\s+ON\s+(\w+))',
+    re.IGNORECASE
+)
+VOCAB_TRIGGER_PATTERN = re.compile(
+    r'(CREATE\s+TRIGGER\s+(?:IF\s+NOT\s+EXISTS\s+)?)(\w+)'
+    r'(\s+(?:(?:BEFORE|AFTER|INSTEAD\s+OF)\s+)?(?:INSERT|DELETE|UPDATE(?:\s+OF\s+\w+(?:\s*,\s*\w+)*)?)\s+ON\s+(\w+))',
+    re.IGNORECASE
+)
+
+# Tables a trigger body writes or reads
+TRIGGER_TABLE_PATTERN = re.compile(r'\b(?:INTO|FROM|UPDATE|JOIN)\s+(\w+)', re.IGNORECASE)
+
+def qualify_vocab_schema(sql):
+    """Create indexes and triggers on vocabulary tables in the vocab schema.
+
+    An unqualified index or trigger name means the main schema, where the
+    split layout has no vocabulary tables; every other statement finds
+    them through the attached schema as it is.
+    """
+    def qualify(match):
+        if match.group(4).lower() not in VOCAB_TABLES:
+            return match.group(0)
+        return f"{match.group(1)}{VOCAB_SCHEMA}.{match.group(2)}{match.group(3)}"
+    return VOCAB_TRIGGER_PATTERN.sub(qualify, VOCAB_INDEX_PATTERN.sub(qualify, sql))
+
+def drop_history_triggers(conn, schema='main'):
+    """Drop the triggers in schema whose body uses tables outside VOCAB_TABLES.
+
+    A trigger cannot reach another database, so in the vocabulary database
+    only triggers that keep vocabulary tables in step (such as the
+    groups.words_count ones) can work; change log and stats triggers
+    cannot.
+    """
+    triggers = conn.execute(f"SELECT name, sql FROM {schema}.sqlite_schema WHERE type = 'trigger'").fetchall()
+    for name, sql in triggers:
+        body = re.split(r'\bBEGIN\b', sql, maxsplit=1, flags=re.IGNORECASE)[-1]
+        tables = {table.lower() for table in TRIGGER_TABLE_PATTERN.findall(body)}
+        if not tables.issubset(VOCAB_TABLES):
+            conn.execute(f'DROP TRIGGER {schema}."{name}"')
+
+def sync_vocab_stats(conn):
+    """Give every word a stats row and drop the rows of deleted words.
+
+    Triggers on words do this in a single database, but cannot reach the
+    stats table from the vocabulary database in the split layout.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR IGNORE INTO word_review_items_stats (word_id, correct_count, wrong_count, last_reviewed)
+        SELECT id, 0, 0, NULL FROM words
+    ''')
+    added = cursor.rowcount
+    cursor.execute('''
+        DELETE FROM word_review_items_stats
+        WHERE word_id NOT IN (SELECT id FROM words)
+    ''')
+    conn.commit()
+    return {'added': added, 'removed': cursor.rowcount}
+
+def connect(db_path, vocab_path=None):
+    """Open a database for migrating or seeding, with its vocabulary attached writable"""
+    conn = sqlite3.connect(db_path, uri=bool(vocab_path) or str(db_path).startswith('file:'))
     conn.row_factory = sqlite3.Row
+    if vocab_path:
+        if not str(vocab_path).startswith('file:') and not Path(vocab_path).exists():
+            conn.close()
+            raise FileNotFoundError(f"Vocabulary database {vocab_path} not found")
+        attach_vocab(conn, vocab_path, readonly=False, mmap_size=0)
+    return conn
+
+def ensure_migrations_table(conn):
+    """Create the migrations table, adding backfill progress columns if missing"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS migrations (
+            filename TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(migrations)')}
+    if 'completed' not in columns:
+        conn.execute('ALTER TABLE migrations ADD COLUMN completed BOOLEAN NOT NULL DEFAULT 1')
+    if 'progress_id' not in columns:
+        conn.execute('ALTER TABLE migrations ADD COLUMN progress_id INTEGER')
+    conn.commit()
+
+def load_backfill(migration_file):
+    """Load a batched backfill migration module.
+
+    A backfill migration is a ``.py`` file in the migrations folder defining:
+
+    - ``TABLE``: table whose integer ``id`` range is walked
+    - ``BACKFILL_SQL``: statement run once per chunk with ``(start_id, end_id)``
+      parameters, covering ``start_id <= id < end_id``
+    - ``SETUP_SQL`` (optional): script run once before the first chunk,
+      e.g. ``ALTER TABLE ... ADD COLUMN``
+    - ``BATCH_SIZE`` (optional): ids per chunk, defaults to 5000
+    - ``PAUSE_SECONDS`` (optional): sleep between chunks to let writers in
+    """
+    spec = importlib.util.spec_from_file_location(f'migration_{migration_file.stem}', migration_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_backfill(conn, migration_file, split=False):
+    """Run a batched backfill migration in short, resumable transactions.
+
+    Each chunk runs in its own transaction together with the progress update
+    in the migrations table, so the write lock is only held for one chunk and
+    an interrupted backfill resumes after the last committed chunk.
+    """
+    backfill = load_backfill(migration_file)
+    batch_size = getattr(backfill, 'BATCH_SIZE', DEFAULT_BACKFILL_BATCH_SIZE)
+    pause_seconds = getattr(backfill, 'PAUSE_SECONDS', 0)
+
+    row = conn.execute('SELECT progress_id FROM migrations WHERE filename = ?',
+                       (migration_file.name,)).fetchone()
+    if row is None:
+        # Setup and the progress row commit together so setup never reruns
+        filename = migration_file.name.replace("'", "''")
+        setup_sql = getattr(backfill, 'SETUP_SQL', '')
+        if split:
+            setup_sql = qualify_vocab_schema(setup_sql)
+        conn.executescript(f'''
+            BEGIN;
+            {setup_sql}
+            ;
+            INSERT INTO migrations (filename, completed) VALUES ('{filename}', 0);
+            COMMIT;
+        ''')
+        if split:
+            drop_history_triggers(conn, VOCAB_SCHEMA)
+        progress_id = None
+    else:
+        progress_id = row['progress_id']
+        if progress_id is not None:
+            print(f"Resuming backfill {migration_file.name} after id {progress_id}")
+
+    bounds = conn.execute(f'SELECT MIN(id), MAX(id) FROM {backfill.TABLE}').fetchone()
+    min_id, max_id = bounds[0], bounds[1]
+
+    if max_id is not None:
+        start_id = min_id if progress_id is None else max(progress_id + 1, min_id)
+        first_id = start_id
+        total_ids = max_id - first_id + 1
+        rows_done = 0
+        started = time.monotonic()
+
+        while start_id <= max_id:
+            end_id = start_id + batch_size
+            cursor = conn.execute(backfill.BACKFILL_SQL, (start_id, end_id))
+            rows_done += max(cursor.rowcount, 0)
+            conn.execute('UPDATE migrations SET progress_id = ? WHERE filename = ?',
+                         (end_id - 1, migration_file.name))
+            conn.commit()
+
+            elapsed = max(time.monotonic() - started, 1e-9)
+            ids_done = min(end_id, max_id + 1) - first_id
+            eta = (total_ids - ids_done) / (ids_done / elapsed)
+            print(f"  {migration_file.name}: {ids_done}/{total_ids} ids, "
+                  f"{rows_done} rows ({rows_done / elapsed:.0f} rows/s, ETA {eta:.1f}s)")
+
+            start_id = end_id
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+    conn.execute('''
+        UPDATE migrations
+        SET completed = 1, applied_at = CURRENT_TIMESTAMP
+        WHERE filename = ?
+    ''', (migration_file.name,))
+    conn.commit()
+
+def init_db(db_path=None, migrations_path=None, vocab_path=None):
+    """Initialize the database and run migrations
+
+    Migrations are ``.sql`` scripts applied in one go, or ``.py`` batched
+    backfills (see load_backfill) applied in resumable chunks.
+
+    With vocab_path (the split layout, see split_vocab) the vocabulary
+    database is attached while they run, so they alter its tables where
+    they are; migrations are recorded in db_path only.
+    """
+    db_path = db_path or Path(__file__).parent.parent / 'words.db'
+    migrations_path = migrations_path or Path(__file__).parent / 'migrations'
+    
+    # Connect to database (creates it if it doesn't exist); file: URIs
+    # allow migrating shared in-memory databases
+    conn = connect(db_path, vocab_path)
     
     try:
+        # Lets bulk deletes hand pages back with PRAGMA incremental_vacuum
+        # (only takes effect on a new database)
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
         # Create migrations table if it doesn't exist
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS migrations (
-                filename TEXT PRIMARY KEY,
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        ensure_migrations_table(conn)
         
         # Run migrations in order
-        for migration_file in sorted(migrations_path.glob('*.sql')):
+        migration_files = sorted(
+            list(migrations_path.glob('*.sql')) + list(migrations_path.glob('*.py')),
+            key=lambda path: path.name
+        )
+        for migration_file in migration_files:
             # Check if migration was already applied
             cursor = conn.cursor()
-            cursor.execute('SELECT filename FROM migrations WHERE filename = ?', 
+            cursor.execute('SELECT completed FROM migrations WHERE filename = ?', 
                          (migration_file.name,))
-            if cursor.fetchone() is None:
+            applied = cursor.fetchone()
+            if applied is not None and applied['completed']:
+                print(f"Skipping migration {migration_file.name} - already applied")
+            elif migration_file.suffix == '.py':
+                print(f"Running backfill migration: {migration_file.name}")
+                run_backfill(conn, migration_file, split=bool(vocab_path))
+            else:
                 print(f"Running migration: {migration_file.name}")
                 with open(migration_file) as f:
-                    conn.executescript(f.read())
+                    sql = f.read()
+                if vocab_path:
+                    conn.executescript(qualify_vocab_schema(sql))
+                    drop_history_triggers(conn, VOCAB_SCHEMA)
+                else:
+                    conn.executescript(sql)
                 # Record that this migration was applied
                 conn.execute('INSERT INTO migrations (filename) VALUES (?)', 
                            (migration_file.name,))
                 conn.commit()
-            else:
-                print(f"Skipping migration {migration_file.name} - already applied")
+        
+        if vocab_path:
+            sync_vocab_stats(conn)
         
         print("Database initialized successfully")
         
@@ -76,7 +290,7 @@ def seed_db(conn, seed_file, group_name):
                 INSERT OR IGNORE INTO word_groups (word_id, group_id) 
                 VALUES (?, ?)
             ''', (word_id, group_id))
-        
+
         conn.commit()
         print(f"Seeded {len(words)} words into group '{group_name}'")
         
@@ -108,32 +322,83 @@ def seed_study_activities(conn):
         conn.rollback()
         raise
 
-def main():
+def split_vocab(db_path, vocab_path):
+    """Move the vocabulary tables of a migrated database into a file of their own.
+
+    vocab_path gets VOCAB_TABLES with their data, indexes and the triggers
+    that only touch vocabulary tables (see drop_history_triggers), analyzed
+    and in rollback journal mode so it can be opened read-only; db_path
+    keeps everything else. Serve the pair with VOCAB_DATABASE and pass
+    vocab_path to init_db and main from then on.
+
+    Raises:
+        FileExistsError: If vocab_path exists
+        ValueError: If db_path has no vocabulary tables to move
+    """
+    if Path(vocab_path).exists():
+        raise FileExistsError(f"Vocabulary database {vocab_path} already exists")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'table'")}
+        if not tables.issuperset(VOCAB_TABLES):
+            raise ValueError(f"{db_path} has no vocabulary tables; is it split already?")
+        # Stats rows were kept by triggers until now; make sure none is missing
+        sync_vocab_stats(conn)
+        conn.execute('VACUUM INTO ?', (str(vocab_path),))
+    finally:
+        conn.close()
+
+    vocab = sqlite3.connect(vocab_path, isolation_level=None)
+    try:
+        vocab.execute('BEGIN')
+        drop_history_triggers(vocab)
+        for name in tables.difference(VOCAB_TABLES):
+            if not name.startswith('sqlite_'):
+                vocab.execute(f'DROP TABLE "{name}"')
+        vocab.execute(f"DELETE FROM sqlite_sequence WHERE name NOT IN ({', '.join('?' * len(VOCAB_TABLES))})",
+                      VOCAB_TABLES)
+        vocab.execute('COMMIT')
+        vocab.execute('ANALYZE')
+        # Readers of a WAL database need write access to its -shm file
+        vocab.execute('PRAGMA journal_mode = DELETE')
+        vocab.execute('VACUUM')
+    finally:
+        vocab.close()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute('BEGIN')
+        # Dropping a table drops its indexes and triggers with it
+        for name in VOCAB_TABLES:
+            conn.execute(f'DROP TABLE "{name}"')
+        conn.execute(f"DELETE FROM sqlite_sequence WHERE name IN ({', '.join('?' * len(VOCAB_TABLES))})",
+                     VOCAB_TABLES)
+        conn.execute('COMMIT')
+        conn.executescript('PRAGMA incremental_vacuum')
+    finally:
+        conn.close()
+    print(f"Moved {', '.join(VOCAB_TABLES)} to {vocab_path}")
+
+def main(vocab_path=None, db_path=None):
     """Main entry point for database initialization"""
     # Initialize database
-    init_db()
+    db_path = db_path or Path(__file__).parent.parent / 'words.db'
+    init_db(db_path=db_path, vocab_path=vocab_path)
     
     # Connect for seeding
-    db_path = Path(__file__).parent.parent / 'words.db'
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = connect(db_path, vocab_path)
     
     try:
         # Seed study activities first
         seed_study_activities(conn)
         
-        # Define word group seeds
-        seeds = [
-            ('db/seeds/animals.json', 'Animals'),
-            ('db/seeds/colors.json', 'Colors'),
-            ('db/seeds/numbers.json', 'Numbers'),
-            ('db/seeds/food.json', 'Food'),
-            ('db/seeds/family.json', 'Family')
-        ]
-        
         # Run all word group seeds
-        for seed_file, group_name in seeds:
+        for seed_file, group_name in SEEDS:
             seed_db(conn, seed_file, group_name)
+
+        if vocab_path:
+            sync_vocab_stats(conn)
             
     finally:
         conn.close()
@@ -0,0 +1,2 @@
+-- Look up group members without scanning word_groups
+CREATE INDEX IF NOT EXISTS idx_word_groups_group_id ON word_groups (group_id, word_id);
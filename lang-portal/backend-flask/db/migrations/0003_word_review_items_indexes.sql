@@ -0,0 +1,5 @@
+-- Find a session's review items without scanning the whole history
+CREATE INDEX IF NOT EXISTS idx_word_review_items_session_id ON word_review_items (study_session_id);
+
+-- Count a word's correct/wrong reviews without scanning the whole history
+CREATE INDEX IF NOT EXISTS idx_word_review_items_word_id ON word_review_items (word_id, correct);
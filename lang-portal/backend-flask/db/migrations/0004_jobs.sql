@@ -0,0 +1,18 @@
+-- Background jobs run by the in-process job runner (lib/jobs.py)
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed, cancelled
+    params TEXT,                           -- JSON
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,                           -- JSON
+    error TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT 0,
+    owner TEXT,
+    created_at TIMESTAMP NOT NULL,
+    started_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state);
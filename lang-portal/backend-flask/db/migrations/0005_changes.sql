@@ -0,0 +1,88 @@
+-- Change log feeding GET /api/changes so clients can sync incrementally
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    related_id INTEGER,        -- group_id for word_groups rows
+    op TEXT NOT NULL,          -- insert, update, delete
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_changes_row ON changes (table_name, row_id, related_id);
+
+-- Highest seq removed by compaction; clients syncing from before it must resync
+CREATE TABLE IF NOT EXISTS change_log_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    compacted_seq INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO change_log_state (id, compacted_seq) VALUES (1, 0);
+
+-- words
+CREATE TRIGGER IF NOT EXISTS changes_words_insert AFTER INSERT ON words
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('words', NEW.id, NULL, 'insert');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_words_update AFTER UPDATE ON words
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('words', NEW.id, NULL, 'update');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_words_delete AFTER DELETE ON words
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('words', OLD.id, NULL, 'delete');
+END;
+
+-- groups
+CREATE TRIGGER IF NOT EXISTS changes_groups_insert AFTER INSERT ON groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('groups', NEW.id, NULL, 'insert');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_groups_update AFTER UPDATE ON groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('groups', NEW.id, NULL, 'update');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_groups_delete AFTER DELETE ON groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('groups', OLD.id, NULL, 'delete');
+END;
+
+-- word_groups
+CREATE TRIGGER IF NOT EXISTS changes_word_groups_insert AFTER INSERT ON word_groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_groups', NEW.word_id, NEW.group_id, 'insert');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_word_groups_update AFTER UPDATE ON word_groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_groups', NEW.word_id, NEW.group_id, 'update');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_word_groups_delete AFTER DELETE ON word_groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_groups', OLD.word_id, OLD.group_id, 'delete');
+END;
+
+-- study_sessions
+CREATE TRIGGER IF NOT EXISTS changes_study_sessions_insert AFTER INSERT ON study_sessions
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('study_sessions', NEW.id, NULL, 'insert');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_study_sessions_update AFTER UPDATE ON study_sessions
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('study_sessions', NEW.id, NULL, 'update');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_study_sessions_delete AFTER DELETE ON study_sessions
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('study_sessions', OLD.id, NULL, 'delete');
+END;
+
+-- word_review_items_stats
+CREATE TRIGGER IF NOT EXISTS changes_word_review_items_stats_insert AFTER INSERT ON word_review_items_stats
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_review_items_stats', NEW.word_id, NULL, 'insert');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_word_review_items_stats_update AFTER UPDATE ON word_review_items_stats
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_review_items_stats', NEW.word_id, NULL, 'update');
+END;
+CREATE TRIGGER IF NOT EXISTS changes_word_review_items_stats_delete AFTER DELETE ON word_review_items_stats
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('word_review_items_stats', OLD.word_id, NULL, 'delete');
+END;
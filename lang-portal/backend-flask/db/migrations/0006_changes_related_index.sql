@@ -0,0 +1,3 @@
+-- Find a group's membership changes (word_groups rows carry group_id as related_id)
+CREATE INDEX IF NOT EXISTS idx_changes_related ON changes (related_id, table_name)
+WHERE related_id IS NOT NULL;
@@ -0,0 +1,44 @@
+# Sort the word list by stats with an index walk: every word gets a stats
+# row (kept by triggers from now on), the success ratio becomes a generated
+# column, and each sortable column gets an index ending in the word id.
+TABLE = 'words'
+
+SETUP_SQL = '''
+ALTER TABLE word_review_items_stats ADD COLUMN success_ratio REAL GENERATED ALWAYS AS (
+    CASE WHEN correct_count + wrong_count > 0
+    THEN correct_count * 1.0 / (correct_count + wrong_count) END
+) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_words_spanish ON words (spanish COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_words_english ON words (english COLLATE NOCASE);
+
+-- Words never reviewed sort first (ratio -1, last_reviewed '')
+CREATE INDEX IF NOT EXISTS idx_stats_correct_count ON word_review_items_stats (correct_count);
+CREATE INDEX IF NOT EXISTS idx_stats_wrong_count ON word_review_items_stats (wrong_count);
+CREATE INDEX IF NOT EXISTS idx_stats_success_ratio ON word_review_items_stats (IFNULL(success_ratio, -1));
+CREATE INDEX IF NOT EXISTS idx_stats_last_reviewed ON word_review_items_stats (IFNULL(last_reviewed, ''));
+
+CREATE TRIGGER IF NOT EXISTS word_stats_insert AFTER INSERT ON words
+BEGIN
+    INSERT OR IGNORE INTO word_review_items_stats (word_id, correct_count, wrong_count, last_reviewed)
+    VALUES (NEW.id, 0, 0, NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS word_stats_delete AFTER DELETE ON words
+BEGIN
+    DELETE FROM word_review_items_stats WHERE word_id = OLD.id;
+END;
+'''
+
+# Stats rows for existing words that have none, counted from their reviews
+BACKFILL_SQL = '''
+INSERT OR IGNORE INTO word_review_items_stats (word_id, correct_count, wrong_count, last_reviewed)
+SELECT
+    w.id,
+    COUNT(CASE WHEN wri.correct = 1 THEN 1 END),
+    COUNT(CASE WHEN wri.correct = 0 THEN 1 END),
+    MAX(wri.created_at)
+FROM words w
+LEFT JOIN word_review_items wri ON wri.word_id = w.id
+WHERE w.id >= ? AND w.id < ?
+GROUP BY w.id
+'''
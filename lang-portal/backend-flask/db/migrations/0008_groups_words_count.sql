@@ -0,0 +1,8 @@
+-- Denormalized member count, read by the group list. Writers that change
+-- memberships recompute it once per batch; NULL means "not yet counted"
+-- and readers fall back to counting word_groups.
+ALTER TABLE groups ADD COLUMN words_count INTEGER;
+
+UPDATE groups SET words_count = (
+    SELECT COUNT(*) FROM word_groups WHERE word_groups.group_id = groups.id
+);
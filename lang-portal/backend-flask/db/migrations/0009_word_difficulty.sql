@@ -0,0 +1,14 @@
+-- Difficulty of a word: its error rate smoothed toward 1/2 by one wrong and
+-- one correct pseudo-review, so a single miss doesn't outrank a word missed
+-- over and over. NULL until the word is reviewed. It is computed from the
+-- stats row, and the index stores it, so every stats write (review_word,
+-- resets, rebuilds) keeps the ranking current.
+ALTER TABLE word_review_items_stats ADD COLUMN difficulty REAL GENERATED ALWAYS AS (
+    CASE WHEN correct_count + wrong_count > 0
+    THEN (wrong_count + 1.0) / (correct_count + wrong_count + 2) END
+) VIRTUAL;
+
+-- Descending, so hardest-first with ties by word id is a plain index walk
+CREATE INDEX IF NOT EXISTS idx_stats_difficulty
+ON word_review_items_stats (difficulty DESC)
+WHERE difficulty IS NOT NULL;
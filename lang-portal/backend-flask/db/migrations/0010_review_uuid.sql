@@ -0,0 +1,7 @@
+-- Client-generated id of a review. A retried or replayed submission with
+-- the same id finds the first one instead of counting twice.
+ALTER TABLE word_review_items ADD COLUMN review_uuid TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_word_review_items_review_uuid
+ON word_review_items (review_uuid)
+WHERE review_uuid IS NOT NULL;
@@ -0,0 +1,36 @@
+-- Keep groups.words_count in step with word_groups for every writer.
+-- A count that is still NULL is taken once, then adjusted by one per row.
+
+-- Renames stay in the change log; member counts follow from word_groups changes
+DROP TRIGGER IF EXISTS changes_groups_update;
+CREATE TRIGGER IF NOT EXISTS changes_groups_update AFTER UPDATE OF id, name ON groups
+BEGIN
+    INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('groups', NEW.id, NULL, 'update');
+END;
+
+UPDATE groups SET words_count = (
+    SELECT COUNT(*) FROM word_groups WHERE word_groups.group_id = groups.id
+);
+
+CREATE TRIGGER IF NOT EXISTS groups_words_count_insert AFTER INSERT ON word_groups
+BEGIN
+    UPDATE groups
+    SET words_count = COALESCE(words_count + 1, (SELECT COUNT(*) FROM word_groups WHERE group_id = NEW.group_id))
+    WHERE id = NEW.group_id;
+END;
+CREATE TRIGGER IF NOT EXISTS groups_words_count_delete AFTER DELETE ON word_groups
+BEGIN
+    UPDATE groups
+    SET words_count = COALESCE(words_count - 1, (SELECT COUNT(*) FROM word_groups WHERE group_id = OLD.group_id))
+    WHERE id = OLD.group_id;
+END;
+CREATE TRIGGER IF NOT EXISTS groups_words_count_move AFTER UPDATE OF group_id ON word_groups
+WHEN OLD.group_id IS NOT NEW.group_id
+BEGIN
+    UPDATE groups
+    SET words_count = COALESCE(words_count - 1, (SELECT COUNT(*) FROM word_groups WHERE group_id = OLD.group_id))
+    WHERE id = OLD.group_id;
+    UPDATE groups
+    SET words_count = COALESCE(words_count + 1, (SELECT COUNT(*) FROM word_groups WHERE group_id = NEW.group_id))
+    WHERE id = NEW.group_id;
+END;
@@ -0,0 +1,15 @@
+# Gunicorn settings for the production entry point (wsgi.py)
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Load the app in each worker after fork: SQLite connections must not be
+# shared across processes, and warmup has to run in the worker that serves
+preload_app = False
+
+# Warmup can take a while on a large database
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
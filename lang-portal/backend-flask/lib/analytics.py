@@ -0,0 +1,234 @@
+import threading
+import numpy as np
+
+# Rows fetched per round trip when loading review history
+LOAD_CHUNK_SIZE = 100_000
+
+class ReviewAnalytics:
+  """Columnar, in-memory copy of word_review_items for progress statistics.
+
+  Reviews are kept as compact NumPy arrays (word_id int32, session_id
+  int32, correct bool, day int32 days since epoch) and statistics are
+  computed with vectorized bincount/cumsum passes instead of row-at-a-time
+  SQL aggregates.
+
+  refresh() appends only reviews with an id above the last one loaded, so
+  keeping up with new reviews costs one primary key range scan. Deletes
+  are not tracked row by row: call invalidate() after removing history
+  (a reset that empties the table is also detected on refresh).
+  """
+
+  def __init__(self, capacity=1024):
+    self._lock = threading.RLock()
+    self._capacity = capacity
+    self.invalidate()
+
+  def invalidate(self):
+    """Drop all loaded reviews; the next refresh reloads from scratch."""
+    with self._lock:
+      self.size = 0
+      self.first_id = None
+      self.last_id = 0
+      # Range of study_session_id over the loaded reviews
+      self.session_bounds = None
+      self._word_id = np.empty(self._capacity, dtype=np.int32)
+      self._session_id = np.empty(self._capacity, dtype=np.int32)
+      self._correct = np.empty(self._capacity, dtype=np.bool_)
+      self._day = np.empty(self._capacity, dtype=np.int32)
+
+  @property
+  def word_id(self):
+    return self._word_id[:self.size]
+
+  @property
+  def session_id(self):
+    return self._session_id[:self.size]
+
+  @property
+  def correct(self):
+    return self._correct[:self.size]
+
+  @property
+  def day(self):
+    return self._day[:self.size]
+
+  def _reserve(self, extra):
+    needed = self.size + extra
+    if needed <= len(self._word_id):
+      return
+    capacity = max(needed, 2 * len(self._word_id))
+    for name in ('_word_id', '_session_id', '_correct', '_day'):
+      column = getattr(self, name)
+      grown = np.empty(capacity, dtype=column.dtype)
+      grown[:self.size] = column[:self.size]
+      setattr(self, name, grown)
+
+  def append(self, rows):
+    """Append (id, word_id, study_session_id, correct, day) rows in id order."""
+    if not rows:
+      return
+    block = np.array(rows, dtype=np.int64)
+    with self._lock:
+      self._reserve(len(block))
+      end = self.size + len(block)
+      self._word_id[self.size:end] = block[:, 1]
+      self._session_id[self.size:end] = block[:, 2]
+      self._correct[self.size:end] = block[:, 3] != 0
+      self._day[self.size:end] = block[:, 4]
+      if self.first_id is None:
+        self.first_id = int(block[0, 0])
+      self.last_id = int(block[-1, 0])
+      low, high = int(block[:, 2].min()), int(block[:, 2].max())
+      if self.session_bounds is not None:
+        low, high = min(low, self.session_bounds[0]), max(high, self.session_bounds[1])
+      self.session_bounds = (low, high)
+      self.size = end
+
+  def refresh(self, db, chunk_size=LOAD_CHUNK_SIZE):
+    """Load reviews added since the last refresh (everything on first use).
+
+    Args:
+      db: Connection (or Db) to read word_review_items from
+    """
+    with self._lock:
+      cursor = db.cursor()
+      # Plain tuples are much cheaper to turn into arrays than Rows
+      cursor.row_factory = None
+      if self.size:
+        # Separate subqueries so both use the min/max primary key shortcut
+        cursor.execute('''
+          SELECT
+            (SELECT MIN(id) FROM word_review_items),
+            (SELECT MAX(id) FROM word_review_items)
+        ''')
+        bounds = cursor.fetchone()
+        if bounds[1] is None or bounds[1] < self.last_id or bounds[0] > self.first_id:
+          self.invalidate()
+
+      cursor.execute('''
+        SELECT
+          id,
+          word_id,
+          study_session_id,
+          correct,
+          CAST(julianday(created_at) - 2440587.5 AS INTEGER) AS day
+        FROM word_review_items
+        WHERE id > ?
+        ORDER BY id
+      ''', (self.last_id,))
+      while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+          break
+        self.append(rows)
+
+  # Statistics -------------------------------------------------------------
+
+  def _reviews_in_sessions(self, session_ids):
+    """Mask of reviews whose session is in session_ids (reviews left without
+    a session are ignored, like the dashboard's JOIN on study_sessions)."""
+    if session_ids is None:
+      return slice(None)
+    session_ids = np.asarray(session_ids, dtype=np.int64)
+    if not len(session_ids):
+      return np.zeros(self.size, dtype=np.bool_)
+    present = np.zeros(int(session_ids.max()) + 1, dtype=np.bool_)
+    present[session_ids] = True
+    session_id = self.session_id
+    known = session_id < len(present)
+    mask = np.zeros(self.size, dtype=np.bool_)
+    mask[known] = present[session_id[known]]
+    return mask
+
+  def word_counts(self, session_ids=None):
+    """Per-word attempts and correct answers, indexed by word id."""
+    with self._lock:
+      mask = self._reviews_in_sessions(session_ids)
+      word_id = self.word_id[mask]
+      attempts = np.bincount(word_id)
+      correct = np.bincount(word_id, weights=self.correct[mask], minlength=len(attempts))
+      return attempts, correct.astype(np.int64)
+
+  def summary(self, session_ids=None, min_attempts=5, mastery_rate=0.8):
+    """Words studied, mastered words, overall success rate and review count.
+
+    Mastered words have at least min_attempts reviews and a success rate
+    of mastery_rate or more.
+    """
+    attempts, correct = self.word_counts(session_ids)
+    total = int(attempts.sum())
+    studied = attempts > 0
+    rate = np.divide(correct, attempts, out=np.zeros(len(attempts)), where=studied)
+    mastered = (attempts >= min_attempts) & (rate >= mastery_rate)
+    return {
+      'total_words_studied': int(studied.sum()),
+      'mastered_words': int(mastered.sum()),
+      'success_rate': float(correct.sum()) / total if total else 0,
+      'total_reviews': total
+    }
+
+  def current_streak(self, today=None):
+    """Consecutive days with at least one review, ending at the last review
+    day (or 0 if that is before yesterday when today is given)."""
+    with self._lock:
+      if not self.size:
+        return 0
+      days = np.unique(self.day)
+    if today is not None and days[-1] < today - 1:
+      return 0
+    # A run restarts wherever the gap to the previous day is not 1; the
+    # streak is the length of the last run
+    breaks = np.flatnonzero(np.diff(days) != 1)
+    return int(len(days) - (breaks[-1] + 1 if len(breaks) else 0))
+
+  def daily_reviews(self):
+    """Reviews per day and running total, as (days, counts, cumulative)."""
+    with self._lock:
+      if not self.size:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+      first_day = int(self.day.min())
+      counts = np.bincount(self.day - first_day)
+    days = np.flatnonzero(counts)
+    return days + first_day, counts[days], np.cumsum(counts)[days]
+
+  def group_progress(self, session_groups):
+    """Per-group reviews, distinct words studied and success rate.
+
+    Args:
+      session_groups: Mapping of study session id to group id
+
+    Returns:
+      Dict of group id to {'reviews', 'words_studied', 'success_rate'}
+    """
+    if not session_groups:
+      return {}
+    lookup = np.full(max(session_groups) + 1, -1, dtype=np.int32)
+    lookup[list(session_groups)] = list(session_groups.values())
+
+    with self._lock:
+      session_id = self.session_id
+      known = session_id < len(lookup)
+      group_id = np.full(self.size, -1, dtype=np.int32)
+      group_id[known] = lookup[session_id[known]]
+      keep = group_id >= 0
+      group_id = group_id[keep]
+      word_id = self.word_id[keep].astype(np.int64)
+      correct = self.correct[keep]
+
+    if not len(group_id):
+      return {}
+    reviews = np.bincount(group_id)
+    correct_by_group = np.bincount(group_id, weights=correct, minlength=len(reviews))
+    # Distinct (group, word) pairs, counted per group
+    pairs = np.unique(group_id.astype(np.int64) * (int(word_id.max()) + 1) + word_id)
+    words_by_group = np.bincount(pairs // (int(word_id.max()) + 1), minlength=len(reviews))
+
+    return {
+      int(group): {
+        'reviews': int(reviews[group]),
+        'words_studied': int(words_by_group[group]),
+        'success_rate': float(correct_by_group[group]) / int(reviews[group])
+      }
+      for group in np.flatnonzero(reviews)
+    }
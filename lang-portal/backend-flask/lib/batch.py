@@ -0,0 +1,32 @@
+from flask import request
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+# Marks the environ of requests dispatched inside a batch; teardown hooks
+# that keep per-request state in g leave those to the enclosing request
+SUBREQUEST_ENVIRON_KEY = 'lang_portal.subrequest'
+
+def is_subrequest():
+  """Whether the current request runs inside a batch (see dispatch_subrequest)."""
+  return bool(request.environ.get(SUBREQUEST_ENVIRON_KEY))
+
+def dispatch_subrequest(app, path):
+  """Run a GET of path in-process and return its Response.
+
+  The sub-request shares the enclosing app context, so it uses the same
+  g and database connection. Only its view runs: before_request and
+  after_request hooks (sampling, profiling) already ran for the
+  enclosing request and cover the sub-requests' work.
+  """
+  builder = EnvironBuilder(path=path, method='GET', base_url=request.host_url)
+  try:
+    environ = builder.get_environ()
+  finally:
+    builder.close()
+  environ[SUBREQUEST_ENVIRON_KEY] = True
+
+  with app.request_context(environ):
+    try:
+      return app.make_response(app.dispatch_request())
+    except HTTPException as e:
+      return app.make_response(({"error": e.description}, e.code))
@@ -0,0 +1,117 @@
+import time
+import threading
+from collections import Counter
+from flask import g, request, jsonify
+
+# SQLite virtual machine instructions between two deadline checks
+DEFAULT_CHECK_INTERVAL = 10000
+
+# Aborted statements are reported cut to this many characters
+MAX_QUERY_LENGTH = 200
+
+class QueryBudget:
+  """Time budget for each SQL statement of one request.
+
+  attach() installs a progress handler on the request's connection that
+  interrupts a statement running longer than budget_ms, and a trace
+  callback that restarts the clock (and remembers the SQL) whenever a new
+  statement starts. SQLite then raises OperationalError("interrupted"),
+  the route fails as it would on any database error, and
+  QueryBudgets.init_app turns the response into a 503.
+  """
+
+  def __init__(self, endpoint, budget_ms, check_interval=DEFAULT_CHECK_INTERVAL):
+    self.endpoint = endpoint
+    self.budget_ms = budget_ms
+    self.check_interval = check_interval
+    self.deadline = None
+    self.statement = None
+    self.exceeded = None
+    self._connection = None
+
+  def _started(self, statement):
+    # Statements run by triggers are reported as "-- TRIGGER name" and
+    # belong to the statement that fired them
+    if statement.startswith('--'):
+      return
+    self.statement = statement
+    self.deadline = time.monotonic() + self.budget_ms / 1000
+
+  def _check(self):
+    if self.deadline is None or time.monotonic() < self.deadline:
+      return 0
+    if self.exceeded is None:
+      self.exceeded = ' '.join(self.statement.split())[:MAX_QUERY_LENGTH]
+    # Non-zero interrupts the running statement
+    return 1
+
+  def attach(self, connection):
+    if self._connection is connection:
+      return
+    connection.set_trace_callback(self._started)
+    connection.set_progress_handler(self._check, self.check_interval)
+    self._connection = connection
+
+  def detach(self):
+    if self._connection is None:
+      return
+    self._connection.set_trace_callback(None)
+    self._connection.set_progress_handler(None, 0)
+    self._connection = None
+
+class QueryBudgets:
+  """Per-endpoint statement time budgets with counters of aborted queries.
+
+  budgets maps endpoint names (view function names, e.g.
+  'get_study_sessions') to milliseconds; endpoints not in it get
+  default_ms, and None means no budget.
+  """
+
+  def __init__(self, default_ms=None, budgets=None, check_interval=DEFAULT_CHECK_INTERVAL):
+    self.default_ms = default_ms
+    self.budgets = dict(budgets or {})
+    self.check_interval = check_interval
+    self._lock = threading.Lock()
+    # Aborted statements per endpoint
+    self._aborted = Counter()
+    self._last_aborted = None
+
+  def budget_ms(self, endpoint):
+    return self.budgets.get(endpoint, self.default_ms)
+
+  def init_app(self, app):
+    @app.before_request
+    def start_query_budget():
+      budget_ms = self.budget_ms(request.endpoint)
+      if budget_ms is not None:
+        g.query_budget = QueryBudget(request.endpoint, budget_ms, self.check_interval)
+
+    @app.after_request
+    def report_exceeded_budget(response):
+      budget = g.get('query_budget')
+      if budget is None or budget.exceeded is None:
+        return response
+      self.record(budget)
+      response = jsonify({
+        "error": f"Query exceeded its {budget.budget_ms} ms budget",
+        "endpoint": budget.endpoint,
+        "query": budget.exceeded,
+        "budget_ms": budget.budget_ms
+      })
+      response.status_code = 503
+      return response
+
+  def record(self, budget):
+    with self._lock:
+      self._aborted[budget.endpoint] += 1
+      self._last_aborted = {'endpoint': budget.endpoint, 'query': budget.exceeded,
+                            'budget_ms': budget.budget_ms}
+
+  def stats(self):
+    with self._lock:
+      return {
+        'default_ms': self.default_ms,
+        'budgets': dict(self.budgets),
+        'aborted': dict(self._aborted),
+        'last_aborted': self._last_aborted
+      }
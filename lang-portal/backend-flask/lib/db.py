@@ -1,30 +1,140 @@
+import os
 import sqlite3
 import json
+import queue
 from flask import g
+from lib.slowlog import TracingCursor
+from lib.vocab import DEFAULT_VOCAB_MMAP_SIZE, attach_vocab
+
+def memory_uri(name):
+  """URI of a named in-memory database shared by every connection in the process."""
+  return f'file:{name}?mode=memory&cache=shared'
+
+def _connect_path(path):
+  path = str(path)
+  return sqlite3.connect(path, uri=path.startswith('file:'))
 
 class Db:
-  def __init__(self, database='words.db'):
+  def __init__(self, database='words.db', pool_size=0, vocab_database=None,
+               vocab_mmap_size=DEFAULT_VOCAB_MMAP_SIZE, vocab_immutable=False):
     self.database = database
+    # Split layout: vocabulary in its own file, attached read-only to every
+    # connection (see attach_vocab); None keeps everything in database
+    self.vocab_database = vocab_database
+    self.vocab_mmap_size = vocab_mmap_size
+    self.vocab_immutable = vocab_immutable
     self.connection = None
+    # With pool_size > 0 connections outlive the request and keep their
+    # prepared statement cache; otherwise one connection per request
+    self.pool_size = pool_size
+    self.pool = queue.LifoQueue(maxsize=pool_size) if pool_size else None
+    # Holds a shared in-memory database open (see Db.memory)
+    self.keepalive = None
+
+  @classmethod
+  def memory(cls, name, **kwargs):
+    """A named in-memory database, e.g. a template to clone with snapshot()."""
+    db = cls(database=memory_uri(name), **kwargs)
+    # The database only exists while at least one connection is open
+    db.keepalive = db.connect()
+    return db
+
+  def connect(self):
+    # URI filenames must be enabled on the connection to attach vocab_uri()
+    connection = sqlite3.connect(self.database, check_same_thread=self.pool is None,
+                                 uri=bool(self.vocab_database) or str(self.database).startswith('file:'))
+    connection.row_factory = sqlite3.Row  # Return rows as dictionaries
+    if self.vocab_database:
+      attach_vocab(connection, self.vocab_database, immutable=self.vocab_immutable,
+                   mmap_size=self.vocab_mmap_size)
+    return connection
 
   def get(self):
     if 'db' not in g:
-      g.db = sqlite3.connect(self.database)
-      g.db.row_factory = sqlite3.Row  # Return rows as dictionaries
+      connection = None
+      if self.pool is not None:
+        try:
+          connection = self.pool.get_nowait()
+        except queue.Empty:
+          pass
+      g.db = connection or self.connect()
     return g.db
 
   def commit(self):
     self.get().commit()
 
+  def rollback(self):
+    self.get().rollback()
+
   def cursor(self):
     # Ensure the connection is valid before getting a cursor
     connection = self.get()
+    # Requests with a query budget interrupt statements that overrun it
+    budget = g.get('query_budget')
+    if budget is not None:
+      budget.attach(connection)
+    # Requests traced by the slow-request sampler time their statements
+    trace = g.get('sql_trace')
+    if trace is not None:
+      return connection.cursor(lambda c: TracingCursor(c, trace))
     return connection.cursor()
 
   def close(self):
     db = g.pop('db', None)
-    if db is not None:
-      db.close()
+    if db is None:
+      return
+    budget = g.pop('query_budget', None)
+    if budget is not None:
+      # A pooled connection must not keep checking this request's deadline
+      budget.detach()
+    if self.pool is not None:
+      # Never hand a connection with an open transaction to the next request
+      db.rollback()
+      try:
+        self.pool.put_nowait(db)
+        return
+      except queue.Full:
+        pass
+    db.close()
+
+  def snapshot(self, path, pages=-1):
+    """Copy the database to path with the SQLite online backup API.
+
+    Readers and writers keep going while it runs. A file snapshot is
+    written next to path and renamed into place, so path never holds a
+    partial copy. path may also be a file: URI (e.g. memory_uri()).
+    Only the main database is copied, not an attached vocabulary database.
+    """
+    path = str(path)
+    target = path if path.startswith('file:') else path + '.tmp'
+    source = self.connect()
+    try:
+      destination = _connect_path(target)
+      try:
+        source.backup(destination, pages=pages)
+      finally:
+        destination.close()
+    finally:
+      source.close()
+    if target != path:
+      os.replace(target, path)
+    return path
+
+  def restore(self, path, pages=-1):
+    """Replace the database's contents with a snapshot taken by snapshot().
+
+    Open connections stay valid and see the restored data on their next
+    statement; caches built from the old data must be invalidated by the caller.
+    """
+    source = _connect_path(path)
+    try:
+      destination = self.connect()
+      try:
+        source.backup(destination, pages=pages)
+      finally:
+        destination.close()
+    finally:
+      source.close()
 
   # Function to load SQL from a file
   def sql(self, filepath):
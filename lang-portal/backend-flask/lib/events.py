@@ -0,0 +1,181 @@
+import json
+import threading
+import itertools
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class TooManySubscribersError(Exception):
+  """Raised when the broker already serves its maximum of subscribers."""
+
+def format_sse(data, event=None, event_id=None):
+  """Encode one Server-Sent Events message."""
+  lines = []
+  if event_id is not None:
+    lines.append(f'id: {event_id}')
+  if event is not None:
+    lines.append(f'event: {event}')
+  lines.extend(f'data: {line}' for line in json.dumps(data).splitlines())
+  return '\n'.join(lines) + '\n\n'
+
+class Subscription:
+  """A subscriber's bounded buffer of pending events.
+
+  A slow client never holds up publishers: when its buffer is full the
+  pending events are dropped and replaced by a single ``resync`` event,
+  telling the client to refetch instead of applying deltas it missed.
+  """
+
+  def __init__(self, max_queue):
+    self._events = deque()
+    self._max_queue = max_queue
+    self._ready = threading.Condition()
+    self.dropped = 0
+
+  def put(self, message):
+    with self._ready:
+      if len(self._events) >= self._max_queue:
+        self.dropped += len(self._events)
+        self._events.clear()
+        message = (message[0], 'resync', {'dropped': self.dropped})
+      self._events.append(message)
+      self._ready.notify()
+
+  def get(self, timeout=None):
+    """Next (id, event, data) message, or None if none arrived within timeout."""
+    with self._ready:
+      if not self._events:
+        self._ready.wait(timeout)
+      return self._events.popleft() if self._events else None
+
+class EventBroker:
+  """In-process fan-out of events to Server-Sent Events clients.
+
+  publish() copies an event into every subscriber's buffer and returns
+  immediately, so writes never wait on network I/O. Events only reach
+  clients of the same process; ChangeLogTail feeds it writes from all.
+  """
+
+  def __init__(self, max_queue=100, max_subscribers=100):
+    self.max_queue = max_queue
+    self.max_subscribers = max_subscribers
+    self._subscribers = set()
+    self._lock = threading.Lock()
+    self._ids = itertools.count(1)
+
+  @property
+  def has_subscribers(self):
+    return bool(self._subscribers)
+
+  def subscribe(self):
+    """Register a new subscriber.
+
+    Raises:
+      TooManySubscribersError: If max_subscribers clients are connected
+    """
+    with self._lock:
+      if len(self._subscribers) >= self.max_subscribers:
+        raise TooManySubscribersError("Too many event stream clients, try again later")
+      subscription = Subscription(self.max_queue)
+      self._subscribers.add(subscription)
+      return subscription
+
+  def unsubscribe(self, subscription):
+    with self._lock:
+      self._subscribers.discard(subscription)
+
+  def publish(self, event, data):
+    """Send an event to every subscriber; returns how many received it."""
+    with self._lock:
+      subscribers = list(self._subscribers)
+      message = (next(self._ids), event, data)
+    for subscription in subscribers:
+      subscription.put(message)
+    return len(subscribers)
+
+class ChangeLogTail:
+  """Feeds an EventBroker from the changes table, which every process shares.
+
+  While the broker has subscribers, a thread reads the change log past the
+  last seq it saw every poll_interval seconds and publishes the events
+  source makes of the new rows. A write therefore reaches the clients of
+  every worker, not only those of the worker that handled it.
+
+  source needs start(connection), called with the log's current end
+  before the first poll, and events(connection, changes) returning a list
+  of (event, data) pairs for rows of (seq, table_name, row_id, related_id, op).
+  """
+
+  def __init__(self, broker, connect, source, poll_interval=0.5, batch_size=500):
+    self.broker = broker
+    self.connect = connect
+    self.source = source
+    self.poll_interval = poll_interval
+    self.batch_size = batch_size
+    self.seq = 0
+    self._thread = None
+    self._lock = threading.Lock()
+    self._stopped = threading.Event()
+
+  def start(self):
+    """Start tailing from the current end of the log, unless already running.
+
+    Call it after subscribing: the thread exits once the broker has no
+    subscribers left, and a later start() begins again at the end.
+    """
+    with self._lock:
+      if self._thread is not None:
+        return
+      # Taken here rather than in the thread, so a write made right after
+      # subscribing is never mistaken for history
+      connection = self.connect()
+      try:
+        self.seq = connection.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+        self.source.start(connection)
+      finally:
+        connection.close()
+      self._stopped.clear()
+      self._thread = threading.Thread(target=self._run, name='change-log-tail', daemon=True)
+      self._thread.start()
+
+  def stop(self):
+    """Stop the thread and wait for it to exit."""
+    self._stopped.set()
+    thread = self._thread
+    if thread is not None:
+      thread.join()
+
+  def _run(self):
+    connection = self.connect()
+    try:
+      while True:
+        with self._lock:
+          if self._stopped.is_set() or not self.broker.has_subscribers:
+            self._thread = None
+            return
+        try:
+          self.poll(connection)
+        except Exception as e:
+          logger.error(f"Reading the change log failed: {str(e)}")
+        self._stopped.wait(self.poll_interval)
+    finally:
+      connection.close()
+
+  def poll(self, connection):
+    """Publish the events for changes past seq; returns how many changes were read."""
+    read = 0
+    while True:
+      changes = connection.execute('''
+        SELECT seq, table_name, row_id, related_id, op
+        FROM changes
+        WHERE seq > ?
+        ORDER BY seq
+        LIMIT ?
+      ''', (self.seq, self.batch_size)).fetchall()
+      if not changes:
+        return read
+      for event, data in self.source.events(connection, changes):
+        self.broker.publish(event, data)
+      self.seq = changes[-1][0]
+      read += len(changes)
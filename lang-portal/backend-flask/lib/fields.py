@@ -0,0 +1,37 @@
+def parse_fields(value, allowed):
+  """Fields requested with a comma-separated fields= query parameter.
+
+  Args:
+    value: The parameter as given, or None when absent
+    allowed: Field names the endpoint returns, in response order
+
+  Returns:
+    The requested fields in the order of allowed, or all of allowed when
+    value is None
+
+  Raises:
+    ValueError: If a field is unknown or none is given
+  """
+  if value is None:
+    return list(allowed)
+  requested = {field.strip() for field in value.split(',') if field.strip()}
+  if not requested:
+    raise ValueError("fields must name at least one field")
+  unknown = requested.difference(allowed)
+  if unknown:
+    raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}; "
+                     f"allowed: {', '.join(allowed)}")
+  return [field for field in allowed if field in requested]
+
+def select_list(fields, columns):
+  """SQL select list computing only the given fields, each aliased to its name.
+
+  Args:
+    fields: Field names (see parse_fields)
+    columns: Field name to SQL expression
+  """
+  return ',\n'.join(f'{columns[field]} AS {field}' for field in fields)
+
+def project(rows, fields):
+  """Rows selected with select_list as dicts of the given fields."""
+  return [{field: row[field] for field in fields} for row in rows]
@@ -0,0 +1,396 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC, timedelta
+from lib.vocab import DEFAULT_VOCAB_MMAP_SIZE, attach_vocab
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+FINISHED_STATES = ('completed', 'failed', 'cancelled')
+
+class JobCancelled(Exception):
+  """Raised inside a job when cancellation was requested."""
+
+class UnknownJobTypeError(Exception):
+  """Raised when submitting a job type with no registered handler."""
+
+class JobQueueFullError(Exception):
+  """Raised when the runner already holds its maximum of pending jobs."""
+
+def _now():
+  return datetime.now(UTC).isoformat()
+
+def _row_to_dict(row):
+  return {
+    'id': row['id'],
+    'type': row['type'],
+    'state': row['state'],
+    'params': json.loads(row['params']) if row['params'] else {},
+    'progress': row['progress'],
+    'result': json.loads(row['result']) if row['result'] else None,
+    'error': row['error'],
+    'cancel_requested': bool(row['cancel_requested']),
+    'created_at': row['created_at'],
+    'started_at': row['started_at'],
+    'finished_at': row['finished_at']
+  }
+
+class JobContext:
+  """Handed to a job handler: its params, a private connection and hooks
+  to report progress and notice cancellation."""
+
+  def __init__(self, runner, job_id, params, db):
+    self.runner = runner
+    self.job_id = job_id
+    self.params = params
+    self.db = db
+
+  def report(self, progress, details=None):
+    """Store progress (0..1) and a heartbeat; raise JobCancelled if asked to stop.
+
+    details, if given, is stored as the job's result so far, so other
+    processes can follow more than a fraction.
+    """
+    fields = {'progress': max(0.0, min(1.0, progress)), 'heartbeat_at': _now()}
+    if details is not None:
+      fields['result'] = json.dumps(details)
+    self.runner._update(self.job_id, **fields)
+    self.check_cancelled()
+
+  def check_cancelled(self):
+    if self.runner._is_cancel_requested(self.job_id):
+      raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+class JobRunner:
+  """Bounded in-process worker pool backed by the persistent jobs table.
+
+  Jobs are rows in ``jobs``; a worker claims a queued row before running it,
+  so a job runs once even if several processes resume the same queue.
+  Each job gets its own SQLite connection and never touches request state.
+  """
+
+  def __init__(self, database, max_workers=2, max_pending=100, stale_after=120, vocab_database=None,
+               vocab_mmap_size=DEFAULT_VOCAB_MMAP_SIZE, vocab_immutable=False):
+    self.database = database
+    # Attached read-only to job connections in the split layout, with the
+    # same settings as request connections (see Db)
+    self.vocab_database = vocab_database
+    self.vocab_mmap_size = vocab_mmap_size
+    self.vocab_immutable = vocab_immutable
+    self.max_workers = max_workers
+    self.max_pending = max_pending
+    # Running jobs without a heartbeat for this long are requeued on start
+    self.stale_after = stale_after
+    self.handlers = {}
+    self.validators = {}
+    self.owner = f"{socket.gethostname()}:{os.getpid()}"
+    self._executor = None
+    self._pending = 0
+    self._lock = threading.Lock()
+
+  def register(self, job_type, handler, validate=None):
+    """Register handler(ctx) -> JSON-serializable result for a job type.
+
+    validate(params), if given, runs when a job is submitted and raises
+    ValueError for parameters the handler can't use, so a bad job is
+    refused up front instead of failing once it runs.
+    """
+    self.handlers[job_type] = handler
+    if validate is not None:
+      self.validators[job_type] = validate
+
+  def connect(self):
+    connection = sqlite3.connect(self.database, timeout=30, uri=bool(self.vocab_database))
+    connection.row_factory = sqlite3.Row
+    if self.vocab_database:
+      attach_vocab(connection, self.vocab_database, immutable=self.vocab_immutable,
+                   mmap_size=self.vocab_mmap_size)
+    return connection
+
+  def _get_executor(self):
+    with self._lock:
+      if self._executor is None:
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+      return self._executor
+
+  def _update(self, job_id, **fields):
+    assignments = ', '.join(f'{column} = ?' for column in fields)
+    connection = self.connect()
+    try:
+      connection.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+      connection.commit()
+    finally:
+      connection.close()
+
+  def _is_cancel_requested(self, job_id):
+    connection = self.connect()
+    try:
+      row = connection.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+      return bool(row and row['cancel_requested'])
+    finally:
+      connection.close()
+
+  def _schedule(self, job_id):
+    with self._lock:
+      if self._pending >= self.max_pending:
+        raise JobQueueFullError("Too many pending jobs, try again later")
+      self._pending += 1
+    self._get_executor().submit(self._run, job_id)
+
+  def _create(self, job_type, params, unless_within):
+    """Persist a queued job and return its id, or None (see submit)."""
+    if job_type not in self.handlers:
+      raise UnknownJobTypeError(f"Unknown job type: {job_type}")
+    if job_type in self.validators:
+      self.validators[job_type](params or {})
+
+    connection = self.connect()
+    try:
+      if unless_within is not None:
+        # Hold the write lock from the check to the insert
+        connection.execute('BEGIN IMMEDIATE')
+        since = (datetime.now(UTC) - timedelta(seconds=unless_within)).isoformat()
+        recent = connection.execute('''
+          SELECT 1 FROM jobs
+          WHERE type = ? AND (state IN ('queued', 'running') OR created_at >= ?)
+          LIMIT 1
+        ''', (job_type, since)).fetchone()
+        if recent is not None:
+          connection.rollback()
+          return None
+      cursor = connection.execute('''
+        INSERT INTO jobs (type, state, params, created_at)
+        VALUES (?, 'queued', ?, ?)
+      ''', (job_type, json.dumps(params or {}), _now()))
+      connection.commit()
+      return cursor.lastrowid
+    finally:
+      connection.close()
+
+  def submit(self, job_type, params=None, unless_within=None):
+    """Persist a new job and queue it on the worker pool.
+
+    With unless_within (seconds), nothing is submitted and None is
+    returned when a job of the same type is queued, running or was
+    created that recently, in this or any other process; 0 only
+    checks for queued or running ones.
+
+    Raises:
+      UnknownJobTypeError: If no handler is registered for job_type
+      ValueError: If the job type's validator rejects params
+      JobQueueFullError: If max_pending jobs are already waiting or running
+    """
+    job_id = self._create(job_type, params, unless_within)
+    if job_id is None:
+      return None
+
+    try:
+      self._schedule(job_id)
+    except JobQueueFullError:
+      # Don't leave it queued for a later start to pick up
+      self._delete(job_id)
+      raise
+    return self.get(job_id)
+
+  def run(self, job_type, params=None, unless_within=None):
+    """Persist a new job and run it in the calling thread.
+
+    The job is recorded like a submitted one, so its progress and outcome
+    can be followed from any process.
+
+    Returns:
+      The finished job, or None as for submit with unless_within
+
+    Raises:
+      UnknownJobTypeError: If no handler is registered for job_type
+      ValueError: If the job type's validator rejects params
+    """
+    job_id = self._create(job_type, params, unless_within)
+    if job_id is None:
+      return None
+    self._execute(job_id)
+    return self.get(job_id)
+
+  def latest(self, job_type):
+    """Get the most recently created job of a type, or None."""
+    connection = self.connect()
+    try:
+      row = connection.execute('''
+        SELECT * FROM jobs WHERE type = ? ORDER BY id DESC LIMIT 1
+      ''', (job_type,)).fetchone()
+      return _row_to_dict(row) if row else None
+    finally:
+      connection.close()
+
+  def _delete(self, job_id):
+    connection = self.connect()
+    try:
+      connection.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+      connection.commit()
+    finally:
+      connection.close()
+
+  def get(self, job_id):
+    """Get a job as a dictionary, or None if it doesn't exist."""
+    connection = self.connect()
+    try:
+      row = connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+      return _row_to_dict(row) if row else None
+    finally:
+      connection.close()
+
+  def cancel(self, job_id):
+    """Cancel a job: queued jobs stop immediately, running jobs at their
+    next progress report. Returns the job, or None if it doesn't exist."""
+    connection = self.connect()
+    try:
+      connection.execute('''
+        UPDATE jobs SET state = 'cancelled', cancel_requested = 1, finished_at = ?
+        WHERE id = ? AND state = 'queued'
+      ''', (_now(), job_id))
+      connection.execute('''
+        UPDATE jobs SET cancel_requested = 1
+        WHERE id = ? AND state = 'running'
+      ''', (job_id,))
+      connection.commit()
+    finally:
+      connection.close()
+    return self.get(job_id)
+
+  def start(self):
+    """Pick up jobs left over from a previous process.
+
+    Queued jobs are scheduled again and running jobs whose heartbeat is
+    stale (their process died) are requeued first.
+    """
+    stale_before = (datetime.now(UTC) - timedelta(seconds=self.stale_after)).isoformat()
+    connection = self.connect()
+    try:
+      connection.execute('''
+        UPDATE jobs SET state = 'queued', owner = NULL
+        WHERE state = 'running' AND COALESCE(heartbeat_at, started_at) < ?
+      ''', (stale_before,))
+      connection.commit()
+      job_ids = [row['id'] for row in connection.execute(
+        "SELECT id FROM jobs WHERE state = 'queued' ORDER BY id"
+      )]
+    except sqlite3.OperationalError as e:
+      logger.warning(f"Job runner not started: {e}")
+      return []
+    finally:
+      connection.close()
+
+    scheduled = []
+    for job_id in job_ids:
+      try:
+        self._schedule(job_id)
+      except JobQueueFullError:
+        # The rest stay queued for the next start
+        break
+      scheduled.append(job_id)
+    return scheduled
+
+  def shutdown(self, wait=True):
+    with self._lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=wait)
+
+  def _run(self, job_id):
+    try:
+      self._execute(job_id)
+    finally:
+      with self._lock:
+        self._pending -= 1
+
+  def _execute(self, job_id):
+    connection = self.connect()
+    try:
+      # Claim the job; another process may already have taken it
+      now = _now()
+      claimed = connection.execute('''
+        UPDATE jobs SET state = 'running', owner = ?, started_at = ?, heartbeat_at = ?
+        WHERE id = ? AND state = 'queued'
+      ''', (self.owner, now, now, job_id)).rowcount
+      connection.commit()
+      if not claimed:
+        return
+      row = connection.execute('SELECT type, params FROM jobs WHERE id = ?', (job_id,)).fetchone()
+
+      ctx = JobContext(self, job_id, json.loads(row['params'] or '{}'), connection)
+      try:
+        handler = self.handlers.get(row['type'])
+        if handler is None:
+          raise UnknownJobTypeError(f"Unknown job type: {row['type']}")
+        result = handler(ctx)
+        connection.rollback()
+        self._update(job_id, state='completed', progress=1.0,
+                     result=json.dumps(result), finished_at=_now())
+      except JobCancelled:
+        connection.rollback()
+        self._update(job_id, state='cancelled', finished_at=_now())
+      except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}")
+        logger.error(traceback.format_exc())
+        connection.rollback()
+        self._update(job_id, state='failed', error=str(e), finished_at=_now())
+    finally:
+      connection.close()
+
+class JobScheduler:
+  """Submit jobs on fixed intervals from a daemon thread.
+
+  Every server process may run one; a job is skipped while one of its type
+  is pending or was created within its interval, so workers sharing the
+  database don't repeat each other's runs.
+  """
+
+  def __init__(self, runner, tick=60):
+    self.runner = runner
+    # Seconds between checks for due jobs
+    self.tick = tick
+    self.entries = []
+    self._stop = threading.Event()
+    self._thread = None
+
+  def every(self, job_type, seconds, params=None):
+    """Submit job_type with params about every seconds seconds."""
+    self.entries.append((job_type, seconds, params or {}))
+
+  def run_pending(self):
+    """Submit the jobs that are due; returns the submitted jobs."""
+    submitted = []
+    for job_type, seconds, params in self.entries:
+      try:
+        job = self.runner.submit(job_type, params, unless_within=seconds)
+      except (JobQueueFullError, ValueError, sqlite3.Error) as e:
+        logger.warning(f"Scheduled {job_type} job skipped: {e}")
+        continue
+      if job is not None:
+        submitted.append(job)
+    return submitted
+
+  def start(self):
+    if self._thread is not None or not self.entries:
+      return
+    self._stop.clear()
+
+    def loop():
+      while not self._stop.is_set():
+        self.run_pending()
+        self._stop.wait(self.tick)
+
+    self._thread = threading.Thread(target=loop, name='job-scheduler', daemon=True)
+    self._thread.start()
+
+  def shutdown(self):
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
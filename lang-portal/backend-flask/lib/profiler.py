@@ -0,0 +1,182 @@
+import os
+import re
+import hmac
+import time
+import random
+import pstats
+import cProfile
+import logging
+import itertools
+import threading
+from collections import deque
+from datetime import datetime, UTC
+from flask import g, request
+from lib.batch import is_subrequest
+
+logger = logging.getLogger(__name__)
+
+# Calls deeper than this are folded into their caller in collapsed stacks
+MAX_STACK_DEPTH = 100
+
+# Held while a request is profiled. From Python 3.12 the profiler hook is
+# process-wide: a second enable() raises ValueError and a profile sees
+# every thread, so requests are profiled one at a time
+_active_profile = threading.Lock()
+
+def _frame_name(func):
+  filename, line, name = func
+  if filename == '~':
+    # Built-ins, e.g. "<method 'execute' of 'sqlite3.Cursor' objects>"
+    return name
+  return f"{os.path.basename(filename)}:{name}:{line}"
+
+def collapsed_stacks(stats):
+  """Collapsed-stack lines ("a;b;c <microseconds>") from pstats.Stats.
+
+  cProfile records caller/callee pairs, not whole stacks, so a function's
+  time is split between the paths reaching it in proportion to the time
+  each caller spent in it. The output feeds flamegraph.pl or speedscope.
+  """
+  callees = {}
+  for func, (_, _, _, _, callers) in stats.stats.items():
+    for caller, (_, _, _, cumtime) in callers.items():
+      callees.setdefault(caller, []).append((func, cumtime))
+
+  totals = {}
+
+  def walk(func, stack, weight):
+    _, _, tottime, cumtime, _ = stats.stats[func]
+    stack = stack + [_frame_name(func)]
+    key = ';'.join(stack)
+    totals[key] = totals.get(key, 0.0) + tottime * weight
+    if len(stack) >= MAX_STACK_DEPTH:
+      return
+    for callee, edge_time in callees.get(func, []):
+      callee_cumtime = stats.stats[callee][3]
+      if callee == func or not callee_cumtime or _frame_name(callee) in stack:
+        continue
+      walk(callee, stack, weight * min(1.0, edge_time / callee_cumtime))
+
+  roots = [func for func, (_, _, _, _, callers) in stats.stats.items() if not callers]
+  for root in roots:
+    walk(root, [], 1.0)
+
+  return [f"{stack} {round(seconds * 1e6)}"
+          for stack, seconds in sorted(totals.items()) if round(seconds * 1e6) > 0]
+
+class RequestProfiler:
+  """Run chosen requests under cProfile and write their profiles to a directory.
+
+  A request is profiled when it carries the trigger header with token as
+  its value, or is picked at sample_rate; without a token the header is
+  ignored, since a profile slows the whole process and writes files. At
+  most max_per_minute profiles are taken per process, so leaving it
+  enabled in production costs nothing but a check per request. Requests arriving while another is profiled, or while another
+  profiling tool is active, are skipped. Each profile is written twice:
+  <name>.prof for pstats/snakeviz and <name>.collapsed for flame graphs.
+  """
+
+  def __init__(self, directory, sample_rate=0.0, max_per_minute=6, header='X-Profile', token=None):
+    self.directory = directory
+    self.token = token
+    self.sample_rate = sample_rate
+    self.max_per_minute = max_per_minute
+    self.header = header
+    self._recent = deque()
+    self._lock = threading.Lock()
+    self._ids = itertools.count(1)
+    self.profiled = 0
+    self.skipped = 0
+
+  def _acquire(self):
+    """Take one of this minute's profiles and the process's profiler.
+
+    False when this minute's profiles are used up or another request is
+    being profiled.
+    """
+    now = time.monotonic()
+    with self._lock:
+      while self._recent and now - self._recent[0] >= 60:
+        self._recent.popleft()
+      if len(self._recent) >= self.max_per_minute or not _active_profile.acquire(blocking=False):
+        self.skipped += 1
+        return False
+      self._recent.append(now)
+      return True
+
+  def _release(self, profiled=True):
+    """Give the profiler back; an unused profile goes back to this minute's."""
+    with self._lock:
+      if profiled:
+        self.profiled += 1
+      else:
+        self._recent.pop()
+        self.skipped += 1
+    _active_profile.release()
+
+  def wanted(self):
+    """Whether the current request asked for, or was sampled for, a profile."""
+    supplied = request.headers.get(self.header)
+    if supplied and self.token and hmac.compare_digest(supplied.encode(), self.token.encode()):
+      return True
+    return self.sample_rate > 0 and random.random() < self.sample_rate
+
+  def profile_name(self):
+    path = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+    return f"{datetime.now(UTC):%Y%m%dT%H%M%S}_{os.getpid()}_{next(self._ids)}_{request.method}_{path}"
+
+  def init_app(self, app):
+    os.makedirs(self.directory, exist_ok=True)
+
+    @app.before_request
+    def start_profile():
+      if not self.wanted() or not self._acquire():
+        return
+      profile = cProfile.Profile()
+      try:
+        profile.enable()
+      except ValueError as e:
+        # Another profiling tool is active in this process
+        logger.warning(f"Not profiling {request.path}: {e}")
+        self._release(profiled=False)
+        return
+      g.profile_name = self.profile_name()
+      g.profile = profile
+
+    @app.after_request
+    def name_profile(response):
+      if 'profile_name' in g:
+        response.headers[self.header] = g.profile_name
+      return response
+
+    @app.teardown_request
+    def write_profile(exception):
+      if is_subrequest():
+        return
+      profile = g.pop('profile', None)
+      if profile is None:
+        return
+      profile.disable()
+      self._release()
+      try:
+        self.write(profile, g.pop('profile_name'))
+      except Exception as e:
+        logger.warning(f"Could not write profile for {request.path}: {e}")
+
+  def write(self, profile, name):
+    """Write a finished profile as <name>.prof and <name>.collapsed."""
+    base = os.path.join(self.directory, name)
+    profile.dump_stats(base + '.prof')
+    stats = pstats.Stats(profile)
+    with open(base + '.collapsed', 'w') as file:
+      file.write('\n'.join(collapsed_stacks(stats)) + '\n')
+    return base
+
+  def stats(self):
+    with self._lock:
+      return {
+        'profiled': self.profiled,
+        'skipped': self.skipped,
+        'max_per_minute': self.max_per_minute,
+        'sample_rate': self.sample_rate
+      }
@@ -0,0 +1,126 @@
+import math
+import time
+import threading
+from collections import Counter, OrderedDict
+from flask import request, jsonify
+
+# Methods that write; reads are never limited, even on a listed endpoint
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Header a client may send to be limited on its own rather than by address
+CLIENT_ID_HEADER = 'X-Client-Id'
+
+class TokenBucket:
+  """Holds up to burst tokens, refilled at rate tokens per second."""
+
+  def __init__(self, rate, burst, now):
+    self.rate = rate
+    self.burst = burst
+    self.tokens = burst
+    self.updated = now
+
+  def take(self, now):
+    """Take one token; return 0 on success, else seconds until one is available."""
+    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+    self.updated = now
+    if self.tokens >= 1:
+      self.tokens -= 1
+      return 0
+    return (1 - self.tokens) / self.rate
+
+class RateLimiter:
+  """Token-bucket rate limits for write endpoints, per endpoint and client.
+
+  limits maps endpoint names to (requests per second, burst), or None for
+  unlimited; endpoints not listed are never limited, so read-only POSTs
+  such as batches and lookups by ids stay out of it. A client is its
+  address plus its X-Client-Id header, which only tells apart clients
+  sharing an address (one NAT, several tabs), plus the study session for
+  routes that take a session_id, so one looping activity cannot use up
+  the writer for other sessions. Every address also has one bucket per
+  endpoint holding clients_per_address times the limit, so rotating the
+  header or the session id does not get past it. Over the limit a
+  request gets 429 with Retry-After instead of reaching the database.
+
+  Buckets live in this process and are shared by its threads; at most
+  max_buckets are kept, dropping the least recently used. A request
+  refused for its address creates no bucket.
+  """
+
+  def __init__(self, limits=None, max_buckets=10000, clients_per_address=8, clock=time.monotonic):
+    self.limits = dict(limits or {})
+    self.max_buckets = max_buckets
+    self.clients_per_address = clients_per_address
+    self.clock = clock
+    self._buckets = OrderedDict()
+    self._lock = threading.Lock()
+    self._limited = Counter()
+
+  def limit_for(self, endpoint):
+    return self.limits.get(endpoint)
+
+  def client_key(self):
+    client = request.headers.get(CLIENT_ID_HEADER)
+    session_id = (request.view_args or {}).get('session_id')
+    return (request.remote_addr, client, session_id)
+
+  def _bucket(self, key, rate, burst, now):
+    bucket = self._buckets.get(key)
+    if bucket is None:
+      bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+      if len(self._buckets) > self.max_buckets:
+        # Least recently used first; an idle client's bucket has refilled anyway
+        self._buckets.popitem(last=False)
+    else:
+      self._buckets.move_to_end(key)
+    return bucket
+
+  def acquire(self, endpoint, key, address=None):
+    """Take a token for key (and address, if given) at endpoint; return 0 or the seconds to wait."""
+    limit = self.limit_for(endpoint)
+    if limit is None:
+      return 0
+    rate, burst = limit
+    now = self.clock()
+    with self._lock:
+      shared = None
+      if address is not None:
+        shared = self._bucket((endpoint, 'address', address), rate * self.clients_per_address,
+                              burst * self.clients_per_address, now)
+        wait = shared.take(now)
+        if wait:
+          self._limited[endpoint] += 1
+          return wait
+      wait = self._bucket((endpoint, key), rate, burst, now).take(now)
+      if wait:
+        self._limited[endpoint] += 1
+        if shared is not None:
+          # Refused by the client's own bucket: the address's token is unused
+          shared.tokens += 1
+      return wait
+
+  def init_app(self, app):
+    @app.before_request
+    def limit_writes():
+      if request.method not in WRITE_METHODS or request.endpoint is None:
+        return
+      wait = self.acquire(request.endpoint, self.client_key(), address=request.remote_addr)
+      if not wait:
+        return
+      retry_after = math.ceil(wait)
+      response = jsonify({
+        "error": "Too many requests; retry later",
+        "endpoint": request.endpoint,
+        "retry_after": retry_after
+      })
+      response.status_code = 429
+      response.headers['Retry-After'] = str(retry_after)
+      return response
+
+  def stats(self):
+    with self._lock:
+      return {
+        'limits': {endpoint: list(limit) if limit else None for endpoint, limit in self.limits.items()},
+        'buckets': len(self._buckets),
+        'limited': dict(self._limited)
+      }
@@ -0,0 +1,87 @@
+import threading
+from collections import Counter, defaultdict
+
+class _Call:
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+class SingleFlight:
+  """Share one in-flight computation between concurrent identical calls.
+
+  The first caller for a key runs the function; callers arriving with the
+  same key while it runs wait for it and get the same result (or
+  exception). Nothing is cached once the call finishes.
+
+  Keys include a data version (from the version callable): a caller that
+  sees newer data starts a new call instead of joining one that may have
+  read older data.
+  """
+
+  def __init__(self, version=None):
+    self.version = version
+    self._calls = {}
+    self._lock = threading.Lock()
+    self._metrics = defaultdict(Counter)
+
+  def do(self, name, args, fn):
+    """Return fn(), or the result of an identical call already in flight.
+
+    Args:
+      name: Name of the computation (e.g. the route); metrics are kept per name
+      args: Hashable arguments that, with name and the data version,
+        identify identical calls
+      fn: Zero-argument callable computing the result
+    """
+    key = (name, args, self.version() if self.version else None)
+    with self._lock:
+      metrics = self._metrics[name]
+      metrics['calls'] += 1
+      call = self._calls.get(key)
+      leader = call is None
+      if leader:
+        call = self._calls[key] = _Call()
+        metrics['executions'] += 1
+      else:
+        metrics['coalesced'] += 1
+
+    if not leader:
+      call.done.wait()
+    else:
+      try:
+        call.result = fn()
+      except Exception as e:
+        call.error = e
+        with self._lock:
+          metrics['errors'] += 1
+      finally:
+        with self._lock:
+          del self._calls[key]
+        call.done.set()
+
+    if call.error is not None:
+      raise call.error
+    return call.result
+
+  def stats(self):
+    """Per-name counts of calls, executions, coalesced calls, errors and calls in flight."""
+    with self._lock:
+      in_flight = Counter(key[0] for key in self._calls)
+      return {
+        name: {
+          'calls': metrics['calls'],
+          'executions': metrics['executions'],
+          'coalesced': metrics['coalesced'],
+          'errors': metrics['errors'],
+          'in_flight': in_flight[name]
+        }
+        for name, metrics in self._metrics.items()
+      }
+
+def coalesce(app, name, args, fn):
+  """Run fn through app.singleflight when the app has one, else directly."""
+  flight = getattr(app, 'singleflight', None)
+  if flight is None:
+    return fn()
+  return flight.do(name, args, fn)
@@ -0,0 +1,246 @@
+import json
+import time
+import sqlite3
+import logging
+import itertools
+import threading
+from collections import deque
+from datetime import datetime, timedelta, UTC
+from flask import g, request
+from lib.batch import is_subrequest
+
+logger = logging.getLogger(__name__)
+
+# Statements whose plan EXPLAIN QUERY PLAN can show
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Longer string parameters (e.g. a bulk import's JSON batch) are cut to this
+MAX_PARAM_LENGTH = 200
+
+def _loggable(value):
+  if value is None or isinstance(value, (int, float)):
+    return value
+  if isinstance(value, str):
+    return value if len(value) <= MAX_PARAM_LENGTH else value[:MAX_PARAM_LENGTH] + '...'
+  return repr(value)[:MAX_PARAM_LENGTH]
+
+class SqlTrace:
+  """The statements one request ran, up to max_statements of them."""
+
+  def __init__(self, max_statements=200):
+    self.max_statements = max_statements
+    self.statements = []
+    self.dropped = 0
+    self.dropped_seconds = 0.0
+
+  def add(self, sql, parameters, seconds, rows):
+    if len(self.statements) >= self.max_statements:
+      self.dropped += 1
+      self.dropped_seconds += seconds
+      return None
+    statement = {'sql': sql, 'parameters': parameters, 'seconds': seconds, 'rows': rows}
+    self.statements.append(statement)
+    return statement
+
+  def fetched(self, statement, seconds, rows):
+    if statement is None:
+      self.dropped_seconds += seconds
+      return
+    statement['seconds'] += seconds
+    statement['rows'] += rows
+
+class TracingCursor(sqlite3.Cursor):
+  """Cursor that times its statements and counts their rows into a SqlTrace.
+
+  A statement's time covers its execute and every fetch of its rows, since
+  SQLite produces most rows of a query while they are fetched. Its rows are
+  the rows fetched for a query, or the rows changed for a write.
+  """
+
+  def __init__(self, connection, trace):
+    super().__init__(connection)
+    self._trace = trace
+    self._statement = None
+
+  def _executed(self, sql, parameters, started):
+    seconds = time.perf_counter() - started
+    rows = self.rowcount if self.rowcount > 0 else 0
+    self._statement = self._trace.add(sql, parameters, seconds, rows)
+
+  def execute(self, sql, parameters=()):
+    started = time.perf_counter()
+    try:
+      return super().execute(sql, parameters)
+    finally:
+      self._executed(sql, parameters, started)
+
+  def executemany(self, sql, seq_of_parameters):
+    # Keep the first parameter set to explain the statement with
+    seq_of_parameters = iter(seq_of_parameters)
+    first = next(seq_of_parameters, None)
+    if first is not None:
+      seq_of_parameters = itertools.chain([first], seq_of_parameters)
+    started = time.perf_counter()
+    try:
+      return super().executemany(sql, seq_of_parameters)
+    finally:
+      self._executed(sql, first or (), started)
+
+  def fetchone(self):
+    started = time.perf_counter()
+    row = super().fetchone()
+    self._trace.fetched(self._statement, time.perf_counter() - started, int(row is not None))
+    return row
+
+  def fetchmany(self, size=None):
+    started = time.perf_counter()
+    rows = super().fetchmany(self.arraysize if size is None else size)
+    self._trace.fetched(self._statement, time.perf_counter() - started, len(rows))
+    return rows
+
+  def fetchall(self):
+    started = time.perf_counter()
+    rows = super().fetchall()
+    self._trace.fetched(self._statement, time.perf_counter() - started, len(rows))
+    return rows
+
+  def __next__(self):
+    started = time.perf_counter()
+    row = super().__next__()
+    self._trace.fetched(self._statement, time.perf_counter() - started, 1)
+    return row
+
+def query_plan(cursor, sql, parameters):
+  """EXPLAIN QUERY PLAN of a statement as indented lines, like the sqlite3 shell."""
+  if not sql.lstrip().upper().startswith(EXPLAINABLE):
+    return []
+  try:
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, parameters)
+    rows = cursor.fetchall()
+  except (sqlite3.Error, ValueError) as e:
+    # E.g. a temporary table the request already dropped
+    return [f'(no plan: {e})']
+
+  depths = {0: -1}
+  lines = []
+  for node_id, parent, _, detail in rows:
+    depths[node_id] = depths.get(parent, -1) + 1
+    lines.append('  ' * depths[node_id] + detail)
+  return lines
+
+class SlowRequestSampler:
+  """Keep the last slow requests with the SQL they ran and its query plans.
+
+  Every request traces its statements (time and rows) through the Db
+  cursor, which costs a clock read per execute and fetch. Only requests
+  taking threshold_ms or longer are kept: their statements are explained
+  on the request's own connection and the entry goes into a ring buffer
+  of max_entries, and into log_path (one JSON line per request) if set.
+
+  Bound parameters are user data, so entries only include them with
+  capture_parameters=True; they are still used to explain statements.
+  """
+
+  def __init__(self, threshold_ms=500, max_entries=100, max_statements=200, log_path=None,
+               capture_parameters=False):
+    self.threshold_ms = threshold_ms
+    self.max_statements = max_statements
+    self.log_path = log_path
+    self.capture_parameters = capture_parameters
+    self._entries = deque(maxlen=max_entries)
+    self._lock = threading.Lock()
+    self._ids = itertools.count(1)
+    self.sampled = 0
+
+  def init_app(self, app, exclude=('/api/admin/',)):
+    """Trace the app's requests, except paths starting with one of exclude."""
+
+    @app.before_request
+    def start_sql_trace():
+      if not request.path.startswith(exclude):
+        g.request_started = time.perf_counter()
+        g.sql_trace = SqlTrace(self.max_statements)
+
+    @app.after_request
+    def keep_status(response):
+      g.response_status = response.status_code
+      return response
+
+    # Runs before the app context closes the request's connection
+    @app.teardown_request
+    def sample_slow_request(exception):
+      if is_subrequest():
+        return
+      trace = g.pop('sql_trace', None)
+      if trace is None:
+        return
+      duration_ms = (time.perf_counter() - g.request_started) * 1000
+      if duration_ms < self.threshold_ms:
+        return
+      try:
+        self.record(self.build_entry(app.db, trace, duration_ms,
+                                     g.get('response_status', 500), exception))
+      except Exception as e:
+        logger.warning(f"Could not sample slow request {request.path}: {e}")
+
+  def build_entry(self, db, trace, duration_ms, status, exception=None):
+    plans = {}
+    statements = []
+    for statement in trace.statements:
+      sql = statement['sql']
+      if sql not in plans:
+        plans[sql] = query_plan(db.cursor(), sql, statement['parameters'])
+      entry = {
+        'sql': ' '.join(sql.split()),
+        'duration_ms': round(statement['seconds'] * 1000, 3),
+        'rows': statement['rows'],
+        'plan': plans[sql]
+      }
+      if self.capture_parameters:
+        parameters = statement['parameters']
+        entry['parameters'] = ({key: _loggable(value) for key, value in parameters.items()}
+                               if isinstance(parameters, dict)
+                               else [_loggable(value) for value in parameters])
+      statements.append(entry)
+
+    return {
+      'method': request.method,
+      'path': request.path,
+      'query_string': request.query_string.decode(errors='replace'),
+      'status': status,
+      'error': str(exception) if exception is not None else None,
+      'started_at': (datetime.now(UTC) - timedelta(milliseconds=duration_ms)).isoformat(),
+      'duration_ms': round(duration_ms, 3),
+      'sql_ms': round(sum(s['seconds'] for s in trace.statements) * 1000
+                      + trace.dropped_seconds * 1000, 3),
+      'statements': statements,
+      'statements_dropped': trace.dropped
+    }
+
+  def record(self, entry):
+    with self._lock:
+      entry = {'id': next(self._ids), **entry}
+      self._entries.append(entry)
+      self.sampled += 1
+      if self.log_path:
+        with open(self.log_path, 'a') as file:
+          file.write(json.dumps(entry) + '\n')
+    return entry
+
+  def entries(self, limit=None):
+    """Kept entries, newest first."""
+    with self._lock:
+      entries = list(reversed(self._entries))
+    return entries[:limit] if limit is not None else entries
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self):
+    with self._lock:
+      return {
+        'threshold_ms': self.threshold_ms,
+        'sampled': self.sampled,
+        'kept': len(self._entries)
+      }
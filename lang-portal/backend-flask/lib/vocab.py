@@ -0,0 +1,40 @@
+# Read-mostly tables kept in the vocabulary database in the split layout
+VOCAB_TABLES = ('words', 'groups', 'word_groups', 'study_activities')
+VOCAB_SCHEMA = 'vocab'
+
+# Error for requests that would write the vocabulary in the split layout
+VOCAB_READ_ONLY_ERROR = ("The vocabulary is read-only while served from VOCAB_DATABASE; "
+                         "change it with cmd/migrate.py --vocab and restart")
+
+# The whole vocabulary of a typical deployment fits; pages are shared by
+# every connection and worker through the OS page cache
+DEFAULT_VOCAB_MMAP_SIZE = 256 * 1024 * 1024
+
+def vocab_uri(path, readonly=True, immutable=False):
+  """URI to attach a vocabulary database file with.
+
+  immutable=True also skips all locking and change detection, so it is
+  only safe while nothing writes the file.
+  """
+  path = str(path)
+  if path.startswith('file:'):
+    return path
+  options = []
+  if readonly:
+    options.append('mode=ro')
+  if immutable:
+    options.append('immutable=1')
+  return f"file:{path}" + (f"?{'&'.join(options)}" if options else '')
+
+def attach_vocab(connection, path, readonly=True, immutable=False, mmap_size=DEFAULT_VOCAB_MMAP_SIZE):
+  """Attach the vocabulary database to connection as the vocab schema.
+
+  The vocabulary tables are only in that schema, so unqualified names in
+  queries resolve to them and joins with the history tables in main work
+  unchanged.
+  """
+  connection.execute(f'ATTACH DATABASE ? AS {VOCAB_SCHEMA}',
+                     (vocab_uri(path, readonly=readonly, immutable=immutable),))
+  if mmap_size:
+    connection.execute(f'PRAGMA {VOCAB_SCHEMA}.mmap_size = {int(mmap_size)}').fetchall()
+  return connection
@@ -0,0 +1,83 @@
+from flask import request, jsonify
+from flask_cors import cross_origin
+from lib.batch import dispatch_subrequest
+
+# Sub-requests per batch
+MAX_BATCH_REQUESTS = 20
+
+# Streams never finish and a batch cannot contain itself
+BATCH_EXCLUDED_PATHS = ('/api/events', '/api/batch')
+
+def parse_batch(data):
+  """Paths of the sub-requests in a batch body.
+
+  Raises:
+    ValueError: If the body is not {"requests": [{"path": ...}, ...]}
+      with GET requests to local paths
+  """
+  if not isinstance(data, dict) or not isinstance(data.get('requests'), list):
+    raise ValueError("Body must be {\"requests\": [{\"path\": ...}, ...]}")
+  items = data['requests']
+  if not items:
+    raise ValueError("requests must not be empty")
+  if len(items) > MAX_BATCH_REQUESTS:
+    raise ValueError(f"At most {MAX_BATCH_REQUESTS} requests per batch")
+
+  paths = []
+  for index, item in enumerate(items):
+    if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+      raise ValueError(f"Request {index}: path must be a string")
+    if item.get('method', 'GET').upper() != 'GET':
+      raise ValueError(f"Request {index}: only GET requests can be batched")
+    path = item['path']
+    if not path.startswith('/') or path.startswith('//'):
+      raise ValueError(f"Request {index}: path must start with a single /")
+    if path.split('?', 1)[0].rstrip('/').startswith(BATCH_EXCLUDED_PATHS):
+      raise ValueError(f"Request {index}: {path} cannot be batched")
+    paths.append(path)
+  return paths
+
+def load(app):
+  @app.route('/api/batch', methods=['POST'])
+  @cross_origin()
+  def post_batch():
+    """Run several GET requests in one round trip.
+
+    Accepts JSON {"requests": [{"path": "/dashboard/stats"}, ...]}. The
+    sub-requests run in order on one connection inside one read
+    transaction, so they all see the same snapshot of the database.
+
+    Returns:
+        tuple: (JSON {"responses": [{"path", "status", "body"}, ...]}, HTTP status code)
+    """
+    try:
+      try:
+        paths = parse_batch(request.get_json(silent=True))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      cursor = app.db.cursor()
+      # Deferred: the snapshot is taken by the first read and kept until COMMIT
+      cursor.execute('BEGIN')
+      try:
+        responses = []
+        for path in paths:
+          try:
+            response = dispatch_subrequest(app, path)
+          except Exception as e:
+            responses.append({'path': path, 'status': 500, 'body': {"error": str(e)}})
+            continue
+          # Sub-requests send no Accept-Encoding, so packs come back as plain JSON
+          if response.is_streamed or not response.is_json:
+            response.close()
+            responses.append({'path': path, 'status': 406,
+                              'body': {"error": "Only JSON responses can be batched"}})
+            continue
+          responses.append({'path': path, 'status': response.status_code, 'body': response.get_json()})
+      finally:
+        # Ends the read transaction; the sub-requests only read
+        app.db.commit()
+
+      return jsonify({'responses': responses}), 200
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
@@ -0,0 +1,38 @@
+from flask import request, jsonify
+from flask_cors import cross_origin
+from services.change_feed_service import ChangeFeedService
+
+def load(app):
+  @app.route('/api/changes', methods=['GET'])
+  @cross_origin()
+  def get_changes():
+    """Get changes to words, groups, memberships, sessions and stats.
+
+    Query params:
+        since: Last seq the client has applied (default 0)
+        limit: Maximum changes to return (default 500)
+
+    Clients store next_since and pass it back on their next call. When
+    resync_required is true they must reload everything first.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', 500))
+
+        service = ChangeFeedService(app.db)
+        page = service.get_changes(since, limit)
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      return jsonify({
+        'changes': page.changes,
+        'next_since': page.next_since,
+        'has_more': page.has_more,
+        'resync_required': page.resync_required
+      })
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import jsonify
 from flask_cors import cross_origin
 from datetime import datetime, timedelta
+from lib.singleflight import coalesce
 
 def load(app):
     @app.route('/dashboard/recent-session', methods=['GET'])
@@ -43,16 +44,31 @@ def load(app):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    @app.route('/dashboard/stats', methods=['GET'])
-    @cross_origin()
-    def get_study_stats():
-        try:
-            cursor = app.db.cursor()
-            
-            # Get total vocabulary count
-            cursor.execute('SELECT COUNT(*) as total_vocabulary FROM words')
-            total_vocabulary = cursor.fetchone()["total_vocabulary"]
+    def study_stats():
+        """Compute the dashboard statistics."""
+        cursor = app.db.cursor()
+
+        # Get total vocabulary count
+        cursor.execute('SELECT COUNT(*) as total_vocabulary FROM words')
+        total_vocabulary = cursor.fetchone()["total_vocabulary"]
 
+        analytics = getattr(app, 'analytics', None)
+        if analytics is not None:
+            # Columnar engine: one incremental refresh, then vectorized
+            # aggregates over reviews that still have a session
+            analytics.refresh(app.db)
+            session_ids = []
+            if analytics.session_bounds is not None:
+                # Only sessions the loaded reviews can refer to
+                cursor.execute('SELECT id FROM study_sessions WHERE id BETWEEN ? AND ?',
+                               analytics.session_bounds)
+                session_ids = [row[0] for row in cursor.fetchall()]
+            summary = analytics.summary(session_ids=session_ids)
+            total_words = summary['total_words_studied']
+            mastered_words = summary['mastered_words']
+            success_rate = summary['success_rate']
+            total_reviews = summary['total_reviews']
+        else:
             # Get total unique words studied
             cursor.execute('''
                 SELECT COUNT(DISTINCT word_id) as total_words
@@ -60,7 +76,7 @@ def load(app):
                 JOIN study_sessions ss ON wri.study_session_id = ss.id
             ''')
             total_words = cursor.fetchone()["total_words"]
-            
+
             # Get mastered words (words with >80% success rate and at least 5 attempts)
             cursor.execute('''
                 WITH word_stats AS (
@@ -78,62 +94,73 @@ def load(app):
                 WHERE success_rate >= 0.8
             ''')
             mastered_words = cursor.fetchone()["mastered_words"]
-            
+
             # Get overall success rate
             cursor.execute('''
                 SELECT 
-                    SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as success_rate
+                    SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as success_rate,
+                    COUNT(*) as total_reviews
                 FROM word_review_items wri
                 JOIN study_sessions ss ON wri.study_session_id = ss.id
             ''')
-            success_rate = cursor.fetchone()["success_rate"] or 0
-            
-            # Get total number of study sessions
-            cursor.execute('SELECT COUNT(*) as total_sessions FROM study_sessions')
-            total_sessions = cursor.fetchone()["total_sessions"]
-            
-            # Get number of groups with activity in the last 30 days
-            cursor.execute('''
-                SELECT COUNT(DISTINCT group_id) as active_groups
+            row = cursor.fetchone()
+            success_rate = row["success_rate"] or 0
+            total_reviews = row["total_reviews"]
+
+        # Get total number of study sessions
+        cursor.execute('SELECT COUNT(*) as total_sessions FROM study_sessions')
+        total_sessions = cursor.fetchone()["total_sessions"]
+
+        # Get number of groups with activity in the last 30 days
+        cursor.execute('''
+            SELECT COUNT(DISTINCT group_id) as active_groups
+            FROM study_sessions
+            WHERE created_at >= date('now', '-30 days')
+        ''')
+        active_groups = cursor.fetchone()["active_groups"]
+
+        # Calculate current streak (consecutive days with at least one study session)
+        cursor.execute('''
+            WITH daily_sessions AS (
+                SELECT 
+                    date(created_at) as study_date,
+                    COUNT(*) as session_count
                 FROM study_sessions
-                WHERE created_at >= date('now', '-30 days')
-            ''')
-            active_groups = cursor.fetchone()["active_groups"]
-            
-            # Calculate current streak (consecutive days with at least one study session)
-            cursor.execute('''
-                WITH daily_sessions AS (
-                    SELECT 
-                        date(created_at) as study_date,
-                        COUNT(*) as session_count
-                    FROM study_sessions
-                    GROUP BY date(created_at)
-                ),
-                streak_calc AS (
-                    SELECT 
-                        study_date,
-                        julianday(study_date) - julianday(lag(study_date, 1) over (order by study_date)) as days_diff
-                    FROM daily_sessions
-                )
-                SELECT COUNT(*) as streak
-                FROM (
-                    SELECT study_date
-                    FROM streak_calc
-                    WHERE days_diff = 1 OR days_diff IS NULL
-                    ORDER BY study_date DESC
-                )
-            ''')
-            current_streak = cursor.fetchone()["streak"]
-            
-            return jsonify({
-                "total_vocabulary": total_vocabulary,
-                "total_words_studied": total_words,
-                "mastered_words": mastered_words,
-                "success_rate": success_rate,
-                "total_sessions": total_sessions,
-                "active_groups": active_groups,
-                "current_streak": current_streak
-            })
+                GROUP BY date(created_at)
+            ),
+            streak_calc AS (
+                SELECT 
+                    study_date,
+                    julianday(study_date) - julianday(lag(study_date, 1) over (order by study_date)) as days_diff
+                FROM daily_sessions
+            )
+            SELECT COUNT(*) as streak
+            FROM (
+                SELECT study_date
+                FROM streak_calc
+                WHERE days_diff = 1 OR days_diff IS NULL
+                ORDER BY study_date DESC
+            )
+        ''')
+        current_streak = cursor.fetchone()["streak"]
+
+        return {
+            "total_vocabulary": total_vocabulary,
+            "total_words_studied": total_words,
+            "mastered_words": mastered_words,
+            "success_rate": success_rate,
+            "total_reviews": total_reviews,
+            "total_sessions": total_sessions,
+            "active_groups": active_groups,
+            "current_streak": current_streak
+        }
+
+    @app.route('/dashboard/stats', methods=['GET'])
+    @cross_origin()
+    def get_study_stats():
+        try:
+            # Concurrent dashboards share one computation per data version
+            return jsonify(coalesce(app, 'dashboard_stats', (), study_stats))
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -0,0 +1,51 @@
+from flask import Response, jsonify
+from flask_cors import cross_origin
+from lib.events import TooManySubscribersError, format_sse
+
+def load(app):
+  @app.route('/api/events', methods=['GET'])
+  @cross_origin()
+  def get_events():
+    """Stream dashboard updates as Server-Sent Events.
+
+    Events:
+        session: A study session was created (recent-session payload)
+        review: A word was reviewed, with the session's running counts
+        stats: Deltas to apply to the /dashboard/stats payload
+        resync: The client fell behind; refetch instead of applying deltas
+
+    Returns:
+        Response: text/event-stream, or (JSON error, 503) when full
+    """
+    try:
+      subscription = app.events.subscribe()
+    except TooManySubscribersError as e:
+      return jsonify({"error": str(e)}), 503
+    try:
+      # Stops by itself once the last subscriber has gone
+      app.event_tail.start()
+    except Exception as e:
+      app.events.unsubscribe(subscription)
+      return jsonify({"error": str(e)}), 500
+
+    heartbeat = app.config.get('EVENTS_HEARTBEAT', 15)
+
+    def stream():
+      try:
+        # Reconnect quickly if the connection drops
+        yield 'retry: 3000\n\n'
+        while True:
+          message = subscription.get(timeout=heartbeat)
+          if message is None:
+            # Comment line: keeps proxies from closing an idle connection
+            yield ': keepalive\n\n'
+            continue
+          event_id, event, data = message
+          yield format_sse(data, event=event, event_id=event_id)
+      finally:
+        app.events.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+      'Cache-Control': 'no-cache',
+      'X-Accel-Buffering': 'no'
+    })
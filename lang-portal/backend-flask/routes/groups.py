@@ -1,7 +1,41 @@
-from flask import request, jsonify, g
+from flask import request, jsonify, g, Response
 from flask_cors import cross_origin
 import json
-from services.group_service import GroupService
+import csv
+import io
+from services.group_service import (
+  GroupService,
+  GROUP_FIELDS,
+  GROUP_WORD_FIELDS,
+  GROUP_SESSION_FIELDS
+)
+from services.group_pack_service import GroupPackService
+from lib.vocab import VOCAB_READ_ONLY_ERROR
+from services.word_service import WordService
+from lib.singleflight import coalesce
+from lib.fields import parse_fields
+
+def csv_word_rows(stream):
+  """Yield (spanish, english) pairs from a CSV upload with a header row."""
+  reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+  header = [column.strip().lower() for column in next(reader, [])]
+  if 'spanish' not in header or 'english' not in header:
+    raise ValueError("CSV header must include spanish and english columns")
+  spanish, english = header.index('spanish'), header.index('english')
+  for record in reader:
+    if not any(field.strip() for field in record):
+      continue
+    yield (record[spanish] if spanish < len(record) else '',
+           record[english] if english < len(record) else '')
+
+def json_word_rows(data):
+  """Yield (spanish, english) pairs from a JSON array of word objects."""
+  if not isinstance(data, list):
+    raise ValueError("Body must be a JSON array of {spanish, english} objects")
+  for word in data:
+    if not isinstance(word, dict):
+      raise ValueError("Body must be a JSON array of {spanish, english} objects")
+    yield (word.get('spanish'), word.get('english'))
 
 def load(app):
   @app.route('/api/groups', methods=['GET'])
@@ -12,9 +46,13 @@ def load(app):
       per_page = int(request.args.get('per_page', 10))
       sort_by = request.args.get('sort_by', 'name')
       order = request.args.get('order', 'asc')
+      try:
+        fields = parse_fields(request.args.get('fields'), list(GROUP_FIELDS))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
       
       service = GroupService(app.db)
-      result = service.get_groups(page, per_page, sort_by, order)
+      result = service.get_groups(page, per_page, sort_by, order, fields)
       
       return jsonify({
         'groups': result.items,
@@ -35,7 +73,12 @@ def load(app):
 
       # Get group details
       cursor.execute('''
-        SELECT id, name, words_count
+        SELECT
+          id,
+          name,
+          COALESCE(words_count,
+            (SELECT COUNT(*) FROM word_groups wg WHERE wg.group_id = groups.id)
+          ) AS words_count
         FROM groups
         WHERE id = ?
       ''', (id,))
@@ -60,9 +103,15 @@ def load(app):
       per_page = int(request.args.get('per_page', 10))
       sort_by = request.args.get('sort_by', 'spanish')
       order = request.args.get('order', 'asc')
+      try:
+        fields = parse_fields(request.args.get('fields'), list(GROUP_WORD_FIELDS))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
       
+      # Classes open the same group at once: share one query per data version
       service = GroupService(app.db)
-      result = service.get_group_words(id, page, per_page, sort_by, order)
+      result = coalesce(app, 'group_words', (id, page, per_page, sort_by, order, tuple(fields)),
+                        lambda: service.get_group_words(id, page, per_page, sort_by, order, fields))
       
       if result is None:
         return jsonify({"error": "Group not found"}), 404
@@ -107,6 +156,135 @@ def load(app):
     except Exception as e:
       return jsonify({"error": str(e)}), 500
 
+  @app.route('/api/groups/<int:id>/words/sample', methods=['GET'])
+  @cross_origin()
+  def sample_group_words(id):
+    """Get a random sample of words from a group.
+
+    Query params:
+        n: Number of words to return (default 4)
+        weight: 'uniform' (default) or 'weak' to favour often-missed words
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      try:
+        n = int(request.args.get('n', 4))
+        weight = request.args.get('weight', 'uniform')
+
+        service = GroupService(app.db)
+        words = service.sample_group_words(id, n, weight)
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      if words is None:
+        return jsonify({"error": "Group not found"}), 404
+
+      return jsonify({'words': words})
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/groups/<int:id>/words/hardest', methods=['GET'])
+  @cross_origin()
+  def get_group_hardest_words(id):
+    """Get the group's words with the highest smoothed error rate.
+
+    Query params:
+        n: Number of words to return (default 10)
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      try:
+        n = int(request.args.get('n', 10))
+        words = WordService(app.db).hardest_words(n, group_id=id)
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      if words is None:
+        return jsonify({"error": "Group not found"}), 404
+
+      return jsonify({'words': words})
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/groups/<int:id>/pack', methods=['GET'])
+  @cross_origin()
+  def get_group_pack(id):
+    """Get a group's words and stats as one gzip-compressed JSON bundle.
+
+    The ETag is a hash of the content, so clients revalidate with
+    If-None-Match and get a 304 until the group's words change. Requests
+    that pin the current hash with ?v=<etag> may cache it forever.
+
+    Args:
+        id (int): The group ID
+
+    Returns:
+        Response: The pack, a 304, or (JSON error, HTTP status code)
+    """
+    try:
+      service = GroupPackService(app.db, getattr(app, 'packs', None))
+      pack = service.get_pack(id)
+      if pack is None:
+        return jsonify({"error": "Group not found"}), 404
+
+      if request.if_none_match.contains(pack.etag):
+        response = Response(status=304)
+      elif request.accept_encodings['gzip']:
+        response = Response(pack.body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+      else:
+        response = Response(pack.json_bytes(), mimetype='application/json')
+
+      response.set_etag(pack.etag)
+      response.headers['Vary'] = 'Accept-Encoding'
+      if request.args.get('v') == pack.etag:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+      else:
+        response.headers['Cache-Control'] = 'no-cache'
+      return response
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/groups/<int:id>/words:bulk', methods=['POST'])
+  @cross_origin()
+  def bulk_add_group_words(id):
+    """Add many words to a group, creating the ones that don't exist yet.
+
+    Accepts a JSON array of {"spanish", "english"} objects, or a CSV body
+    (Content-Type: text/csv) with spanish and english header columns,
+    which is read as a stream. The import is all or nothing.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      if getattr(app.db, 'vocab_database', None):
+        return jsonify({"error": VOCAB_READ_ONLY_ERROR}), 409
+
+      if request.mimetype == 'application/json':
+        rows = json_word_rows(request.get_json(silent=True))
+      elif request.mimetype == 'text/csv':
+        rows = csv_word_rows(request.stream)
+      else:
+        return jsonify({"error": "Content-Type must be application/json or text/csv"}), 415
+
+      service = GroupService(app.db)
+      try:
+        result = service.bulk_add_words(id, rows)
+      except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+      if result is None:
+        return jsonify({"error": "Group not found"}), 404
+
+      return jsonify(result), 200
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
   @app.route('/groups/<int:id>/study_sessions', methods=['GET'])
   @cross_origin()
   def get_group_study_sessions(id):
@@ -115,9 +293,13 @@ def load(app):
       per_page = 10
       sort_by = request.args.get('sort_by', 'created_at')
       order = request.args.get('order', 'desc')
+      try:
+        fields = parse_fields(request.args.get('fields'), list(GROUP_SESSION_FIELDS))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
       
       service = GroupService(app.db)
-      result = service.get_group_study_sessions(id, page, per_page, sort_by, order)
+      result = service.get_group_study_sessions(id, page, per_page, sort_by, order, fields)
       
       if result is None:
         return jsonify({"error": "Group not found"}), 404
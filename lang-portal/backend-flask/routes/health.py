@@ -0,0 +1,14 @@
+from flask import jsonify
+
+def load(app):
+  @app.route('/health/live', methods=['GET'])
+  def health_live():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({"status": "ok"}), 200
+
+  @app.route('/health/ready', methods=['GET'])
+  def health_ready():
+    """Readiness probe: only report ready once warmup has finished."""
+    if not getattr(app, 'ready', True):
+      return jsonify({"status": "warming"}), 503
+    return jsonify({"status": "ready"}), 200
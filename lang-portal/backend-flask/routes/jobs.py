@@ -0,0 +1,57 @@
+from flask import request, jsonify
+from flask_cors import cross_origin
+from lib.jobs import UnknownJobTypeError, JobQueueFullError, FINISHED_STATES
+
+def load(app):
+  @app.route('/api/jobs/<job_type>', methods=['POST'])
+  @cross_origin()
+  def create_job(job_type):
+    """Queue a background job.
+
+    Accepts an optional JSON object with the job's parameters.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      params = request.get_json(silent=True) or {}
+      if not isinstance(params, dict):
+        return jsonify({"error": "Job parameters must be a JSON object"}), 400
+
+      job = app.jobs.submit(job_type, params)
+      return jsonify(job), 202
+    except UnknownJobTypeError as e:
+      return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+      return jsonify({"error": str(e)}), 400
+    except JobQueueFullError as e:
+      return jsonify({"error": str(e)}), 503
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/jobs/<int:job_id>', methods=['GET'])
+  @cross_origin()
+  def get_job(job_id):
+    """Get a job's state, progress, result and error."""
+    try:
+      job = app.jobs.get(job_id)
+      if job is None:
+        return jsonify({"error": "Job not found"}), 404
+      return jsonify(job)
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+  @cross_origin()
+  def cancel_job(job_id):
+    """Cancel a queued or running job."""
+    try:
+      job = app.jobs.get(job_id)
+      if job is None:
+        return jsonify({"error": "Job not found"}), 404
+      if job['state'] in FINISHED_STATES:
+        return jsonify({"error": f"Job already {job['state']}"}), 409
+
+      return jsonify(app.jobs.cancel(job_id)), 202
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
@@ -0,0 +1,78 @@
+import hmac
+from flask import request, jsonify
+from flask_cors import cross_origin
+
+def check_admin_token(app):
+  """Error response unless the request is authorized for admin endpoints.
+
+  Admin endpoints exist only when ADMIN_TOKEN is configured, and need it
+  as "Authorization: Bearer <token>".
+
+  Returns:
+      tuple: (JSON response, HTTP status code), or None when authorized
+  """
+  token = app.config.get('ADMIN_TOKEN')
+  if not token:
+    return jsonify({"error": "Not found"}), 404
+  supplied = request.headers.get('Authorization', '')
+  if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+    return jsonify({"error": "Admin token required"}), 403
+  return None
+
+def load(app):
+  @app.route('/api/metrics', methods=['GET'])
+  @cross_origin()
+  def get_metrics():
+    """Get this worker's runtime counters.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    flight = getattr(app, 'singleflight', None)
+    sampler = getattr(app, 'slow_requests', None)
+    profiler = getattr(app, 'profiler', None)
+    budgets = getattr(app, 'query_budgets', None)
+    limiter = getattr(app, 'rate_limiter', None)
+    return jsonify({
+      'singleflight': flight.stats() if flight is not None else {},
+      'slow_requests': sampler.stats() if sampler is not None else {},
+      'profiler': profiler.stats() if profiler is not None else {},
+      'query_budgets': budgets.stats() if budgets is not None else {},
+      'rate_limits': limiter.stats() if limiter is not None else {}
+    }), 200
+
+  # No CORS: not for browsers, and POST clears the buffer
+  @app.route('/api/admin/slow-requests', methods=['GET', 'POST'])
+  def get_slow_requests():
+    """Get this worker's recent slow requests, newest first.
+
+    Each entry lists the request's SQL statements with their duration,
+    row count and query plan. POST clears the buffer. Needs ADMIN_TOKEN
+    (see check_admin_token).
+
+    Query Parameters:
+        limit (int): Maximum number of entries to return (default: all kept)
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    error = check_admin_token(app)
+    if error is not None:
+      return error
+
+    sampler = getattr(app, 'slow_requests', None)
+    if sampler is None:
+      return jsonify({"error": "Slow request sampling is disabled"}), 404
+
+    if request.method == 'POST':
+      sampler.clear()
+      return jsonify(sampler.stats()), 200
+
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 0:
+      return jsonify({"error": "limit must not be negative"}), 400
+
+    return jsonify({
+      **sampler.stats(),
+      'requests': sampler.entries(limit)
+    }), 200
@@ -2,6 +2,7 @@ from flask import jsonify, request, current_app
 from flask_cors import cross_origin
 import math
 from services.study_activity_service import StudyActivityService
+from lib.vocab import VOCAB_READ_ONLY_ERROR
 import traceback
 
 def load(app):
@@ -36,6 +37,9 @@ def load(app):
     @app.route('/api/study-activities', methods=['POST'])
     @cross_origin()
     def create_study_activity():
+        if getattr(app.db, 'vocab_database', None):
+            return jsonify({'error': VOCAB_READ_ONLY_ERROR}), 409
+
         data = request.get_json()
         
         # Validate required fields
@@ -2,9 +2,19 @@ from flask import request, jsonify, g
 from flask_cors import cross_origin
 from datetime import datetime
 import math
+import uuid
 from contextlib import contextmanager
-from services.study_session_service import StudySessionService
+from services.study_session_service import (
+    StudySessionService,
+    ResetInProgressError,
+    ReviewConflictError,
+    ResetProgress,
+    RESET_BATCH_SIZE
+)
 import traceback
+from lib.jobs import JobQueueFullError
+from services.job_handlers import validate_reset_history
+from lib.fields import parse_fields, select_list, project
 
 # Constants for error messages
 ERROR_MESSAGES = {
@@ -22,6 +32,27 @@ ERROR_MESSAGES = {
     'INVALID_CONTENT_TYPE': "Content-Type must be application/json"
 }
 
+# Fields of the session and session word listings (for fields=) and the SQL
+# computing them; review counts are only aggregated when asked for
+SESSION_FIELDS = {
+    'id': 'ss.id',
+    'group_id': 'ss.group_id',
+    'group_name': 'g.name',
+    'activity_id': 'sa.id',
+    'activity_name': 'sa.name',
+    'start_time': 'ss.created_at',
+    'end_time': 'ss.created_at',  # For now, just use the same time since we don't track end time
+    'review_items_count': '''(SELECT COUNT(*) FROM word_review_items wri
+        WHERE wri.study_session_id = ss.id)'''
+}
+SESSION_WORD_FIELDS = {
+    'id': 'w.id',
+    'spanish': 'w.spanish',
+    'english': 'w.english',
+    'correct_count': 'SUM(CASE WHEN wri.correct = 1 THEN 1 ELSE 0 END)',
+    'wrong_count': 'SUM(CASE WHEN wri.correct = 0 THEN 1 ELSE 0 END)'
+}
+
 @contextmanager
 def transaction(db):
     """Context manager for database transactions.
@@ -74,14 +105,15 @@ def load(app):
                 "error": "Group or study activity not found"
             }), 404
         
-        return jsonify({
+        payload = {
             'id': session.id,
             'group_id': session.group_id,
             'study_activity_id': session.study_activity_id,
             'created_at': session.created_at,
             'group_name': session.group_name,
             'activity_name': session.activity_name
-        }), 201
+        }
+        return jsonify(payload), 201
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -96,6 +128,10 @@ def load(app):
       page = request.args.get('page', 1, type=int)
       per_page = request.args.get('per_page', 10, type=int)
       offset = (page - 1) * per_page
+      try:
+        fields = parse_fields(request.args.get('fields'), list(SESSION_FIELDS))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
       # Get total count
       cursor.execute('''
@@ -107,36 +143,17 @@ def load(app):
       total_count = cursor.fetchone()['count']
 
       # Get paginated sessions
-      cursor.execute('''
-        SELECT 
-          ss.id,
-          ss.group_id,
-          g.name as group_name,
-          sa.id as activity_id,
-          sa.name as activity_name,
-          ss.created_at,
-          COUNT(wri.id) as review_items_count
+      cursor.execute(f'''
+        SELECT {select_list(fields, SESSION_FIELDS)}
         FROM study_sessions ss
         JOIN groups g ON g.id = ss.group_id
         JOIN study_activities sa ON sa.id = ss.study_activity_id
-        LEFT JOIN word_review_items wri ON wri.study_session_id = ss.id
-        GROUP BY ss.id
         ORDER BY ss.created_at DESC
         LIMIT ? OFFSET ?
       ''', (per_page, offset))
-      sessions = cursor.fetchall()
 
       return jsonify({
-        'items': [{
-          'id': session['id'],
-          'group_id': session['group_id'],
-          'group_name': session['group_name'],
-          'activity_id': session['activity_id'],
-          'activity_name': session['activity_name'],
-          'start_time': session['created_at'],
-          'end_time': session['created_at'],  # For now, just use the same time since we don't track end time
-          'review_items_count': session['review_items_count']
-        } for session in sessions],
+        'items': project(cursor.fetchall(), fields),
         'total': total_count,
         'page': page,
         'per_page': per_page,
@@ -177,13 +194,14 @@ def load(app):
       page = request.args.get('page', 1, type=int)
       per_page = request.args.get('per_page', 10, type=int)
       offset = (page - 1) * per_page
+      try:
+        fields = parse_fields(request.args.get('fields'), list(SESSION_WORD_FIELDS))
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
       # Get the words reviewed in this session with their review status
-      cursor.execute('''
-        SELECT 
-          w.*,
-          COALESCE(SUM(CASE WHEN wri.correct = 1 THEN 1 ELSE 0 END), 0) as session_correct_count,
-          COALESCE(SUM(CASE WHEN wri.correct = 0 THEN 1 ELSE 0 END), 0) as session_wrong_count
+      cursor.execute(f'''
+        SELECT {select_list(fields, SESSION_WORD_FIELDS)}
         FROM words w
         JOIN word_review_items wri ON wri.word_id = w.id
         WHERE wri.study_session_id = ?
@@ -215,13 +233,7 @@ def load(app):
           'end_time': session['created_at'],  # For now, just use the same time
           'review_items_count': session['review_items_count']
         },
-        'words': [{
-          'id': word['id'],
-          'spanish': word['spanish'],
-          'english': word['english'],
-          'correct_count': word['session_correct_count'],
-          'wrong_count': word['session_wrong_count']
-        } for word in words],
+        'words': project(words, fields),
         'total': total_count,
         'page': page,
         'per_page': per_page,
@@ -233,21 +245,48 @@ def load(app):
   @app.route('/api/study_sessions/<int:session_id>/words/<int:word_id>/review', methods=['POST'])
   @cross_origin()
   def review_word(session_id, word_id):
+    """Record a review of a word in a study session.
+
+    Accepts JSON with correct and an optional client-generated review_uuid.
+    Resubmitting a review with the same review_uuid returns the original
+    review ("replayed": true) instead of counting it again, so clients can
+    retry freely.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
     try:
         data = request.get_json()
         if 'correct' not in data:
             return jsonify({
                 "error": "Missing required field: correct"
             }), 400
+
+        review_uuid = data.get('review_uuid')
+        if review_uuid is not None:
+            try:
+                if not isinstance(review_uuid, str):
+                    raise ValueError
+                review_uuid = str(uuid.UUID(review_uuid))
+            except ValueError:
+                return jsonify({
+                    "error": "review_uuid must be a UUID string"
+                }), 400
         
         service = StudySessionService(app.db)
-        result = service.review_word(session_id, word_id, data['correct'])
+        try:
+            result = service.review_word(session_id, word_id, data['correct'], review_uuid)
+        except ReviewConflictError as e:
+            return jsonify({"error": str(e)}), 409
         
         if result is None:
             return jsonify({
                 "error": "Study session or word not found"
             }), 404
-        
+
+        if result.get('replayed'):
+            return jsonify(result), 200
+
         return jsonify(result), 200
         
     except Exception as e:
@@ -258,17 +297,63 @@ def load(app):
   @app.route('/api/study_sessions/reset', methods=['POST'])
   @cross_origin()
   def reset_study_sessions():
+    """Delete study history in small batches.
+
+    Accepts an optional JSON payload with group_id and/or study_activity_id
+    to only reset part of the history. The reset runs as a reset_history
+    job in this request, so GET /api/study_sessions/reset/status can
+    follow it from any worker and only one reset runs at a time. With
+    "background": true the job is queued instead and a 202 with the job
+    is returned.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
     try:
-      cursor = app.db.cursor()
-      
-      # First delete all word review items since they have foreign key constraints
-      cursor.execute('DELETE FROM word_review_items')
-      
-      # Then delete all study sessions
-      cursor.execute('DELETE FROM study_sessions')
-      
-      app.db.commit()
-      
-      return jsonify({"message": "Study history cleared successfully"}), 200
+      data = request.get_json(silent=True) or {}
+      scope = {field: data.get(field) for field in ('group_id', 'study_activity_id')}
+      validate_reset_history(scope)
+
+      if data.get('background'):
+        job = app.jobs.submit('reset_history', scope, unless_within=0)
+        if job is None:
+          raise ResetInProgressError("A study history reset is already running")
+        return jsonify(job), 202
+
+      job = app.jobs.run('reset_history', {
+        **scope,
+        'batch_size': app.config.get('RESET_BATCH_SIZE', RESET_BATCH_SIZE),
+        'pause_seconds': app.config.get('RESET_PAUSE_SECONDS', 0.0)
+      }, unless_within=0)
+      if job is None:
+        raise ResetInProgressError("A study history reset is already running")
+      progress = ResetProgress.from_job(job)
+
+      # Deleted reviews can't be appended away; reload on next use
+      if getattr(app, 'analytics', None) is not None:
+        app.analytics.invalidate()
+
+      if job['state'] != 'completed':
+        return jsonify({"error": job['error'] or f"Reset {job['state']}",
+                        "progress": progress.to_dict()}), 500
+      return jsonify({
+        "message": "Study history cleared successfully",
+        "progress": progress.to_dict()
+      }), 200
+    except ValueError as e:
+      return jsonify({"error": str(e)}), 400
+    except ResetInProgressError as e:
+      return jsonify({"error": str(e)}), 409
+    except JobQueueFullError as e:
+      return jsonify({"error": str(e)}), 503
     except Exception as e:
-      return jsonify({"error": str(e)}), 500
\ No newline at end of file
+      return jsonify({"error": str(e)}), 500
+
+  @app.route('/api/study_sessions/reset/status', methods=['GET'])
+  @cross_origin()
+  def reset_study_sessions_status():
+    """Get progress of the running (or last) study history reset, from its job."""
+    try:
+      return jsonify(ResetProgress.from_job(app.jobs.latest('reset_history')).to_dict()), 200
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
@@ -1,123 +1,124 @@
 from flask import request, jsonify, g
 from flask_cors import cross_origin
 import json
+from services.word_service import WordService, WORD_FIELDS
+from lib.fields import parse_fields
 
 def load(app):
-  # Endpoint: GET /words with pagination (50 words per page)
+  # Endpoint: GET/POST /api/words to fetch several words with details in one request
+  @app.route('/api/words', methods=['GET', 'POST'])
+  @cross_origin()
+  def get_words_by_ids():
+    try:
+      if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('ids'), list):
+          return jsonify({"error": "Body must be a JSON object with an 'ids' list"}), 400
+        raw_ids = data['ids']
+      else:
+        ids_param = request.args.get('ids')
+        if not ids_param:
+          return jsonify({"error": "Missing required parameter: ids"}), 400
+        raw_ids = ids_param.split(',')
+
+      service = WordService(app.db)
+      try:
+        word_ids = service.parse_ids(raw_ids)
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      words = service.get_words_by_ids(word_ids)
+      found_ids = {word['id'] for word in words}
+
+      return jsonify({
+        "words": words,
+        "missing_ids": [word_id for word_id in word_ids if word_id not in found_ids]
+      })
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  # Endpoint: GET /api/words/hardest for the words most often answered wrong
+  @app.route('/api/words/hardest', methods=['GET'])
+  @cross_origin()
+  def get_hardest_words():
+    """Get the words with the highest smoothed error rate.
+
+    Query params:
+        n: Number of words to return (default 10)
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+      try:
+        n = int(request.args.get('n', 10))
+        words = WordService(app.db).hardest_words(n)
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+      return jsonify({'words': words})
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  # Endpoint: GET /words with keyset pagination (50 words per page by default)
   @app.route('/words', methods=['GET'])
   @cross_origin()
   def get_words():
+    """List words with their review stats.
+
+    Query params:
+        sort_by: spanish (default), english, correct_count, wrong_count,
+            success_ratio or last_reviewed
+        order: asc (default) or desc
+        per_page: Words per page (default 50)
+        cursor: next_cursor from the previous page
+        page: Page number, for clients that jump to pages (used without cursor)
+        fields: Comma-separated fields to return (default all)
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
     try:
-      cursor = app.db.cursor()
-
-      # Get the current page number from query parameters (default is 1)
-      page = int(request.args.get('page', 1))
-      # Ensure page number is positive
-      page = max(1, page)
-      words_per_page = 50
-      offset = (page - 1) * words_per_page
-
-      # Get sorting parameters from the query string
-      sort_by = request.args.get('sort_by', 'kanji')  # Default to sorting by 'kanji'
-      order = request.args.get('order', 'asc')  # Default to ascending order
-
-      # Validate sort_by and order
-      valid_columns = ['kanji', 'romaji', 'english', 'correct_count', 'wrong_count']
-      if sort_by not in valid_columns:
-        sort_by = 'kanji'
-      if order not in ['asc', 'desc']:
-        order = 'asc'
-
-      # Query to fetch words with sorting
-      cursor.execute(f'''
-        SELECT w.id, w.kanji, w.romaji, w.english, 
-            COALESCE(r.correct_count, 0) AS correct_count,
-            COALESCE(r.wrong_count, 0) AS wrong_count
-        FROM words w
-        LEFT JOIN word_reviews r ON w.id = r.word_id
-        ORDER BY {sort_by} {order}
-        LIMIT ? OFFSET ?
-      ''', (words_per_page, offset))
-
-      words = cursor.fetchall()
-
-      # Query the total number of words
-      cursor.execute('SELECT COUNT(*) FROM words')
-      total_words = cursor.fetchone()[0]
-      total_pages = (total_words + words_per_page - 1) // words_per_page
-
-      # Format the response
-      words_data = []
-      for word in words:
-        words_data.append({
-          "id": word["id"],
-          "kanji": word["kanji"],
-          "romaji": word["romaji"],
-          "english": word["english"],
-          "correct_count": word["correct_count"],
-          "wrong_count": word["wrong_count"]
-        })
+      try:
+        per_page = int(request.args.get('per_page', 50))
+        page = request.args.get('page')
+        page = int(page) if page is not None else None
+        cursor = request.args.get('cursor')
+
+        service = WordService(app.db)
+        result = service.list_words(
+          sort_by=request.args.get('sort_by', 'spanish'),
+          order=request.args.get('order', 'asc'),
+          per_page=per_page,
+          cursor=cursor,
+          page=page if cursor is None else None,
+          fields=parse_fields(request.args.get('fields'), list(WORD_FIELDS))
+        )
+      except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
       return jsonify({
-        "words": words_data,
-        "total_pages": total_pages,
-        "current_page": page,
-        "total_words": total_words
+        "words": result.words,
+        "next_cursor": result.next_cursor,
+        "current_page": page if cursor is None else None,
+        "total_pages": ((result.total_words + per_page - 1) // per_page
+                        if result.total_words is not None else None),
+        "total_words": result.total_words
       })
-
     except Exception as e:
       return jsonify({"error": str(e)}), 500
-    finally:
-      app.db.close()
 
   # Endpoint: GET /words/:id to get a single word with its details
   @app.route('/words/<int:word_id>', methods=['GET'])
   @cross_origin()
   def get_word(word_id):
     try:
-      cursor = app.db.cursor()
-      
-      # Query to fetch the word and its details
-      cursor.execute('''
-        SELECT w.id, w.kanji, w.romaji, w.english,
-               COALESCE(r.correct_count, 0) AS correct_count,
-               COALESCE(r.wrong_count, 0) AS wrong_count,
-               GROUP_CONCAT(DISTINCT g.id || '::' || g.name) as groups
-        FROM words w
-        LEFT JOIN word_reviews r ON w.id = r.word_id
-        LEFT JOIN word_groups wg ON w.id = wg.word_id
-        LEFT JOIN groups g ON wg.group_id = g.id
-        WHERE w.id = ?
-        GROUP BY w.id
-      ''', (word_id,))
-      
-      word = cursor.fetchone()
-      
-      if not word:
+      service = WordService(app.db)
+      words = service.get_words_by_ids([word_id])
+      if not words:
         return jsonify({"error": "Word not found"}), 404
-      
-      # Parse the groups string into a list of group objects
-      groups = []
-      if word["groups"]:
-        for group_str in word["groups"].split(','):
-          group_id, group_name = group_str.split('::')
-          groups.append({
-            "id": int(group_id),
-            "name": group_name
-          })
-      
-      return jsonify({
-        "word": {
-          "id": word["id"],
-          "kanji": word["kanji"],
-          "romaji": word["romaji"],
-          "english": word["english"],
-          "correct_count": word["correct_count"],
-          "wrong_count": word["wrong_count"],
-          "groups": groups
-        }
-      })
-      
+
+      return jsonify({"word": words[0]})
     except Exception as e:
       return jsonify({"error": str(e)}), 500
 
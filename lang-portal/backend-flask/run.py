@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from db.init_db import main as init_db
-from app import app
+from app import create_app
 
 if __name__ == '__main__':
     # Remove old database if it exists
@@ -13,4 +13,6 @@ if __name__ == '__main__':
     init_db()
     
     # Run Flask app
+    app = create_app()
+    app.jobs.start()
     app.run(debug=True, port=5001) 
\ No newline at end of file
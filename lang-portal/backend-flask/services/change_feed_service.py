@@ -0,0 +1,146 @@
+from typing import List, Dict, Optional, Callable
+from dataclasses import dataclass
+import sqlite3
+
+# Upper bound on changes returned by one GET /api/changes call
+MAX_CHANGES_LIMIT = 1000
+# Delete tombstones are kept this long before compaction drops them
+DEFAULT_RETENTION_DAYS = 30
+# Seqs examined per transaction by compact()
+COMPACT_BATCH_SIZE = 1000
+
+@dataclass
+class ChangePage:
+    changes: List[Dict]
+    next_since: int
+    has_more: bool
+    resync_required: bool
+
+class ChangeFeedService:
+    def __init__(self, db_connection: sqlite3.Connection):
+        self.db = db_connection
+
+    def get_changes(self, since: int, limit: int) -> ChangePage:
+        """Get changes with a seq greater than since, oldest first.
+
+        Args:
+            since: Last seq the client has applied (0 for a first sync)
+            limit: Maximum number of changes to return
+
+        Returns:
+            ChangePage; resync_required is set when compaction has removed
+            changes the client hasn't seen, so it must reload everything
+
+        Raises:
+            ValueError: If since or limit are out of range
+        """
+        if since < 0:
+            raise ValueError("since must be 0 or greater")
+        if limit < 1 or limit > MAX_CHANGES_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_CHANGES_LIMIT}")
+
+        cursor = self.db.cursor()
+        cursor.execute('SELECT compacted_seq FROM change_log_state WHERE id = 1')
+        row = cursor.fetchone()
+        compacted_seq = row[0] if row else 0
+
+        # Fetch one extra row to know whether another page follows
+        cursor.execute('''
+            SELECT seq, table_name, row_id, related_id, op, changed_at
+            FROM changes
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+        ''', (since, limit + 1))
+        rows = cursor.fetchall()
+
+        changes = [{
+            'seq': row['seq'],
+            'table': row['table_name'],
+            'row_id': row['row_id'],
+            'related_id': row['related_id'],
+            'op': row['op'],
+            'changed_at': row['changed_at']
+        } for row in rows[:limit]]
+
+        return ChangePage(
+            changes=changes,
+            next_since=changes[-1]['seq'] if changes else max(since, self.latest_seq()),
+            has_more=len(rows) > limit,
+            resync_required=since < compacted_seq
+        )
+
+    def latest_seq(self) -> int:
+        """Get the seq of the most recent change (0 if there are none)."""
+        cursor = self.db.cursor()
+        cursor.execute('SELECT MAX(seq) FROM changes')
+        return cursor.fetchone()[0] or 0
+
+    def compact(self, retention_days: int = DEFAULT_RETENTION_DAYS, batch_size: int = COMPACT_BATCH_SIZE,
+                on_progress: Optional[Callable[[float], None]] = None) -> Dict:
+        """Shrink the change log without breaking clients' incremental sync.
+
+        Only the latest change per row is kept: a client syncing from any seq
+        still sees every row that changed after it. Delete tombstones older
+        than retention_days are dropped too, and compacted_seq records the
+        highest seq removed that way, so older clients are told to resync.
+
+        The log is worked through batch_size seqs at a time, each range in
+        its own transaction, so writers (and their triggers) get the lock
+        in between. Changes made while it runs are left for the next run.
+
+        Args:
+            retention_days: Age after which delete tombstones are dropped
+            batch_size: Seqs examined per transaction
+            on_progress: Called with the fraction done after each range
+
+        Returns:
+            Dictionary with the number of superseded and expired changes removed
+        """
+        cursor = self.db.cursor()
+        cursor.execute('SELECT MIN(seq), MAX(seq) FROM changes')
+        min_seq, max_seq = cursor.fetchone()
+        if max_seq is None:
+            return {'superseded': 0, 'expired': 0}
+
+        cursor.execute('''
+            SELECT MAX(seq) FROM changes
+            WHERE op = 'delete' AND changed_at < datetime('now', ?)
+        ''', (f'-{int(retention_days)} days',))
+        expired_seq = cursor.fetchone()[0]
+        if expired_seq is not None:
+            # Recorded before any tombstone goes, so no client misses one
+            cursor.execute('''
+                UPDATE change_log_state
+                SET compacted_seq = MAX(compacted_seq, ?)
+                WHERE id = 1
+            ''', (expired_seq,))
+        self.db.commit()
+
+        superseded = expired = 0
+        for start_seq in range(min_seq, max_seq + 1, batch_size):
+            end_seq = min(start_seq + batch_size, max_seq + 1)
+            # A later change to the same row supersedes this one
+            cursor.execute('''
+                DELETE FROM changes
+                WHERE seq >= ? AND seq < ?
+                  AND EXISTS (
+                    SELECT 1 FROM changes later
+                    WHERE later.table_name = changes.table_name
+                      AND later.row_id = changes.row_id
+                      AND later.related_id IS changes.related_id
+                      AND later.seq > changes.seq
+                  )
+            ''', (start_seq, end_seq))
+            superseded += cursor.rowcount
+            if expired_seq is not None and start_seq <= expired_seq:
+                cursor.execute('''
+                    DELETE FROM changes
+                    WHERE seq >= ? AND seq < ? AND seq <= ? AND op = 'delete'
+                ''', (start_seq, end_seq, expired_seq))
+                expired += cursor.rowcount
+            self.db.commit()
+            if on_progress is not None:
+                on_progress((end_seq - min_seq) / (max_seq - min_seq + 1))
+
+        return {'superseded': superseded, 'expired': expired}
@@ -0,0 +1,141 @@
+from typing import List, Dict, Tuple
+import sqlite3
+
+# A word counts as mastered on the dashboard from this many attempts and success rate
+MASTERY_MIN_ATTEMPTS = 5
+MASTERY_RATE = 0.8
+
+class DashboardEventSource:
+    """Builds the /api/events messages from change log entries.
+
+    Used by lib.events.ChangeLogTail, so every worker announces the writes
+    of all of them. Sessions are announced from their study_sessions
+    insert. Reviews have no change log entries of their own, so a
+    word_review_items_stats change reads the reviews past the last one
+    announced. Deleted sessions (a history reset) only send resync.
+    """
+
+    def __init__(self):
+        self.last_review_id = 0
+
+    def start(self, db: sqlite3.Connection) -> None:
+        """Announce only reviews made from now on."""
+        self.last_review_id = self._latest_review_id(db)
+
+    def events(self, db: sqlite3.Connection, changes: List) -> List[Tuple[str, Dict]]:
+        """Events for a batch of changes, oldest first.
+
+        Args:
+            db: Connection to read the changed rows with
+            changes: Rows of (seq, table_name, row_id, related_id, op)
+
+        Returns:
+            List of (event, data) pairs
+        """
+        session_ids = []
+        reviewed = False
+        for _, table_name, row_id, _, op in changes:
+            if table_name == 'study_sessions' and op == 'delete':
+                # Review ids may be reused once the newest were deleted
+                self.last_review_id = self._latest_review_id(db)
+                return [('resync', {})]
+            if table_name == 'study_sessions' and op == 'insert':
+                session_ids.append(row_id)
+            elif table_name == 'word_review_items_stats':
+                reviewed = True
+
+        events = []
+        for session in self._sessions(db, session_ids):
+            events.append(('session', {**session, 'correct_count': 0, 'wrong_count': 0}))
+            events.append(('stats', {'total_sessions': 1}))
+        if reviewed:
+            for review in self._reviews_since(db, self.last_review_id):
+                update = self.review_event(db, review)
+                events.append(('review', update['review']))
+                events.append(('stats', update['stats']))
+                self.last_review_id = review['id']
+        return events
+
+    def review_event(self, db: sqlite3.Connection, review: Dict) -> Dict:
+        """Build the live update for a committed review.
+
+        Counts only take reviews up to this one, so each review of a batch
+        reports its own step even when later ones are already committed.
+
+        Args:
+            db: Connection to read the review history with
+            review: Review with id, study_session_id, word_id and correct
+
+        Returns:
+            Dict with 'review' (the review plus its session's running counts)
+            and 'stats' (deltas to the /dashboard/stats payload)
+        """
+        cursor = db.cursor()
+        cursor.execute('''
+            SELECT COUNT(CASE WHEN correct = 1 THEN 1 END), COUNT(*)
+            FROM word_review_items
+            WHERE word_id = ? AND id <= ?
+        ''', (review['word_id'], review['id']))
+        correct_count, attempts = cursor.fetchone()
+
+        cursor.execute('''
+            SELECT
+                COUNT(CASE WHEN correct = 1 THEN 1 END),
+                COUNT(CASE WHEN correct = 0 THEN 1 END)
+            FROM word_review_items
+            WHERE study_session_id = ? AND id <= ?
+        ''', (review['study_session_id'], review['id']))
+        session_correct, session_wrong = cursor.fetchone()
+
+        # Compare the word's standing before and after this review
+        correct = 1 if review['correct'] else 0
+
+        def is_mastered(attempts, correct):
+            return attempts >= MASTERY_MIN_ATTEMPTS and correct / attempts >= MASTERY_RATE
+
+        mastered_delta = (int(is_mastered(attempts, correct_count))
+                          - int(is_mastered(attempts - 1, correct_count - correct)))
+
+        return {
+            'review': {
+                **review,
+                'session_correct_count': session_correct,
+                'session_wrong_count': session_wrong
+            },
+            'stats': {
+                'total_words_studied': 1 if attempts == 1 else 0,
+                'mastered_words': mastered_delta,
+                'total_reviews': 1,
+                'correct_reviews': correct
+            }
+        }
+
+    def _latest_review_id(self, db: sqlite3.Connection) -> int:
+        return db.execute('SELECT COALESCE(MAX(id), 0) FROM word_review_items').fetchone()[0]
+
+    def _sessions(self, db: sqlite3.Connection, session_ids: List[int]) -> List[Dict]:
+        """The recent-session payload of sessions that still exist."""
+        if not session_ids:
+            return []
+        placeholders = ','.join('?' * len(session_ids))
+        cursor = db.cursor()
+        cursor.execute(f'''
+            SELECT ss.id, ss.group_id, ss.study_activity_id, ss.created_at,
+                   g.name AS group_name, sa.name AS activity_name
+            FROM study_sessions ss
+            JOIN groups g ON g.id = ss.group_id
+            JOIN study_activities sa ON sa.id = ss.study_activity_id
+            WHERE ss.id IN ({placeholders})
+            ORDER BY ss.id
+        ''', session_ids)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _reviews_since(self, db: sqlite3.Connection, review_id: int) -> List[Dict]:
+        cursor = db.cursor()
+        cursor.execute('''
+            SELECT id, study_session_id, word_id, correct, created_at
+            FROM word_review_items
+            WHERE id > ?
+            ORDER BY id
+        ''', (review_id,))
+        return [{**dict(row), 'correct': bool(row['correct'])} for row in cursor.fetchall()]
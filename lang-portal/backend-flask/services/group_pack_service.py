@@ -0,0 +1,160 @@
+from typing import List, Optional, Dict
+from collections import OrderedDict
+from dataclasses import dataclass
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+
+# Bump when the pack layout changes so clients can tell formats apart
+PACK_FORMAT = 1
+
+@dataclass
+class GroupPack:
+    group_id: int
+    version: int     # Latest change seq affecting the group's words or stats
+    etag: str        # SHA-256 of the uncompressed content
+    body: bytes      # Gzip-compressed JSON
+    size: int        # Uncompressed size in bytes
+    word_count: int
+
+    def json_bytes(self) -> bytes:
+        return gzip.decompress(self.body)
+
+class PackCache:
+    """Most recently used group packs, at most one version per group."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._packs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, group_id: int, version: int) -> Optional[GroupPack]:
+        with self._lock:
+            pack = self._packs.get(group_id)
+            if pack is None or pack.version != version:
+                return None
+            self._packs.move_to_end(group_id)
+            return pack
+
+    def put(self, pack: GroupPack):
+        with self._lock:
+            self._packs[pack.group_id] = pack
+            self._packs.move_to_end(pack.group_id)
+            while len(self._packs) > self.max_entries:
+                self._packs.popitem(last=False)
+
+class GroupPackService:
+    def __init__(self, db_connection: sqlite3.Connection, cache: Optional[PackCache] = None):
+        self.db = db_connection
+        self.cache = cache
+
+    def get_pack(self, group_id: int) -> Optional[GroupPack]:
+        """Get a group's study pack, building it only when its words changed.
+
+        Args:
+            group_id: The group ID
+
+        Returns:
+            GroupPack if group exists, None if group not found
+        """
+        version = self.pack_version(group_id)
+        if self.cache is not None:
+            pack = self.cache.get(group_id, version)
+            if pack is not None:
+                return pack
+
+        pack = self.build_pack(group_id, version)
+        if pack is not None and self.cache is not None:
+            self.cache.put(pack)
+        return pack
+
+    def pack_version(self, group_id: int) -> int:
+        """Latest change log seq touching the group, its memberships, its words or their stats.
+
+        Compaction keeps the latest change per row, so the version only
+        moves when the pack content may have changed.
+        """
+        cursor = self.db.cursor()
+        cursor.execute('''
+            SELECT MAX(
+                COALESCE((
+                    SELECT MAX(seq) FROM changes
+                    WHERE table_name = 'groups' AND row_id = :group_id
+                ), 0),
+                COALESCE((
+                    SELECT MAX(seq) FROM changes
+                    WHERE related_id = :group_id AND table_name = 'word_groups'
+                ), 0),
+                COALESCE((
+                    SELECT MAX(c.seq)
+                    -- CROSS JOIN pins the order: walk the group's members first
+                    FROM word_groups wg
+                    CROSS JOIN changes c ON c.table_name = 'words' AND c.row_id = wg.word_id
+                    WHERE wg.group_id = :group_id
+                ), 0),
+                COALESCE((
+                    SELECT MAX(c.seq)
+                    FROM word_groups wg
+                    CROSS JOIN changes c ON c.table_name = 'word_review_items_stats' AND c.row_id = wg.word_id
+                    WHERE wg.group_id = :group_id
+                ), 0)
+            )
+        ''', {'group_id': group_id})
+        return cursor.fetchone()[0]
+
+    def build_pack(self, group_id: int, version: int = 0) -> Optional[GroupPack]:
+        """Build the pack: the group, its words and their current stats.
+
+        Args:
+            group_id: The group ID
+            version: Version to record on the pack
+
+        Returns:
+            GroupPack if group exists, None if group not found
+        """
+        cursor = self.db.cursor()
+        cursor.execute('SELECT id, name FROM groups WHERE id = ?', (group_id,))
+        group = cursor.fetchone()
+        if not group:
+            return None
+
+        cursor.execute('''
+            SELECT
+                w.id,
+                w.spanish,
+                w.english,
+                COALESCE(s.correct_count, 0) AS correct_count,
+                COALESCE(s.wrong_count, 0) AS wrong_count,
+                s.last_reviewed
+            FROM word_groups wg
+            JOIN words w ON w.id = wg.word_id
+            LEFT JOIN word_review_items_stats s ON s.word_id = w.id
+            WHERE wg.group_id = ?
+            ORDER BY w.id
+        ''', (group_id,))
+        words: List[Dict] = [{
+            'id': row['id'],
+            'spanish': row['spanish'],
+            'english': row['english'],
+            'correct_count': row['correct_count'],
+            'wrong_count': row['wrong_count'],
+            'last_reviewed': row['last_reviewed']
+        } for row in cursor.fetchall()]
+
+        content = json.dumps({
+            'format': PACK_FORMAT,
+            'group': {'id': group['id'], 'name': group['name']},
+            'words': words
+        }, sort_keys=True, separators=(',', ':')).encode()
+
+        return GroupPack(
+            group_id=group_id,
+            version=version,
+            etag=hashlib.sha256(content).hexdigest(),
+            # mtime=0 keeps the compressed bytes identical for identical content
+            body=gzip.compress(content, compresslevel=9, mtime=0),
+            size=len(content),
+            word_count=len(words)
+        )
@@ -1,9 +1,47 @@
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Iterable
 from models.word import Word
 from models.group import Group
 import sqlite3
+import random
+import heapq
+import json
 from dataclasses import dataclass
 from datetime import datetime
+from lib.fields import select_list, project
+
+# Upper bound on words returned by a single sample request
+MAX_SAMPLE_SIZE = 100
+SAMPLE_WEIGHTS = ('uniform', 'weak')
+# Words written per statement by bulk imports, and the most one request may add
+BULK_BATCH_SIZE = 5000
+MAX_BULK_WORDS = 500_000
+MAX_WORD_LENGTH = 200
+
+# Fields of each listing (for fields=) and the SQL computing them. Fields
+# left out of a request are not computed, nor joined when only they need a join
+GROUP_FIELDS = {
+    'id': 'g.id',
+    'group_name': 'g.name',
+    'word_count': '''COALESCE(g.words_count,
+        (SELECT COUNT(*) FROM word_groups wg WHERE wg.group_id = g.id))''',
+}
+GROUP_WORD_FIELDS = {
+    'id': 'w.id',
+    'spanish': 'w.spanish',
+    'english': 'w.english',
+}
+GROUP_SESSION_FIELDS = {
+    'id': 's.id',
+    'group_id': 's.group_id',
+    'study_activity_id': 's.study_activity_id',
+    'start_time': 's.created_at',
+    'last_activity_time': '''(SELECT MAX(created_at) FROM word_review_items
+        WHERE study_session_id = s.id)''',
+    'activity_name': 'a.name',
+    'group_name': 'g.name',
+    'review_count': '''(SELECT COUNT(*) FROM word_review_items
+        WHERE study_session_id = s.id)''',
+}
 
 @dataclass
 class PaginatedResult:
@@ -16,10 +54,15 @@ class GroupService:
     def __init__(self, db_connection: sqlite3.Connection):
         self.db = db_connection
     
-    def get_groups(self, page: int, per_page: int, sort_by: str = 'name', order: str = 'asc') -> PaginatedResult:
-        """Get paginated list of groups with word counts."""
+    def get_groups(self, page: int, per_page: int, sort_by: str = 'name', order: str = 'asc',
+                   fields: Optional[List[str]] = None) -> PaginatedResult:
+        """Get paginated list of groups with word counts.
+
+        fields limits the returned (and computed) fields to some of GROUP_FIELDS.
+        """
         cursor = self.db.cursor()
         offset = (page - 1) * per_page
+        fields = fields or list(GROUP_FIELDS)
         
         # Validate sort parameters
         valid_columns = ['name', 'words_count']
@@ -35,37 +78,26 @@ class GroupService:
         
         # Get groups with word counts
         cursor.execute(f'''
-            SELECT 
-                g.id,
-                g.name,
-                COALESCE(g.words_count, 
-                    (SELECT COUNT(*) 
-                     FROM word_groups wg 
-                     WHERE wg.group_id = g.id)
-                ) as word_count
+            SELECT {select_list(fields, GROUP_FIELDS)}
             FROM groups g
-            ORDER BY {sort_by} {order}
+            ORDER BY g.{sort_by} {order}
             LIMIT ? OFFSET ?
         ''', (per_page, offset))
         
-        groups = [{
-            "id": row["id"],
-            "group_name": row["name"],
-            "word_count": row["word_count"]
-        } for row in cursor.fetchall()]
-        
         return PaginatedResult(
-            items=groups,
+            items=project(cursor.fetchall(), fields),
             total_pages=total_pages,
             current_page=page,
             total_items=total_groups
         )
     
     def get_group_words(self, group_id: int, page: int, per_page: int, 
-                       sort_by: str = 'spanish', order: str = 'asc') -> Optional[PaginatedResult]:
-        """Get paginated list of words in a group."""
+                       sort_by: str = 'spanish', order: str = 'asc',
+                       fields: Optional[List[str]] = None) -> Optional[PaginatedResult]:
+        """Get paginated list of words in a group, limited to fields if given."""
         cursor = self.db.cursor()
         offset = (page - 1) * per_page
+        fields = fields or list(GROUP_WORD_FIELDS)
         
         # Check if group exists
         cursor.execute('SELECT name FROM groups WHERE id = ?', (group_id,))
@@ -90,7 +122,7 @@ class GroupService:
         
         # Get words
         cursor.execute(f'''
-            SELECT w.* 
+            SELECT {select_list(fields, GROUP_WORD_FIELDS)}
             FROM words w
             JOIN word_groups wg ON w.id = wg.word_id
             WHERE wg.group_id = ?
@@ -98,21 +130,16 @@ class GroupService:
             LIMIT ? OFFSET ?
         ''', (group_id, per_page, offset))
         
-        words = [{
-            "id": row["id"],
-            "spanish": row["spanish"],
-            "english": row["english"]
-        } for row in cursor.fetchall()]
-        
         return PaginatedResult(
-            items=words,
+            items=project(cursor.fetchall(), fields),
             total_pages=total_pages,
             current_page=page,
             total_items=total_words
         )
     
     def get_group_study_sessions(self, group_id: int, page: int, per_page: int,
-                               sort_by: str = 'created_at', order: str = 'desc') -> Optional[PaginatedResult]:
+                               sort_by: str = 'created_at', order: str = 'desc',
+                               fields: Optional[List[str]] = None) -> Optional[PaginatedResult]:
         """Get paginated list of study sessions for a group.
         
         Args:
@@ -121,22 +148,27 @@ class GroupService:
             per_page: Items per page
             sort_by: Column to sort by
             order: Sort order ('asc' or 'desc')
+            fields: Fields of GROUP_SESSION_FIELDS to return (default all);
+                the review subqueries and name joins only run when needed
             
         Returns:
             PaginatedResult if group exists, None if not found
         """
         cursor = self.db.cursor()
         offset = (page - 1) * per_page
+        fields = fields or list(GROUP_SESSION_FIELDS)
         
-        # Map frontend sort keys to database columns
+        # Map frontend sort keys to fields
         sort_mapping = {
-            'startTime': 'created_at',
+            'startTime': 'start_time',
             'endTime': 'last_activity_time',
-            'activityName': 'a.name',
-            'groupName': 'g.name',
+            'activityName': 'activity_name',
+            'groupName': 'group_name',
             'reviewItemsCount': 'review_count'
         }
-        sort_column = sort_mapping.get(sort_by, 'created_at')
+        sort_field = sort_mapping.get(sort_by, 'start_time')
+        if order not in ['asc', 'desc']:
+            order = 'desc'
         
         # Get total count
         cursor.execute('''
@@ -147,46 +179,24 @@ class GroupService:
         total_sessions = cursor.fetchone()[0]
         total_pages = (total_sessions + per_page - 1) // per_page
         
+        joins = []
+        if 'activity_name' in fields or sort_field == 'activity_name':
+            joins.append('JOIN study_activities a ON s.study_activity_id = a.id')
+        if 'group_name' in fields or sort_field == 'group_name':
+            joins.append('JOIN groups g ON s.group_id = g.id')
+
         # Get study sessions
         cursor.execute(f'''
-            SELECT 
-                s.id,
-                s.group_id,
-                s.study_activity_id,
-                s.created_at as start_time,
-                (
-                    SELECT MAX(created_at)
-                    FROM word_review_items
-                    WHERE study_session_id = s.id
-                ) as last_activity_time,
-                a.name as activity_name,
-                g.name as group_name,
-                (
-                    SELECT COUNT(*)
-                    FROM word_review_items
-                    WHERE study_session_id = s.id
-                ) as review_count
+            SELECT {select_list(fields, GROUP_SESSION_FIELDS)}
             FROM study_sessions s
-            JOIN study_activities a ON s.study_activity_id = a.id
-            JOIN groups g ON s.group_id = g.id
+            {' '.join(joins)}
             WHERE s.group_id = ?
-            ORDER BY {sort_column} {order}
+            ORDER BY {GROUP_SESSION_FIELDS[sort_field]} {order}
             LIMIT ? OFFSET ?
         ''', (group_id, per_page, offset))
         
-        sessions = [{
-            "id": row["id"],
-            "group_id": row["group_id"],
-            "study_activity_id": row["study_activity_id"],
-            "start_time": row["start_time"],
-            "last_activity_time": row["last_activity_time"],
-            "activity_name": row["activity_name"],
-            "group_name": row["group_name"],
-            "review_count": row["review_count"]
-        } for row in cursor.fetchall()]
-        
         return PaginatedResult(
-            items=sessions,
+            items=project(cursor.fetchall(), fields),
             total_pages=total_pages,
             current_page=page,
             total_items=total_sessions
@@ -231,4 +241,173 @@ class GroupService:
                 english=row['english']
             )
             for row in rows
-        ] 
\ No newline at end of file
+        ]
+
+    def sample_group_words(self, group_id: int, n: int, weight: str = 'uniform',
+                           rng: Optional[random.Random] = None) -> Optional[List[Dict]]:
+        """Sample n distinct words from a group.
+
+        Members are streamed from the (group_id, word_id) index and reduced
+        with a weighted reservoir (Efraimidis-Spirakis A-Res), so only n
+        candidates are kept in memory and nothing is sorted by RANDOM().
+
+        Args:
+            group_id: The group ID to sample from
+            n: Number of words to return (fewer if the group is smaller)
+            weight: 'uniform', or 'weak' to favour words with a high
+                smoothed error rate in word_review_items_stats
+            rng: Optional random generator, mainly for tests
+
+        Returns:
+            List of word dictionaries if group exists, None if group not found
+
+        Raises:
+            ValueError: If n or weight are invalid
+        """
+        if n < 1 or n > MAX_SAMPLE_SIZE:
+            raise ValueError(f"n must be between 1 and {MAX_SAMPLE_SIZE}")
+        if weight not in SAMPLE_WEIGHTS:
+            raise ValueError(f"weight must be one of: {', '.join(SAMPLE_WEIGHTS)}")
+        rng = rng or random
+
+        cursor = self.db.cursor()
+
+        # Check if group exists
+        cursor.execute('SELECT id FROM groups WHERE id = ?', (group_id,))
+        if not cursor.fetchone():
+            return None
+
+        if weight == 'weak':
+            # Laplace-smoothed error rate, so unseen words still get picked
+            cursor.execute('''
+                SELECT
+                    wg.word_id,
+                    (COALESCE(s.wrong_count, 0) + 1.0) /
+                    (COALESCE(s.correct_count, 0) + COALESCE(s.wrong_count, 0) + 2.0) AS weight
+                FROM word_groups wg
+                LEFT JOIN word_review_items_stats s ON s.word_id = wg.word_id
+                WHERE wg.group_id = ?
+            ''', (group_id,))
+        else:
+            cursor.execute('''
+                SELECT word_id, 1.0 AS weight
+                FROM word_groups
+                WHERE group_id = ?
+            ''', (group_id,))
+
+        sampled = heapq.nlargest(
+            n,
+            ((rng.random() ** (1.0 / row['weight']), row['word_id']) for row in cursor),
+        )
+        word_ids = [word_id for _, word_id in sampled]
+        if not word_ids:
+            return []
+
+        placeholders = ','.join('?' * len(word_ids))
+        cursor.execute(f'''
+            SELECT id, spanish, english
+            FROM words
+            WHERE id IN ({placeholders})
+        ''', word_ids)
+        words = {row['id']: {
+            "id": row["id"],
+            "spanish": row["spanish"],
+            "english": row["english"]
+        } for row in cursor.fetchall()}
+
+        return [words[word_id] for word_id in word_ids if word_id in words]
+
+    def bulk_add_words(self, group_id: int, rows: Iterable[Tuple[str, str]],
+                       batch_size: int = BULK_BATCH_SIZE) -> Optional[Dict]:
+        """Add (spanish, english) pairs to a group, creating missing words.
+
+        Rows are consumed lazily in batches, so a streamed upload is never
+        held in memory. Per batch, one INSERT ... ON CONFLICT DO NOTHING
+        RETURNING creates the new words, one indexed lookup resolves the ids
+        of all pairs and one executemany adds the memberships, which the
+        triggers on word_groups count into the group's words_count.
+        Everything commits in a single transaction.
+
+        Args:
+            group_id: The group to add words to
+            rows: Iterable of (spanish, english) pairs
+            batch_size: Pairs written per statement
+
+        Returns:
+            Dictionary of counts if group exists, None if group not found
+
+        Raises:
+            ValueError: If a row is invalid or there are too many rows
+                (nothing is written)
+        """
+        cursor = self.db.cursor()
+        cursor.execute('SELECT id FROM groups WHERE id = ?', (group_id,))
+        if not cursor.fetchone():
+            return None
+
+        result = {'rows': 0, 'words_created': 0, 'memberships_added': 0}
+        try:
+            batch = {}
+            for line, row in enumerate(rows, start=1):
+                batch[self._validate_bulk_row(line, row)] = None
+                result['rows'] = line
+                if line > MAX_BULK_WORDS:
+                    raise ValueError(f"At most {MAX_BULK_WORDS} words can be added at once")
+                if len(batch) >= batch_size:
+                    self._write_bulk_batch(cursor, group_id, list(batch), result)
+                    batch = {}
+            if batch:
+                self._write_bulk_batch(cursor, group_id, list(batch), result)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        cursor.execute('SELECT words_count FROM groups WHERE id = ?', (group_id,))
+        result['words_count'] = cursor.fetchone()[0]
+        return result
+
+    @staticmethod
+    def _validate_bulk_row(line: int, row) -> Tuple[str, str]:
+        if not isinstance(row, (list, tuple)) or len(row) != 2:
+            raise ValueError(f"Row {line}: expected spanish and english")
+        spanish, english = row
+        if not isinstance(spanish, str) or not isinstance(english, str):
+            raise ValueError(f"Row {line}: spanish and english must be strings")
+        spanish, english = spanish.strip(), english.strip()
+        if not spanish or not english:
+            raise ValueError(f"Row {line}: spanish and english are required")
+        if len(spanish) > MAX_WORD_LENGTH or len(english) > MAX_WORD_LENGTH:
+            raise ValueError(f"Row {line}: words are limited to {MAX_WORD_LENGTH} characters")
+        return spanish, english
+
+    @staticmethod
+    def _write_bulk_batch(cursor, group_id: int, pairs: List[Tuple[str, str]], result: Dict):
+        pairs_json = json.dumps(pairs)
+
+        # WHERE true lets SQLite parse ON CONFLICT after INSERT ... SELECT
+        cursor.execute('''
+            INSERT INTO words (spanish, english)
+            SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+            FROM json_each(?)
+            WHERE true
+            ON CONFLICT (spanish, english) DO NOTHING
+            RETURNING id
+        ''', (pairs_json,))
+        result['words_created'] += len(cursor.fetchall())
+
+        # New and existing words alike, through the UNIQUE(spanish, english) index
+        cursor.execute('''
+            SELECT w.id
+            FROM json_each(?) j
+            JOIN words w
+                ON w.spanish = json_extract(j.value, '$[0]')
+                AND w.english = json_extract(j.value, '$[1]')
+        ''', (pairs_json,))
+        word_ids = [(row[0], group_id) for row in cursor.fetchall()]
+
+        cursor.executemany('''
+            INSERT INTO word_groups (word_id, group_id) VALUES (?, ?)
+            ON CONFLICT (word_id, group_id) DO NOTHING
+        ''', word_ids)
+        result['memberships_added'] += cursor.rowcount
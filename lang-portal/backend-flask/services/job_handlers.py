@@ -0,0 +1,165 @@
+from typing import Dict, Optional
+from pathlib import Path
+from datetime import datetime, UTC
+import csv
+from lib.jobs import JobContext
+from services.study_session_service import StudySessionService
+from services.change_feed_service import ChangeFeedService, DEFAULT_RETENTION_DAYS
+from services.maintenance_service import MaintenanceService, SCHEDULED_TASKS
+
+# Rows handled per transaction by the chunked jobs below
+JOB_BATCH_SIZE = 1000
+
+def seed_job(ctx: JobContext) -> Dict:
+    """Seed study activities and the default word groups."""
+    from db.init_db import SEEDS, seed_db, seed_study_activities
+
+    seed_study_activities(ctx.db)
+    for index, (seed_file, group_name) in enumerate(SEEDS, start=1):
+        seed_db(ctx.db, seed_file, group_name)
+        ctx.report(index / len(SEEDS))
+
+    return {'groups': len(SEEDS)}
+
+def check_integer(params: Dict, field: str, minimum: Optional[int] = None):
+    """Raise ValueError unless params[field] is missing, None or an integer of at least minimum."""
+    value = params.get(field)
+    if value is None:
+        return
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{field} must be an integer")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{field} must be at least {minimum}")
+
+def validate_batch_size(params: Dict):
+    """Check the batch_size parameter of the chunked jobs."""
+    check_integer(params, 'batch_size', minimum=1)
+
+def validate_reset_history(params: Dict):
+    """Check reset_history parameters before the job is queued."""
+    check_integer(params, 'group_id')
+    check_integer(params, 'study_activity_id')
+    validate_batch_size(params)
+    pause_seconds = params.get('pause_seconds', 0)
+    if not isinstance(pause_seconds, (int, float)) or isinstance(pause_seconds, bool) or pause_seconds < 0:
+        raise ValueError("pause_seconds must be a number of at least 0")
+
+def reset_history_job(ctx: JobContext) -> Dict:
+    """Reset study history in chunks (see StudySessionService.reset_history)."""
+    service = StudySessionService(ctx.db)
+    progress = service.reset_history(
+        group_id=ctx.params.get('group_id'),
+        study_activity_id=ctx.params.get('study_activity_id'),
+        batch_size=ctx.params.get('batch_size', JOB_BATCH_SIZE),
+        pause_seconds=ctx.params.get('pause_seconds', 0.0),
+        # The counts go with the fraction so /reset/status can show them
+        on_progress=lambda p: ctx.report(p.sessions_deleted / p.sessions_total if p.sessions_total else 0,
+                                         p.to_dict())
+    )
+    return progress.to_dict()
+
+def rebuild_stats_job(ctx: JobContext) -> Dict:
+    """Rebuild word_review_items_stats from the review history, word id range by range."""
+    batch_size = ctx.params.get('batch_size', JOB_BATCH_SIZE)
+    cursor = ctx.db.cursor()
+    cursor.execute('SELECT MIN(id), MAX(id) FROM words')
+    min_id, max_id = cursor.fetchone()
+    if max_id is None:
+        return {'words': 0}
+
+    rebuilt = 0
+    for start_id in range(min_id, max_id + 1, batch_size):
+        end_id = start_id + batch_size
+        cursor.execute('''
+            DELETE FROM word_review_items_stats
+            WHERE word_id >= ? AND word_id < ?
+        ''', (start_id, end_id))
+        # One row per word, zeros for words never reviewed
+        cursor.execute('''
+            INSERT INTO word_review_items_stats (word_id, correct_count, wrong_count, last_reviewed)
+            SELECT
+                w.id,
+                COUNT(CASE WHEN wri.correct = 1 THEN 1 END),
+                COUNT(CASE WHEN wri.correct = 0 THEN 1 END),
+                MAX(wri.created_at)
+            FROM words w
+            LEFT JOIN word_review_items wri ON wri.word_id = w.id
+            WHERE w.id >= ? AND w.id < ?
+            GROUP BY w.id
+        ''', (start_id, end_id))
+        rebuilt += cursor.rowcount
+        ctx.db.commit()
+        ctx.report((min(end_id, max_id + 1) - min_id) / (max_id - min_id + 1))
+
+    return {'words': rebuilt}
+
+def validate_compact_changes(params: Dict):
+    """Check compact_changes parameters before the job is queued."""
+    check_integer(params, 'retention_days', minimum=0)
+    validate_batch_size(params)
+
+def compact_changes_job(ctx: JobContext) -> Dict:
+    """Compact the change log behind GET /api/changes, seq range by range."""
+    service = ChangeFeedService(ctx.db)
+    return service.compact(ctx.params.get('retention_days', DEFAULT_RETENTION_DAYS),
+                           batch_size=ctx.params.get('batch_size', JOB_BATCH_SIZE),
+                           on_progress=ctx.report)
+
+def maintenance_job(ctx: JobContext) -> Dict:
+    """Run database maintenance tasks (see MaintenanceService.run) and report sizes."""
+    tasks = ctx.params.get('tasks', list(SCHEDULED_TASKS))
+    service = MaintenanceService(ctx.db)
+    results = service.run(tasks, on_task=lambda done: ctx.report(done / len(tasks)))
+    report = service.size_report()
+    results['size'] = {key: report[key] for key in
+                       ('page_count', 'freelist_count', 'file_bytes', 'wal_bytes')}
+    return results
+
+def make_export_history_job(export_dir):
+    """Build the export job, writing CSV files into export_dir."""
+
+    def export_history_job(ctx: JobContext) -> Dict:
+        """Export the review history as CSV, streaming it in id ranges."""
+        batch_size = ctx.params.get('batch_size', JOB_BATCH_SIZE)
+        path = Path(export_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"review_history_{ctx.job_id}_{datetime.now(UTC):%Y%m%d%H%M%S}.csv"
+
+        cursor = ctx.db.cursor()
+        cursor.execute('SELECT MIN(id), MAX(id) FROM word_review_items')
+        min_id, max_id = cursor.fetchone()
+
+        rows = 0
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['review_id', 'study_session_id', 'group_id', 'study_activity_id',
+                             'word_id', 'spanish', 'english', 'correct', 'created_at'])
+            if max_id is not None:
+                for start_id in range(min_id, max_id + 1, batch_size):
+                    cursor.execute('''
+                        SELECT
+                            wri.id, wri.study_session_id, ss.group_id, ss.study_activity_id,
+                            wri.word_id, w.spanish, w.english, wri.correct, wri.created_at
+                        FROM word_review_items wri
+                        LEFT JOIN study_sessions ss ON ss.id = wri.study_session_id
+                        LEFT JOIN words w ON w.id = wri.word_id
+                        WHERE wri.id >= ? AND wri.id < ?
+                        ORDER BY wri.id
+                    ''', (start_id, start_id + batch_size))
+                    batch = cursor.fetchall()
+                    writer.writerows(tuple(row) for row in batch)
+                    rows += len(batch)
+                    ctx.report((min(start_id + batch_size, max_id + 1) - min_id) / (max_id - min_id + 1))
+
+        return {'path': str(path), 'rows': rows}
+
+    return export_history_job
+
+def register_default_jobs(runner, export_dir='exports'):
+    """Register the built-in job types on a JobRunner."""
+    runner.register('seed', seed_job)
+    runner.register('reset_history', reset_history_job, validate=validate_reset_history)
+    runner.register('rebuild_stats', rebuild_stats_job, validate=validate_batch_size)
+    runner.register('export_history', make_export_history_job(export_dir), validate=validate_batch_size)
+    runner.register('compact_changes', compact_changes_job, validate=validate_compact_changes)
+    runner.register('maintenance', maintenance_job)
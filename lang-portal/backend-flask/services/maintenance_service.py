@@ -0,0 +1,166 @@
+from typing import List, Dict, Optional
+import os
+import time
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maintenance tasks in the order they run; the scheduled job skips ANALYZE
+# and relies on PRAGMA optimize to refresh statistics that went stale
+MAINTENANCE_TASKS = ('analyze', 'optimize', 'checkpoint', 'vacuum')
+SCHEDULED_TASKS = ('optimize', 'checkpoint', 'vacuum')
+
+# Rows PRAGMA optimize samples per index when it re-analyzes a table, so a
+# scheduled run stays fast however large the history grows
+OPTIMIZE_ANALYSIS_LIMIT = 400
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+class MaintenanceService:
+    def __init__(self, db_connection: sqlite3.Connection):
+        self.db = db_connection
+
+    def _pragma(self, name: str):
+        cursor = self.db.cursor()
+        cursor.execute(f'PRAGMA {name}')
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def database_path(self) -> Optional[str]:
+        """File of the main database, or None for an in-memory one."""
+        cursor = self.db.cursor()
+        cursor.execute('PRAGMA database_list')
+        for row in cursor.fetchall():
+            if row[1] == 'main':
+                return row[2] or None
+        return None
+
+    def size_report(self) -> Dict:
+        """Report file, WAL and freelist sizes and the pages of every table and index.
+
+        Per-object sizes come from the dbstat virtual table; they are None
+        when SQLite was built without it.
+
+        Returns:
+            Dict with page_size, page_count, freelist_count, file_bytes,
+            wal_bytes, journal_mode, auto_vacuum and objects (largest first:
+            name, type, table, pages, bytes, unused_bytes)
+        """
+        page_size = self._pragma('page_size')
+        path = self.database_path()
+        wal_path = f'{path}-wal' if path else None
+
+        report = {
+            'path': path,
+            'page_size': page_size,
+            'page_count': self._pragma('page_count'),
+            'freelist_count': self._pragma('freelist_count'),
+            'file_bytes': os.path.getsize(path) if path and os.path.exists(path) else None,
+            'wal_bytes': os.path.getsize(wal_path) if wal_path and os.path.exists(wal_path) else 0,
+            'journal_mode': self._pragma('journal_mode'),
+            'auto_vacuum': AUTO_VACUUM_MODES.get(self._pragma('auto_vacuum')),
+            'objects': None
+        }
+
+        cursor = self.db.cursor()
+        try:
+            cursor.execute('''
+                SELECT d.name, s.type, s.tbl_name, d.pageno, d.pgsize, d.unused
+                FROM dbstat d
+                LEFT JOIN sqlite_schema s ON s.name = d.name
+                WHERE d.aggregate = TRUE
+                ORDER BY d.pgsize DESC, d.name
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"dbstat is not available: {e}")
+            return report
+
+        report['objects'] = [{
+            'name': row[0],
+            'type': row[1] or 'table',  # sqlite_schema itself has no schema row
+            'table': row[2] or row[0],
+            'pages': row[3],
+            'bytes': row[4],
+            'unused_bytes': row[5]
+        } for row in cursor.fetchall()]
+        return report
+
+    def analyze(self) -> Dict:
+        """Recompute query planner statistics for every table and index."""
+        cursor = self.db.cursor()
+        # An attached vocabulary database is read-only and analyzed when it is built
+        cursor.execute('ANALYZE main')
+        self.db.commit()
+        return {}
+
+    def optimize(self) -> Dict:
+        """Run PRAGMA optimize, which re-analyzes tables whose statistics went stale."""
+        cursor = self.db.cursor()
+        cursor.execute(f'PRAGMA analysis_limit = {OPTIMIZE_ANALYSIS_LIMIT}')
+        cursor.fetchall()
+        cursor.execute('PRAGMA optimize')
+        cursor.fetchall()
+        self.db.commit()
+        return {}
+
+    def checkpoint(self) -> Dict:
+        """Copy the WAL into the database and truncate it.
+
+        Returns:
+            Dict with busy (1 if readers kept it from finishing), wal_frames
+            and checkpointed_frames; all -1 when not in WAL mode
+        """
+        cursor = self.db.cursor()
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        busy, wal_frames, checkpointed = cursor.fetchone()
+        return {'busy': busy, 'wal_frames': wal_frames, 'checkpointed_frames': checkpointed}
+
+    def vacuum(self, pages: int = 0) -> Dict:
+        """Hand free pages back to the file system with an incremental vacuum.
+
+        Only databases created with auto_vacuum = INCREMENTAL (see
+        init_db) can do this without rewriting the whole file.
+
+        Args:
+            pages: Most pages to free; 0 frees them all
+
+        Returns:
+            Dict with freed_pages and freed_bytes
+        """
+        if self._pragma('auto_vacuum') != 2:
+            return {'freed_pages': 0, 'freed_bytes': 0, 'skipped': 'auto_vacuum is not incremental'}
+
+        before = self._pragma('freelist_count')
+        # execute() would step the pragma once, freeing a single page;
+        # executescript() runs it to completion
+        cursor = self.db.cursor()
+        cursor.executescript(f'PRAGMA incremental_vacuum({int(pages)})')
+        freed = before - self._pragma('freelist_count')
+        return {'freed_pages': freed, 'freed_bytes': freed * self._pragma('page_size')}
+
+    def run(self, tasks: List[str] = MAINTENANCE_TASKS, on_task=None) -> Dict:
+        """Run maintenance tasks in MAINTENANCE_TASKS order.
+
+        Args:
+            tasks: Names from MAINTENANCE_TASKS
+            on_task: Called with the number of tasks done after each one
+
+        Returns:
+            Dict of task name to its result, each with the seconds it took
+
+        Raises:
+            ValueError: If a task is unknown
+        """
+        unknown = set(tasks).difference(MAINTENANCE_TASKS)
+        if unknown:
+            raise ValueError(f"Unknown maintenance tasks: {', '.join(sorted(unknown))}")
+
+        results = {}
+        for task in (task for task in MAINTENANCE_TASKS if task in tasks):
+            started = time.perf_counter()
+            result = getattr(self, task)()
+            results[task] = {**result, 'seconds': round(time.perf_counter() - started, 3)}
+            if on_task:
+                on_task(len(results))
+        return results
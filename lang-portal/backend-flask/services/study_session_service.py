@@ -1,13 +1,63 @@
-from typing import List, Optional, Dict
-from dataclasses import dataclass
+from typing import List, Optional, Dict, Callable
+from dataclasses import dataclass, asdict
 import sqlite3
+import time
 from datetime import datetime, UTC
 import traceback
 import logging
+from lib.jobs import JobCancelled
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Rows deleted per transaction when resetting study history
+RESET_BATCH_SIZE = 1000
+
+class ResetInProgressError(Exception):
+    """Raised when a history reset is requested while another one runs."""
+
+class ReviewConflictError(Exception):
+    """Raised when a review_uuid is reused for a different review."""
+
+@dataclass
+class ResetProgress:
+    state: str = 'idle'  # idle, or the state of the reset_history job
+    job_id: Optional[int] = None
+    group_id: Optional[int] = None
+    study_activity_id: Optional[int] = None
+    sessions_total: int = 0
+    sessions_deleted: int = 0
+    review_items_deleted: int = 0
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_job(cls, job: Optional[Dict]) -> 'ResetProgress':
+        """Progress of a reset_history job, from the counts it last reported.
+
+        Resets run as jobs, so this is what any process sees; without a job
+        there has been no reset.
+        """
+        if job is None:
+            return cls()
+        counts = job['result'] or {}
+        return cls(
+            state=job['state'],
+            job_id=job['id'],
+            group_id=job['params'].get('group_id'),
+            study_activity_id=job['params'].get('study_activity_id'),
+            sessions_total=counts.get('sessions_total', 0),
+            sessions_deleted=counts.get('sessions_deleted', 0),
+            review_items_deleted=counts.get('review_items_deleted', 0),
+            started_at=job['started_at'],
+            finished_at=job['finished_at'],
+            error=job['error']
+        )
+
 @dataclass
 class StudySession:
     id: int
@@ -78,8 +128,17 @@ class StudySessionService:
             logger.error(f"Error submitting word review: {e}")
             return False
 
-    def review_word(self, session_id: int, word_id: int, correct: bool):
-        """Create a word review for a study session"""
+    def review_word(self, session_id: int, word_id: int, correct: bool,
+                    review_uuid: Optional[str] = None):
+        """Create a word review for a study session.
+
+        With a review_uuid the review is recorded at most once: submitting
+        the same uuid again returns the first review, marked replayed,
+        without counting it in the stats again.
+
+        Raises:
+            ReviewConflictError: If review_uuid belongs to a different review
+        """
         try:
             cursor = self.db.cursor()
             
@@ -99,14 +158,30 @@ class StudySessionService:
             
             # Create the review with UTC timestamp
             created_at = datetime.now(UTC).isoformat()
-            cursor.execute('''
-                INSERT INTO word_review_items (
-                    study_session_id,
-                    word_id,
-                    correct,
-                    created_at
-                ) VALUES (?, ?, ?, ?)
-            ''', (session_id, word_id, correct, created_at))
+            if review_uuid is None:
+                cursor.execute('''
+                    INSERT INTO word_review_items (
+                        study_session_id,
+                        word_id,
+                        correct,
+                        created_at
+                    ) VALUES (?, ?, ?, ?)
+                ''', (session_id, word_id, correct, created_at))
+            else:
+                # The unique index makes a concurrent duplicate a no-op too
+                cursor.execute('''
+                    INSERT INTO word_review_items (
+                        study_session_id,
+                        word_id,
+                        correct,
+                        created_at,
+                        review_uuid
+                    ) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (review_uuid) WHERE review_uuid IS NOT NULL DO NOTHING
+                ''', (session_id, word_id, correct, created_at, review_uuid))
+                if cursor.rowcount == 0:
+                    return self._replayed_review(review_uuid, session_id, word_id, correct)
+            review_id = cursor.lastrowid
             
             # Update statistics in word_review_items_stats table
             cursor.execute('''
@@ -125,16 +200,198 @@ class StudySessionService:
             
             self.db.commit()
             
-            return {
+            result = {
                 'success': True,
-                'id': cursor.lastrowid,
+                'id': review_id,
                 'study_session_id': session_id,
                 'word_id': word_id,
                 'correct': correct,
                 'created_at': created_at
             }
+            if review_uuid is not None:
+                result.update(review_uuid=review_uuid, replayed=False)
+            return result
             
+        except ReviewConflictError:
+            raise
         except Exception as e:
             logger.error(f"Error in review_word: {str(e)}")
             logger.error(traceback.format_exc())
-            raise 
\ No newline at end of file
+            raise
+
+    def _replayed_review(self, review_uuid: str, session_id: int, word_id: int, correct: bool) -> Dict:
+        """The review first submitted with review_uuid, checked against the replay."""
+        cursor = self.db.cursor()
+        cursor.execute('''
+            SELECT id, study_session_id, word_id, correct, created_at
+            FROM word_review_items
+            WHERE review_uuid = ?
+        ''', (review_uuid,))
+        review = cursor.fetchone()
+        self.db.commit()
+
+        if (review['study_session_id'], review['word_id'], bool(review['correct'])) != \
+                (session_id, word_id, bool(correct)):
+            raise ReviewConflictError(f"review_uuid {review_uuid} was already used for another review")
+
+        return {
+            'success': True,
+            'id': review['id'],
+            'study_session_id': review['study_session_id'],
+            'word_id': review['word_id'],
+            'correct': bool(review['correct']),
+            'created_at': review['created_at'],
+            'review_uuid': review_uuid,
+            'replayed': True
+        }
+
+    def reset_history(self, group_id: Optional[int] = None, study_activity_id: Optional[int] = None,
+                      batch_size: int = RESET_BATCH_SIZE, pause_seconds: float = 0.0,
+                      on_progress: Optional[Callable[[ResetProgress], None]] = None) -> ResetProgress:
+        """Delete study sessions and their review items in small transactions.
+
+        Sessions are processed batch_size at a time: their review items are
+        deleted in chunks, then the sessions themselves, each chunk in its own
+        transaction so other writers get the lock in between. Each chunk
+        recomputes the stats of the words it deleted reviews of before it
+        commits, so a reset stopped part way leaves stats that match the
+        remaining reviews. Freed pages are handed back with an incremental
+        vacuum at the end.
+
+        Run it through the reset_history job, which keeps one reset running
+        at a time across processes and records its progress.
+
+        Args:
+            group_id: Only reset sessions of this group
+            study_activity_id: Only reset sessions of this activity
+            batch_size: Rows deleted per transaction
+            pause_seconds: Sleep between transactions to yield to writers
+            on_progress: Called after every committed chunk; an exception
+                raised here stops the reset, JobCancelled as cancelled and
+                anything else as failed
+
+        Returns:
+            Final ResetProgress
+        """
+        progress = ResetProgress(
+            state='running',
+            group_id=group_id,
+            study_activity_id=study_activity_id,
+            started_at=datetime.now(UTC).isoformat()
+        )
+
+        try:
+            cursor = self.db.cursor()
+            scope = '''
+                (:group_id IS NULL OR group_id = :group_id)
+                AND (:activity_id IS NULL OR study_activity_id = :activity_id)
+            '''
+            params = {'group_id': group_id, 'activity_id': study_activity_id}
+
+            cursor.execute(f'SELECT COUNT(*) FROM study_sessions WHERE {scope}', params)
+            progress.sessions_total = cursor.fetchone()[0]
+
+            def commit_chunk():
+                self.db.commit()
+                if on_progress:
+                    on_progress(progress)
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+
+            def delete_review_items(sql, parameters):
+                """Delete one chunk of review items and fix their words' stats; returns the count."""
+                cursor.execute(sql, parameters)
+                deleted = cursor.fetchall()
+                self._refresh_word_stats(sorted({row[0] for row in deleted}))
+                progress.review_items_deleted += len(deleted)
+                commit_chunk()
+                return len(deleted)
+
+            while True:
+                cursor.execute(f'''
+                    SELECT id FROM study_sessions
+                    WHERE {scope}
+                    ORDER BY id
+                    LIMIT :limit
+                ''', {**params, 'limit': batch_size})
+                session_ids = [row[0] for row in cursor.fetchall()]
+                if not session_ids:
+                    break
+                placeholders = ','.join('?' * len(session_ids))
+
+                # Review items first, since they reference the sessions
+                while delete_review_items(f'''
+                    DELETE FROM word_review_items
+                    WHERE id IN (
+                        SELECT id FROM word_review_items
+                        WHERE study_session_id IN ({placeholders})
+                        LIMIT ?
+                    )
+                    RETURNING word_id
+                ''', (*session_ids, batch_size)):
+                    pass
+
+                cursor.execute(f'DELETE FROM study_sessions WHERE id IN ({placeholders})', session_ids)
+                progress.sessions_deleted += cursor.rowcount
+                commit_chunk()
+
+            if group_id is None and study_activity_id is None:
+                # A full reset also clears review items left without a session
+                while delete_review_items('''
+                    DELETE FROM word_review_items
+                    WHERE id IN (SELECT id FROM word_review_items LIMIT ?)
+                    RETURNING word_id
+                ''', (batch_size,)):
+                    pass
+
+            # executescript() steps the pragma until every free page is released
+            cursor.executescript('PRAGMA incremental_vacuum')
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            cursor.fetchall()
+
+            progress.state = 'completed'
+            progress.finished_at = datetime.now(UTC).isoformat()
+            return progress
+
+        except JobCancelled:
+            self.db.rollback()
+            progress.state = 'cancelled'
+            progress.finished_at = datetime.now(UTC).isoformat()
+            raise
+        except Exception as e:
+            logger.error(f"Error resetting study history: {str(e)}")
+            self.db.rollback()
+            progress.state = 'failed'
+            progress.error = str(e)
+            progress.finished_at = datetime.now(UTC).isoformat()
+            raise
+
+    def _refresh_word_stats(self, word_ids: List[int]):
+        """Recompute word_review_items_stats for the given words, in the caller's transaction."""
+        if word_ids:
+            cursor = self.db.cursor()
+            placeholders = ','.join('?' * len(word_ids))
+            # Every word keeps a stats row (the word list sorts on it), so
+            # words left without reviews are zeroed rather than deleted
+            cursor.execute(f'''
+                UPDATE word_review_items_stats
+                SET last_reviewed = NULL
+                WHERE word_id IN ({placeholders})
+                AND NOT EXISTS (
+                    SELECT 1 FROM word_review_items wri
+                    WHERE wri.word_id = word_review_items_stats.word_id
+                )
+            ''', word_ids)
+            cursor.execute(f'''
+                UPDATE word_review_items_stats
+                SET
+                    correct_count = (
+                        SELECT COUNT(*) FROM word_review_items wri
+                        WHERE wri.word_id = word_review_items_stats.word_id AND wri.correct = 1
+                    ),
+                    wrong_count = (
+                        SELECT COUNT(*) FROM word_review_items wri
+                        WHERE wri.word_id = word_review_items_stats.word_id AND wri.correct = 0
+                    )
+                WHERE word_id IN ({placeholders})
+            ''', word_ids)
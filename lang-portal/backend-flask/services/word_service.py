@@ -0,0 +1,295 @@
+from typing import List, Dict, Iterable, Optional
+from dataclasses import dataclass
+import base64
+import sqlite3
+import json
+from lib.fields import select_list, project
+
+# Upper bound on ids accepted by a single bulk lookup
+MAX_BULK_IDS = 500
+# Upper bound on words returned by one page of the word list
+MAX_PAGE_SIZE = 200
+# Upper bound on words returned by a hardest-words ranking
+MAX_HARDEST = 100
+# Groups up to this size are ranked by sorting their members; larger groups
+# walk the difficulty index and stop at the first n members found
+HARDEST_SORT_GROUP_SIZE = 2000
+
+# Sortable columns: (sort key expression, id column, FROM clause). Each key
+# matches an index (see migration 0007) whose implicit last column is the
+# word id, so (key, id) order and keyset seeks are index walks
+_WORDS_FIRST = 'words w JOIN word_review_items_stats s ON s.word_id = w.id'
+_STATS_FIRST = 'word_review_items_stats s JOIN words w ON w.id = s.word_id'
+WORD_SORT_COLUMNS = {
+    'spanish': ('w.spanish COLLATE NOCASE', 'w.id', _WORDS_FIRST),
+    'english': ('w.english COLLATE NOCASE', 'w.id', _WORDS_FIRST),
+    'correct_count': ('s.correct_count', 's.word_id', _STATS_FIRST),
+    'wrong_count': ('s.wrong_count', 's.word_id', _STATS_FIRST),
+    'success_ratio': ('IFNULL(s.success_ratio, -1)', 's.word_id', _STATS_FIRST),
+    'last_reviewed': ("IFNULL(s.last_reviewed, '')", 's.word_id', _STATS_FIRST),
+}
+
+# Fields of a word list entry (for fields=); stats fields need the stats join
+WORD_FIELDS = {
+    'id': 'w.id',
+    'spanish': 'w.spanish',
+    'english': 'w.english',
+    'correct_count': 's.correct_count',
+    'wrong_count': 's.wrong_count',
+    'success_ratio': 's.success_ratio',
+    'last_reviewed': 's.last_reviewed',
+}
+
+@dataclass
+class WordPage:
+    words: List[Dict]
+    next_cursor: Optional[str]
+    # Only counted for pages requested without a cursor
+    total_words: Optional[int]
+
+def encode_cursor(sort_value, word_id: int) -> str:
+    """Opaque keyset cursor for the word after (sort_value, word_id)."""
+    return base64.urlsafe_b64encode(json.dumps([sort_value, word_id]).encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Decode a cursor from encode_cursor into (sort_value, word_id).
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        sort_value, word_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(word_id, int) or isinstance(sort_value, (list, dict)):
+        raise ValueError("Invalid cursor")
+    return sort_value, word_id
+
+class WordService:
+    def __init__(self, db_connection: sqlite3.Connection):
+        self.db = db_connection
+
+    def list_words(self, sort_by: str = 'spanish', order: str = 'asc', per_page: int = 50,
+                   cursor: Optional[str] = None, page: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> WordPage:
+        """List words with their stats, ordered by a word or stats column.
+
+        Pagination is by keyset: pass the previous page's next_cursor to
+        continue after its last word, which is an index seek however deep
+        the page is. page (an OFFSET) is still accepted for page-number UIs.
+
+        Args:
+            sort_by: One of WORD_SORT_COLUMNS; ties are broken by word id
+            order: 'asc' or 'desc'
+            per_page: Words per page, up to MAX_PAGE_SIZE
+            cursor: next_cursor of the previous page
+            page: 1-based page number, used when no cursor is given
+            fields: Fields of WORD_FIELDS to return (default all); without
+                stats fields or a stats sort the stats table is not joined
+
+        Returns:
+            WordPage; next_cursor is None on the last page, total_words is
+            None for pages requested with a cursor (the count is a full
+            scan, which the first page's response already carries)
+
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        if sort_by not in WORD_SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of: {', '.join(WORD_SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if per_page < 1 or per_page > MAX_PAGE_SIZE:
+            raise ValueError(f"per_page must be between 1 and {MAX_PAGE_SIZE}")
+        if page is not None and page < 1:
+            raise ValueError("page must be 1 or greater")
+
+        key, id_column, from_clause = WORD_SORT_COLUMNS[sort_by]
+        fields = fields or list(WORD_FIELDS)
+        if from_clause == _WORDS_FIRST and not any(WORD_FIELDS[field].startswith('s.') for field in fields):
+            # Every word has exactly one stats row, so the join adds nothing here
+            from_clause = 'words w'
+        direction, op = ('ASC', '>') if order == 'asc' else ('DESC', '<')
+
+        where = ''
+        params = {'limit': per_page + 1, 'offset': 0}
+        if cursor is not None:
+            params['after_value'], params['after_id'] = decode_cursor(cursor)
+            # The first condition seeks the index; the second skips ties already seen
+            where = f'''
+                WHERE {key} {op}= :after_value
+                AND ({key} {op} :after_value OR {id_column} {op} :after_id)
+            '''
+        elif page is not None:
+            params['offset'] = (page - 1) * per_page
+
+        db_cursor = self.db.cursor()
+        db_cursor.execute(f'''
+            SELECT
+                {select_list(fields, WORD_FIELDS)},
+                {key} AS sort_value,
+                {id_column} AS sort_id
+            FROM {from_clause}
+            {where}
+            ORDER BY {key} {direction}, {id_column} {direction}
+            LIMIT :limit OFFSET :offset
+        ''', params)
+        rows = db_cursor.fetchall()
+
+        total_words = None
+        if cursor is None:
+            db_cursor.execute('SELECT COUNT(*) FROM words')
+            total_words = db_cursor.fetchone()[0]
+
+        words = project(rows[:per_page], fields)
+
+        # One extra row was fetched to know whether another page follows
+        next_cursor = None
+        if len(rows) > per_page:
+            last = rows[per_page - 1]
+            next_cursor = encode_cursor(last["sort_value"], last["sort_id"])
+
+        return WordPage(words=words, next_cursor=next_cursor, total_words=total_words)
+
+    def hardest_words(self, n: int = 10, group_id: Optional[int] = None) -> Optional[List[Dict]]:
+        """Rank reviewed words by difficulty (smoothed error rate, see migration 0009).
+
+        Reads only word_review_items_stats and its difficulty index; words
+        never reviewed are not ranked.
+
+        Args:
+            n: Number of words to return, up to MAX_HARDEST
+            group_id: Only rank this group's words
+
+        Returns:
+            Words hardest first (ties by id), or None if the group doesn't exist
+
+        Raises:
+            ValueError: If n is out of range
+        """
+        if n < 1 or n > MAX_HARDEST:
+            raise ValueError(f"n must be between 1 and {MAX_HARDEST}")
+
+        cursor = self.db.cursor()
+        columns = '''
+            w.id, w.spanish, w.english,
+            s.correct_count, s.wrong_count, s.difficulty
+        '''
+        if group_id is None:
+            cursor.execute(f'''
+                SELECT {columns}
+                FROM word_review_items_stats s
+                JOIN words w ON w.id = s.word_id
+                WHERE s.difficulty IS NOT NULL
+                ORDER BY s.difficulty DESC, s.word_id
+                LIMIT ?
+            ''', (n,))
+            return [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute('''
+            SELECT COALESCE(words_count,
+                (SELECT COUNT(*) FROM word_groups wg WHERE wg.group_id = groups.id))
+            FROM groups WHERE id = ?
+        ''', (group_id,))
+        group = cursor.fetchone()
+        if group is None:
+            return None
+
+        if group[0] <= HARDEST_SORT_GROUP_SIZE:
+            # Few members: look each one up and sort them
+            from_clause = '''word_groups wg
+                JOIN word_review_items_stats s ON s.word_id = wg.word_id'''
+        else:
+            # Many members: walk the index hardest first, keeping members
+            from_clause = '''word_review_items_stats s
+                CROSS JOIN word_groups wg ON wg.word_id = s.word_id'''
+        cursor.execute(f'''
+            SELECT {columns}
+            FROM {from_clause}
+            JOIN words w ON w.id = s.word_id
+            WHERE wg.group_id = ? AND s.difficulty IS NOT NULL
+            ORDER BY s.difficulty DESC, s.word_id
+            LIMIT ?
+        ''', (group_id, n))
+        return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def parse_ids(raw_ids: Iterable) -> List[int]:
+        """Validate and normalize a list of word ids.
+
+        Args:
+            raw_ids: Iterable of ints or numeric strings
+
+        Returns:
+            List of unique positive ids, in first-seen order
+
+        Raises:
+            ValueError: If an id is not a positive integer or too many ids are given
+        """
+        ids = []
+        seen = set()
+        for raw in raw_ids:
+            if isinstance(raw, bool):
+                raise ValueError(f"Invalid word id: {raw!r}")
+            if isinstance(raw, str):
+                raw = raw.strip()
+                if not raw.isdigit():
+                    raise ValueError(f"Invalid word id: {raw!r}")
+                raw = int(raw)
+            if not isinstance(raw, int) or raw <= 0:
+                raise ValueError(f"Invalid word id: {raw!r}")
+            if raw not in seen:
+                seen.add(raw)
+                ids.append(raw)
+
+        if not ids:
+            raise ValueError("At least one word id is required")
+        if len(ids) > MAX_BULK_IDS:
+            raise ValueError(f"At most {MAX_BULK_IDS} word ids can be requested at once")
+        return ids
+
+    def get_words_by_ids(self, word_ids: List[int]) -> List[Dict]:
+        """Get full word records for a list of ids in a single query.
+
+        Stats come from word_review_items_stats and group memberships are
+        aggregated in SQL with json_group_array, so no per-word round trips
+        or string parsing are needed.
+
+        Args:
+            word_ids: Validated word ids (see parse_ids)
+
+        Returns:
+            List of word dictionaries in the order the ids were requested.
+            Ids that don't exist are omitted.
+        """
+        cursor = self.db.cursor()
+        cursor.execute('''
+            SELECT
+                w.id,
+                w.spanish,
+                w.english,
+                COALESCE(s.correct_count, 0) AS correct_count,
+                COALESCE(s.wrong_count, 0) AS wrong_count,
+                s.last_reviewed,
+                (
+                    SELECT json_group_array(json_object('id', g.id, 'name', g.name))
+                    FROM word_groups wg
+                    JOIN groups g ON g.id = wg.group_id
+                    WHERE wg.word_id = w.id
+                ) AS groups
+            FROM words w
+            LEFT JOIN word_review_items_stats s ON s.word_id = w.id
+            WHERE w.id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(word_ids),))
+
+        words = {row["id"]: {
+            "id": row["id"],
+            "spanish": row["spanish"],
+            "english": row["english"],
+            "correct_count": row["correct_count"],
+            "wrong_count": row["wrong_count"],
+            "last_reviewed": row["last_reviewed"],
+            "groups": json.loads(row["groups"])
+        } for row in cursor.fetchall()}
+
+        return [words[word_id] for word_id in word_ids if word_id in words]
@@ -0,0 +1,73 @@
+import pytest
+import sqlite3
+from app import create_app
+from db.init_db import init_db, main as init_and_seed
+from lib.db import Db
+
+@pytest.fixture(scope='session')
+def migrated_template():
+    """Empty, fully migrated database built once in memory"""
+    template = Db.memory('migrated_template')
+    init_db(db_path=template.database)
+    yield template
+    template.keepalive.close()
+
+@pytest.fixture
+def migrated_db_path(migrated_template, tmp_path):
+    """Fresh migrated database file for one test, cloned from the template"""
+    db_path = tmp_path / 'words.db'
+    migrated_template.snapshot(db_path)
+    return db_path
+
+@pytest.fixture(scope='session')
+def seeded_template():
+    """Migrated database with the seed groups, words and activities, built once in memory"""
+    template = Db.memory('seeded_template')
+    init_and_seed(db_path=template.database)
+    yield template
+    template.keepalive.close()
+
+@pytest.fixture
+def seeded_db_path(seeded_template, tmp_path):
+    """Fresh seeded database file for one test, cloned from the template"""
+    db_path = tmp_path / 'words.db'
+    seeded_template.snapshot(db_path)
+    return db_path
+
+@pytest.fixture
+def make_app(migrated_db_path):
+    """Factory for apps on the test's migrated database.
+
+    make_app(config=None, seed_sql=None) runs seed_sql against the database,
+    then creates an app with config on top of DATABASE. Job runners and
+    event tails of the apps made are shut down after the test.
+    """
+    apps = []
+
+    def make(config=None, seed_sql=None):
+        if seed_sql:
+            conn = sqlite3.connect(migrated_db_path)
+            conn.executescript(seed_sql)
+            conn.close()
+        app = create_app({'DATABASE': str(migrated_db_path), **(config or {})})
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        app.jobs.shutdown()
+        app.event_tail.stop()
+
+@pytest.fixture
+def portal_app(make_app):
+    """App on an empty migrated database; modules override it through make_app.
+
+    Not named ``app`` so pytest-flask doesn't hold a request context open
+    around each test, which would keep connections out of the pool.
+    """
+    return make_app()
+
+@pytest.fixture
+def client(portal_app):
+    """Create test client"""
+    return portal_app.test_client()
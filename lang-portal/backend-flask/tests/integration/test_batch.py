@@ -0,0 +1,97 @@
+import pytest
+import sqlite3
+import routes.batch
+from routes.batch import MAX_BATCH_REQUESTS
+
+DASHBOARD_PATHS = ['/dashboard/stats', '/dashboard/recent-session', '/api/groups', '/api/study-activities']
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app on a migrated database in WAL mode with a group and a session"""
+    return make_app({'SLOW_REQUEST_MS': 0}, seed_sql='''
+        PRAGMA journal_mode = WAL;
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1);
+        INSERT INTO study_sessions (id, group_id, study_activity_id, created_at) VALUES (1, 1, 1, '2025-01-01');
+    ''')
+
+def batch(client, paths):
+    return client.post('/api/batch', json={'requests': [{'path': path} for path in paths]})
+
+def test_batch_returns_each_response(client):
+    """Test that a batch returns what the separate requests return, in order"""
+    response = batch(client, DASHBOARD_PATHS)
+    assert response.status_code == 200
+    responses = response.get_json()['responses']
+
+    assert [item['path'] for item in responses] == DASHBOARD_PATHS
+    for item in responses:
+        single = client.get(item['path'])
+        assert item['status'] == single.status_code
+        assert item['body'] == single.get_json()
+
+def test_batch_keeps_query_strings_and_errors(client):
+    """Test that sub-requests see their own arguments and report their own status"""
+    responses = batch(client, ['/api/groups/1/words?fields=spanish', '/api/groups/99/words', '/api/nope'])
+    responses = responses.get_json()['responses']
+
+    assert responses[0]['status'] == 200
+    assert responses[0]['body']['words'] == [{'spanish': 'gato'}]
+    assert responses[1]['status'] == 404
+    assert responses[2]['status'] == 404
+
+def test_batch_reads_one_snapshot(portal_app, client, monkeypatch):
+    """Test that writes committed during a batch are not seen by its later sub-requests"""
+    dispatch = routes.batch.dispatch_subrequest
+    written = []
+
+    def dispatch_then_write(app, path):
+        response = dispatch(app, path)
+        written.append(path)
+        conn = sqlite3.connect(portal_app.config['DATABASE'])
+        conn.execute('INSERT INTO groups (name) VALUES (?)', (f'Group {len(written)}',))
+        conn.commit()
+        conn.close()
+        return response
+
+    monkeypatch.setattr(routes.batch, 'dispatch_subrequest', dispatch_then_write)
+    responses = batch(client, ['/api/groups', '/api/groups']).get_json()['responses']
+
+    assert responses[0]['body'] == responses[1]['body']
+    assert len(responses[1]['body']['groups']) == 1
+    # Both writes are there for the next request
+    assert len(client.get('/api/groups').get_json()['groups']) == 3
+
+def test_batch_is_sampled_as_one_request(portal_app, client):
+    """Test that the slow-request sampler records the batch with its sub-requests' SQL"""
+    portal_app.slow_requests.clear()
+    batch(client, ['/api/groups', '/api/study-activities'])
+
+    entries = portal_app.slow_requests.entries()
+    assert [entry['path'] for entry in entries] == ['/api/batch']
+    statements = ' '.join(statement['sql'] for statement in entries[0]['statements'])
+    assert 'FROM groups' in statements and 'FROM study_activities' in statements
+
+@pytest.mark.parametrize('body', [
+    None,
+    {'requests': []},
+    {'requests': ['/api/groups']},
+    {'requests': [{'path': '/api/groups', 'method': 'POST'}]},
+    {'requests': [{'path': 'http://example.com/'}]},
+    {'requests': [{'path': '/api/events'}]},
+    {'requests': [{'path': '/api/batch'}]},
+    {'requests': [{'path': '/api/groups'}] * (MAX_BATCH_REQUESTS + 1)},
+])
+def test_invalid_batches(client, body):
+    """Test that malformed or unsupported batches are rejected"""
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_group_pack_is_inlined_uncompressed(client):
+    """Test that a group pack comes back as JSON rather than gzip bytes"""
+    responses = batch(client, ['/api/groups/1/pack']).get_json()['responses']
+    assert responses[0]['status'] == 200
+    assert responses[0]['body'] == client.get('/api/groups/1/pack').get_json()
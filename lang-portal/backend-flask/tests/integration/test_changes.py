@@ -0,0 +1,136 @@
+import pytest
+import sqlite3
+from services.change_feed_service import ChangeFeedService
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app on a migrated temporary database"""
+    return make_app({'CHANGES_COMPACT_INTERVAL': 3600})
+
+@pytest.fixture
+def conn(portal_app):
+    """Direct connection to the app's database"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+def test_changes_are_recorded_by_triggers(client, conn):
+    """Test that writes to synced tables land in the change log"""
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1);
+        UPDATE words SET english = 'kitty' WHERE id = 1;
+        DELETE FROM word_groups WHERE word_id = 1;
+    ''')
+
+    response = client.get('/api/changes?since=0')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert [(c['table'], c['row_id'], c['related_id'], c['op']) for c in data['changes']] == [
+        ('groups', 1, None, 'insert'),
+        # The word's stats row is created along with it
+        ('word_review_items_stats', 1, None, 'insert'),
+        ('words', 1, None, 'insert'),
+        ('word_groups', 1, 1, 'insert'),
+        ('words', 1, None, 'update'),
+        ('word_groups', 1, 1, 'delete'),
+    ]
+    assert data['next_since'] == data['changes'][-1]['seq']
+    assert data['has_more'] is False
+    assert data['resync_required'] is False
+
+def test_changes_pagination(client, conn):
+    """Test paging through the log with since and limit"""
+    conn.executescript('''
+        INSERT INTO groups (name) VALUES ('Numbers'), ('Colors'), ('Food');
+    ''')
+
+    first = client.get('/api/changes?since=0&limit=2').get_json()
+    assert len(first['changes']) == 2
+    assert first['has_more'] is True
+
+    second = client.get(f'/api/changes?since={first["next_since"]}&limit=2').get_json()
+    assert len(second['changes']) == 1
+    assert second['has_more'] is False
+
+    # Nothing new: the cursor stays where it is
+    third = client.get(f'/api/changes?since={second["next_since"]}').get_json()
+    assert third['changes'] == []
+    assert third['next_since'] == second['next_since']
+
+def test_changes_invalid_params(client):
+    """Test validation of since and limit"""
+    assert client.get('/api/changes?since=-1').status_code == 400
+    assert client.get('/api/changes?limit=0').status_code == 400
+    assert client.get('/api/changes?limit=abc').status_code == 400
+
+def test_compaction_keeps_latest_change_per_row(conn):
+    """Test that compaction keeps sync correct while dropping superseded changes"""
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals'), (2, 'Pets');
+        UPDATE groups SET name = 'Wild animals' WHERE id = 1;
+        UPDATE groups SET name = 'House pets' WHERE id = 2;
+    ''')
+    service = ChangeFeedService(conn)
+    before = service.get_changes(since=0, limit=100).changes
+
+    result = service.compact()
+    assert result == {'superseded': 2, 'expired': 0}
+
+    after = service.get_changes(since=0, limit=100)
+    assert [(c['row_id'], c['op']) for c in after.changes] == [(1, 'update'), (2, 'update')]
+    assert [c['seq'] for c in after.changes] == [c['seq'] for c in before[2:]]
+    assert after.resync_required is False
+
+def test_compaction_expires_old_deletes(conn):
+    """Test that expired tombstones force older clients to resync"""
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        DELETE FROM groups WHERE id = 1;
+        UPDATE changes SET changed_at = datetime('now', '-60 days');
+        INSERT INTO groups (id, name) VALUES (2, 'Pets');
+    ''')
+    service = ChangeFeedService(conn)
+
+    assert service.compact(retention_days=30) == {'superseded': 1, 'expired': 1}
+
+    assert service.get_changes(since=0, limit=100).resync_required is True
+    page = service.get_changes(since=2, limit=100)
+    assert page.resync_required is False
+    assert [c['row_id'] for c in page.changes] == [2]
+
+def test_compaction_in_seq_ranges(conn):
+    """Test that compacting a few seqs per transaction gives the same log"""
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals'), (2, 'Pets');
+        UPDATE groups SET name = 'Wild animals' WHERE id = 1;
+        UPDATE groups SET name = 'House pets' WHERE id = 2;
+        UPDATE groups SET name = 'Animals' WHERE id = 1;
+    ''')
+    service = ChangeFeedService(conn)
+    progress = []
+
+    assert service.compact(batch_size=2, on_progress=progress.append) == {'superseded': 3, 'expired': 0}
+    assert progress == [0.4, 0.8, 1.0]
+    changes = service.get_changes(since=0, limit=100).changes
+    assert [(c['seq'], c['row_id']) for c in changes] == [(4, 2), (5, 1)]
+
+def test_compaction_is_scheduled_not_requested(portal_app, client, monkeypatch):
+    """Test that compaction runs from the scheduler, not from reads of the feed"""
+    submitted = []
+    monkeypatch.setattr(portal_app.jobs, 'submit',
+                        lambda job_type, params, **kwargs: submitted.append((job_type, params)))
+
+    client.get('/api/changes')
+    assert submitted == []
+
+    portal_app.scheduler.run_pending()
+    assert ('compact_changes', {'retention_days': 30}) in submitted
+
+def test_compact_changes_job_params(client):
+    """Test that bad compaction parameters are refused before queueing"""
+    response = client.post('/api/jobs/compact_changes', json={'batch_size': 0})
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+import pytest
+
+# A little review history
+SEED_SQL = '''
+    INSERT INTO groups (id, name) VALUES (1, 'Animals');
+    INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+    INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog');
+    INSERT INTO study_sessions (id, group_id, study_activity_id, created_at)
+    VALUES (1, 1, 1, '2025-01-01');
+    INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+    VALUES (1, 1, 1, '2025-01-01'), (1, 1, 1, '2025-01-01'), (1, 1, 1, '2025-01-01'),
+           (1, 1, 1, '2025-01-01'), (1, 1, 0, '2025-01-01'), (1, 2, 0, '2025-01-01'),
+           (2, 2, 1, '2025-01-01');
+'''
+
+@pytest.mark.parametrize('engine', ['sql', 'numpy'])
+def test_dashboard_stats(make_app, engine):
+    """Test that both statistics engines agree on the dashboard numbers"""
+    app = make_app({'ANALYTICS_ENGINE': engine}, seed_sql=SEED_SQL)
+    response = app.test_client().get('/dashboard/stats')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    # The review in session 2 has no session and is ignored
+    assert data['total_vocabulary'] == 2
+    assert data['total_words_studied'] == 2
+    assert data['mastered_words'] == 1
+    assert data['success_rate'] == pytest.approx(4 / 6)
+    assert data['total_sessions'] == 1
+
+def test_dashboard_stats_singleflight_metrics(make_app):
+    """Test that dashboard stats run through the singleflight layer"""
+    client = make_app(seed_sql=SEED_SQL).test_client()
+    client.get('/dashboard/stats')
+    client.get('/dashboard/stats')
+
+    metrics = client.get('/api/metrics').get_json()['singleflight']
+    assert metrics['dashboard_stats']['calls'] == 2
+    assert metrics['dashboard_stats']['executions'] == 2
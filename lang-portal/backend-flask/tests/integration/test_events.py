@@ -0,0 +1,108 @@
+import json
+import pytest
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app on a migrated temporary database with one group and word"""
+    return make_app({'EVENTS_HEARTBEAT': 0.01, 'EVENTS_POLL_INTERVAL': 0.01}, seed_sql='''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1);
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Flashcards', 'http://localhost:8081', '/previews/flashcards.png');
+    ''')
+
+def read_event(chunks):
+    """Next event from the stream as (event, data), skipping keepalives"""
+    for chunk in chunks:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(('retry:', ':')):
+            continue
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+        return fields['event'], json.loads(fields['data'])
+
+def test_events_stream_session_and_review_updates(portal_app, client):
+    """Test that session creation and reviews are pushed to subscribers"""
+    response = client.get('/api/events', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry:')
+
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    assert read_event(chunks) == ('session', {**session, 'correct_count': 0, 'wrong_count': 0})
+    assert read_event(chunks) == ('stats', {'total_sessions': 1})
+
+    client.post(f"/api/study_sessions/{session['id']}/words/1/review", json={'correct': True})
+    event, review = read_event(chunks)
+    assert event == 'review'
+    assert review['word_id'] == 1
+    assert review['session_correct_count'] == 1
+    assert review['session_wrong_count'] == 0
+    assert read_event(chunks) == ('stats', {
+        'total_words_studied': 1,
+        'mastered_words': 0,
+        'total_reviews': 1,
+        'correct_reviews': 1
+    })
+
+    response.close()
+    assert not portal_app.events.has_subscribers
+
+def test_events_mastery_delta(portal_app, client):
+    """Test that the review crossing the mastery threshold reports it"""
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    for _ in range(4):
+        client.post(f"/api/study_sessions/{session['id']}/words/1/review", json={'correct': True})
+
+    response = client.get('/api/events', buffered=False)
+    chunks = iter(response.response)
+    client.post(f"/api/study_sessions/{session['id']}/words/1/review", json={'correct': True})
+    assert read_event(chunks)[0] == 'review'
+    assert read_event(chunks)[1]['mastered_words'] == 1
+
+    # The stats deltas agree with a fresh dashboard fetch
+    stats = client.get('/dashboard/stats').get_json()
+    assert stats['mastered_words'] == 1
+    assert stats['total_reviews'] == 5
+    response.close()
+
+def test_events_reach_streams_of_other_workers(portal_app, make_app):
+    """Test that a write handled by another app on the database is streamed"""
+    other = make_app({'EVENTS_POLL_INTERVAL': 0.01})
+    response = portal_app.test_client().get('/api/events', buffered=False)
+    chunks = iter(response.response)
+
+    session = other.test_client().post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    assert read_event(chunks) == ('session', {**session, 'correct_count': 0, 'wrong_count': 0})
+    assert read_event(chunks) == ('stats', {'total_sessions': 1})
+    assert not other.events.has_subscribers
+    response.close()
+
+def test_events_resync_after_reset(portal_app, client):
+    """Test that deleting study history tells clients to refetch"""
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    client.post(f"/api/study_sessions/{session['id']}/words/1/review", json={'correct': True})
+
+    response = client.get('/api/events', buffered=False)
+    chunks = iter(response.response)
+    conn = portal_app.db.connect()
+    conn.execute('DELETE FROM word_review_items')
+    conn.execute('DELETE FROM study_sessions')
+    conn.commit()
+    assert read_event(chunks) == ('resync', {})
+
+    # Review ids start over after the reset; the new review is still announced
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    assert read_event(chunks)[0] == 'session'
+    assert read_event(chunks)[0] == 'stats'
+    client.post(f"/api/study_sessions/{session['id']}/words/1/review", json={'correct': False})
+    event, review = read_event(chunks)
+    assert (event, review['session_wrong_count']) == ('review', 1)
+    conn.close()
+    response.close()
+
+def test_events_too_many_clients(portal_app, client):
+    """Test that clients beyond EVENTS_MAX_CLIENTS are turned away"""
+    portal_app.events.max_subscribers = 0
+    response = client.get('/api/events')
+    assert response.status_code == 503
@@ -0,0 +1,78 @@
+import pytest
+import sqlite3
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app on a migrated database with one group and one word"""
+    return make_app(seed_sql='''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+    ''')
+
+def group_words(portal_app):
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    return sorted(conn.execute('''
+        SELECT w.spanish, w.english FROM words w
+        JOIN word_groups wg ON wg.word_id = w.id
+        WHERE wg.group_id = 1
+    ''').fetchall())
+
+def test_bulk_add_json(portal_app, client):
+    """Test adding new and existing words from a JSON array"""
+    response = client.post('/api/groups/1/words:bulk', json=[
+        {'spanish': 'gato', 'english': 'cat'},
+        {'spanish': 'perro', 'english': 'dog'},
+        {'spanish': ' perro ', 'english': 'dog'},
+        {'spanish': 'vaca', 'english': 'cow'},
+    ])
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'rows': 4,
+        'words_created': 2,
+        'memberships_added': 3,
+        'words_count': 3
+    }
+    assert group_words(portal_app) == [('gato', 'cat'), ('perro', 'dog'), ('vaca', 'cow')]
+
+    # Repeating the import changes nothing
+    again = client.post('/api/groups/1/words:bulk', json=[{'spanish': 'vaca', 'english': 'cow'}])
+    assert again.get_json()['words_created'] == 0
+    assert again.get_json()['memberships_added'] == 0
+
+    groups = client.get('/api/groups').get_json()['groups']
+    assert groups[0]['word_count'] == 3
+
+def test_bulk_add_csv(portal_app, client):
+    """Test a streamed CSV upload spanning several batches"""
+    lines = ['English,Spanish'] + [f'word {i},palabra {i}' for i in range(12000)] + ['', 'cat,gato']
+    response = client.post('/api/groups/1/words:bulk', data='\n'.join(lines).encode(),
+                           content_type='text/csv')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['rows'] == 12001
+    assert data['words_created'] == 12000
+    assert data['words_count'] == 12001
+
+def test_bulk_add_invalid_rows_write_nothing(portal_app, client):
+    """Test that a bad row rejects the whole import"""
+    response = client.post('/api/groups/1/words:bulk', json=[
+        {'spanish': 'perro', 'english': 'dog'},
+        {'spanish': '', 'english': 'cow'},
+    ])
+    assert response.status_code == 400
+    assert 'Row 2' in response.get_json()['error']
+    assert group_words(portal_app) == []
+
+    response = client.post('/api/groups/1/words:bulk', data='spanish,meaning\ngato,cat',
+                           content_type='text/csv')
+    assert response.status_code == 400
+
+    assert client.post('/api/groups/1/words:bulk', json={'spanish': 'gato'}).status_code == 400
+
+def test_bulk_add_unknown_group_and_content_type(client):
+    """Test the responses for a missing group and an unsupported body"""
+    response = client.post('/api/groups/99/words:bulk', json=[{'spanish': 'gato', 'english': 'cat'}])
+    assert response.status_code == 404
+
+    response = client.post('/api/groups/1/words:bulk', data='gato', content_type='text/plain')
+    assert response.status_code == 415
@@ -0,0 +1,90 @@
+import gzip
+import json
+import pytest
+import sqlite3
+
+@pytest.fixture
+def conn(portal_app):
+    """Direct connection to the app's database"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals'), (2, 'Food');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog'), (3, 'pan', 'bread');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (2, 1), (3, 2);
+        UPDATE word_review_items_stats SET correct_count = 3, wrong_count = 1 WHERE word_id = 1;
+    ''')
+    yield conn
+    conn.close()
+
+def get_pack(client, **headers):
+    return client.get('/api/groups/1/pack', headers={'Accept-Encoding': 'gzip', **headers})
+
+def test_pack_contents(client, conn):
+    """Test that the pack is gzip JSON with the group's words and stats"""
+    response = get_pack(client)
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    pack = json.loads(gzip.decompress(response.data))
+    assert pack['group'] == {'id': 1, 'name': 'Animals'}
+    assert [w['spanish'] for w in pack['words']] == ['gato', 'perro']
+    assert pack['words'][0]['correct_count'] == 3
+    assert pack['words'][1]['wrong_count'] == 0
+
+def test_pack_without_gzip(client, conn):
+    """Test that clients without gzip support get plain JSON"""
+    response = client.get('/api/groups/1/pack', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_json()['words']) == 2
+
+def test_pack_etag_and_not_modified(client, conn):
+    """Test revalidation and pinned immutable fetches"""
+    etag = get_pack(client).headers['ETag']
+    assert get_pack(client, **{'If-None-Match': etag}).status_code == 304
+
+    pinned = client.get(f'/api/groups/1/pack?v={etag.strip(chr(34))}')
+    assert 'immutable' in pinned.headers['Cache-Control']
+
+def test_pack_invalidated_by_word_and_membership_changes(portal_app, client, conn):
+    """Test that the cached pack is rebuilt only when its words change"""
+    first = get_pack(client)
+    cached = portal_app.packs._packs[1]
+
+    # Other groups' changes leave the pack alone
+    conn.execute("UPDATE words SET english = 'loaf' WHERE id = 3")
+    conn.commit()
+    assert portal_app.packs._packs[1] is cached
+    get_pack(client)
+    assert portal_app.packs._packs[1] is cached
+
+    conn.execute("UPDATE words SET english = 'kitty' WHERE id = 1")
+    conn.commit()
+    second = get_pack(client)
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert json.loads(gzip.decompress(second.data))['words'][0]['english'] == 'kitty'
+
+    conn.execute('DELETE FROM word_groups WHERE word_id = 2 AND group_id = 1')
+    conn.commit()
+    third = get_pack(client, **{'If-None-Match': second.headers['ETag']})
+    assert third.status_code == 200
+    assert len(json.loads(gzip.decompress(third.data))['words']) == 1
+
+def test_pack_group_not_found(client, conn):
+    """Test the response for an unknown group"""
+    assert client.get('/api/groups/99/pack').status_code == 404
+
+def test_pack_invalidated_by_reviews(client, conn):
+    """Test that a review gives the pack a new ETag and the new stats"""
+    conn.execute("INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p')")
+    conn.commit()
+    first = get_pack(client)
+
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1}).get_json()
+    response = client.post(f"/api/study_sessions/{session['id']}/words/2/review", json={'correct': True})
+    assert response.status_code == 200
+
+    second = get_pack(client, **{'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert json.loads(gzip.decompress(second.data))['words'][1]['correct_count'] == 1
@@ -290,4 +290,36 @@ def test_get_group_words_sorting_invalid_params(client, app, test_data):
     response = client.get(
         f'/api/groups/{test_data["Animals"]}/words?sort_by=spanish&order=invalid'
     )
-    assert response.status_code == 200  # Should use default order 
\ No newline at end of file
+    assert response.status_code == 200  # Should use default order
+
+
+def test_sample_group_words_integration(client, app, test_data):
+    """Test sampling words from a group through API"""
+    response = client.get(f'/api/groups/{test_data["Animals"]}/words/sample?n=2')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert len(data['words']) == 2
+    assert {w['spanish'] for w in data['words']} <= {'perro', 'gato', 'pájaro'}
+
+    response = client.get(f'/api/groups/{test_data["Animals"]}/words/sample?n=0')
+    assert response.status_code == 400
+
+    response = client.get('/api/groups/999/words/sample')
+    assert response.status_code == 404
+
+def test_get_groups_sparse_fields(client, app, test_data):
+    """Test that fields= limits group and group word payloads"""
+    response = client.get('/api/groups?fields=id,group_name')
+    assert response.status_code == 200
+    assert response.get_json()['groups'] == [
+        {'id': test_data['Animals'], 'group_name': 'Animals'},
+        {'id': test_data['Colors'], 'group_name': 'Colors'}
+    ]
+
+    response = client.get(f'/api/groups/{test_data["Colors"]}/words?fields=spanish')
+    assert response.get_json()['words'] == [{'spanish': 'azul'}, {'spanish': 'rojo'}, {'spanish': 'verde'}]
+
+    response = client.get('/api/groups?fields=id,kanji')
+    assert response.status_code == 400
+    assert 'kanji' in response.get_json()['error']
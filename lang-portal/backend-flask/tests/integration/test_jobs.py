@@ -0,0 +1,291 @@
+import pytest
+import sqlite3
+import threading
+import time
+from lib.jobs import JobRunner
+from services.study_session_service import StudySessionService
+
+@pytest.fixture
+def portal_app(make_app, tmp_path):
+    """Create an app on a migrated temporary database with a job runner"""
+    return make_app({'EXPORT_DIR': str(tmp_path / 'exports')})
+
+@pytest.fixture
+def history(portal_app):
+    """Insert a group, an activity, a word and a session with three reviews"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1);
+        INSERT INTO study_sessions (id, group_id, study_activity_id, created_at) VALUES (1, 1, 1, '2025-01-01');
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (1, 1, 1, '2025-01-01'), (1, 1, 0, '2025-01-01'), (1, 1, 1, '2025-01-02');
+    ''')
+    conn.close()
+
+def wait_for(client, job_id, timeout=5):
+    """Poll a job until it has finished"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['state'] in ('completed', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_rebuild_stats_job(portal_app, client, history):
+    """Test running a job end to end through the API"""
+    response = client.post('/api/jobs/rebuild_stats', json={'batch_size': 10})
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['type'] == 'rebuild_stats'
+    assert job['params'] == {'batch_size': 10}
+
+    job = wait_for(client, job['id'])
+    assert job['state'] == 'completed'
+    assert job['progress'] == 1.0
+    assert job['result'] == {'words': 1}
+
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    assert conn.execute(
+        'SELECT correct_count, wrong_count, last_reviewed FROM word_review_items_stats'
+    ).fetchone() == (2, 1, '2025-01-02')
+
+def test_export_history_job(client, history):
+    """Test exporting the review history to CSV"""
+    job = client.post('/api/jobs/export_history').get_json()
+    job = wait_for(client, job['id'])
+
+    assert job['state'] == 'completed'
+    assert job['result']['rows'] == 3
+    with open(job['result']['path']) as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 4
+    assert lines[1].split(',')[5] == 'gato'
+
+def test_reset_history_in_background(portal_app, client, history):
+    """Test that the reset endpoint can hand work to the job runner"""
+    response = client.post('/api/study_sessions/reset', json={'background': True})
+    assert response.status_code == 202
+
+    job = wait_for(client, response.get_json()['id'])
+    assert job['state'] == 'completed'
+    assert job['result']['review_items_deleted'] == 3
+
+def test_reset_history_in_batches(portal_app, client, history):
+    """Test that a reset deletes everything in small batches and reports it from the job"""
+    portal_app.config['RESET_BATCH_SIZE'] = 2
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO study_sessions (id, group_id, study_activity_id, created_at) VALUES (2, 1, 1, '2025-01-03');
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (2, 1, 1, '2025-01-03'), (2, 1, 1, '2025-01-03');
+    ''')
+
+    response = client.post('/api/study_sessions/reset')
+    assert response.status_code == 200
+    progress = response.get_json()['progress']
+    assert progress['state'] == 'completed'
+    assert progress['sessions_total'] == 2
+    assert progress['sessions_deleted'] == 2
+    assert progress['review_items_deleted'] == 5
+
+    for table in ('study_sessions', 'word_review_items'):
+        assert conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] == 0
+    # The word keeps its stats row, zeroed
+    assert conn.execute(
+        'SELECT correct_count, wrong_count, last_reviewed FROM word_review_items_stats'
+    ).fetchall() == [(0, 0, None)]
+    conn.close()
+
+    status = client.get('/api/study_sessions/reset/status').get_json()
+    assert status['state'] == 'completed'
+    assert status['job_id'] == progress['job_id']
+    assert status['review_items_deleted'] == 5
+    assert client.get(f"/api/jobs/{progress['job_id']}").get_json()['type'] == 'reset_history'
+
+def test_reset_history_scoped_to_group(portal_app, client, history):
+    """Test that a scoped reset keeps other groups' history and stats"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (2, 'Pets');
+        INSERT INTO study_sessions (id, group_id, study_activity_id, created_at) VALUES (2, 2, 1, '2025-01-03');
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (2, 1, 1, '2025-01-03'), (2, 1, 0, '2025-01-03');
+    ''')
+
+    response = client.post('/api/study_sessions/reset', json={'group_id': 1})
+    assert response.status_code == 200
+    assert response.get_json()['progress']['sessions_deleted'] == 1
+
+    assert conn.execute('SELECT id FROM study_sessions').fetchall() == [(2,)]
+    # Stats only count the remaining reviews (one correct, one wrong)
+    assert conn.execute('SELECT correct_count, wrong_count FROM word_review_items_stats').fetchone() == (1, 1)
+    conn.close()
+
+def test_reset_status_is_shared_between_processes(make_app, history):
+    """Test that a reset in one app is seen and blocks resets in another on the same database"""
+    first, second = make_app(), make_app()
+    conn = sqlite3.connect(first.config['DATABASE'])
+    conn.execute('''
+        INSERT INTO jobs (id, type, state, params, result, created_at, started_at)
+        VALUES (7, 'reset_history', 'running', '{}', '{"sessions_total": 4, "sessions_deleted": 1}',
+                '2025-01-01', '2025-01-01')
+    ''')
+    conn.commit()
+    conn.close()
+
+    status = second.test_client().get('/api/study_sessions/reset/status').get_json()
+    assert (status['state'], status['job_id'], status['sessions_deleted']) == ('running', 7, 1)
+
+    for body in (None, {'background': True}):
+        response = first.test_client().post('/api/study_sessions/reset', json=body)
+        assert response.status_code == 409
+
+def test_stopped_reset_leaves_stats_matching_reviews(portal_app, history):
+    """Test that each committed chunk already fixed the stats of its words"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+
+    def stop(progress):
+        raise RuntimeError('stopped')
+
+    with pytest.raises(RuntimeError):
+        StudySessionService(conn).reset_history(batch_size=2, on_progress=stop)
+
+    # One chunk (two reviews) was deleted; the stats count the one left
+    remaining = conn.execute('''
+        SELECT COUNT(CASE WHEN correct = 1 THEN 1 END), COUNT(CASE WHEN correct = 0 THEN 1 END)
+        FROM word_review_items
+    ''').fetchone()
+    assert sum(remaining) == 1
+    assert conn.execute('SELECT correct_count, wrong_count FROM word_review_items_stats').fetchone() == remaining
+    conn.close()
+
+def test_cancelled_reset_is_reported_as_cancelled(client, history):
+    """Test that cancelling a reset job shows as cancelled, not failed, on the status endpoint"""
+    job = client.post('/api/jobs/reset_history', json={'batch_size': 1, 'pause_seconds': 0.2}).get_json()
+    # Stop it after its first chunk
+    while client.get('/api/study_sessions/reset/status').get_json()['review_items_deleted'] == 0:
+        time.sleep(0.01)
+
+    assert client.post(f'/api/jobs/{job["id"]}/cancel').status_code == 202
+    assert wait_for(client, job['id'])['state'] == 'cancelled'
+
+    status = client.get('/api/study_sessions/reset/status').get_json()
+    assert status['state'] == 'cancelled'
+    assert status['error'] is None
+    assert 0 < status['review_items_deleted'] < 3
+
+@pytest.mark.parametrize('params', [
+    {'group_id': 'all'},
+    {'study_activity_id': 1.5},
+    {'batch_size': 0},
+    {'batch_size': True},
+    {'pause_seconds': -1},
+])
+def test_invalid_reset_parameters_are_refused(portal_app, client, params):
+    """Test that reset jobs with unusable parameters are refused before they are queued"""
+    response = client.post('/api/jobs/reset_history', json=params)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert portal_app.jobs.latest('reset_history') is None
+
+def test_unknown_job_type(client):
+    """Test submitting a job type with no handler"""
+    assert client.post('/api/jobs/launch_rockets').status_code == 404
+    assert client.get('/api/jobs/999').status_code == 404
+    assert client.post('/api/jobs/999/cancel').status_code == 404
+
+def test_cancel_running_job(portal_app, client):
+    """Test that a running job stops at its next progress report"""
+    def slow_job(ctx):
+        while True:
+            ctx.report(0.5)
+            time.sleep(0.01)
+
+    portal_app.jobs.register('slow', slow_job)
+    job = client.post('/api/jobs/slow').get_json()
+    while client.get(f'/api/jobs/{job["id"]}').get_json()['state'] == 'queued':
+        time.sleep(0.01)
+
+    assert client.post(f'/api/jobs/{job["id"]}/cancel').status_code == 202
+    assert wait_for(client, job['id'])['state'] == 'cancelled'
+    assert client.post(f'/api/jobs/{job["id"]}/cancel').status_code == 409
+
+def test_failed_job_records_error(portal_app, client):
+    """Test that an exception in a handler marks the job failed"""
+    def broken_job(ctx):
+        raise RuntimeError('boom')
+
+    portal_app.jobs.register('broken', broken_job)
+    job = client.post('/api/jobs/broken').get_json()
+    job = wait_for(client, job['id'])
+    assert job['state'] == 'failed'
+    assert job['error'] == 'boom'
+
+def test_full_queue_rejects_without_persisting(portal_app, client):
+    """Test that a job refused for a full queue is not left queued"""
+    release = threading.Event()
+    portal_app.jobs.register('blocked', lambda ctx: release.wait(5))
+    portal_app.jobs.max_pending = 1
+    try:
+        first = client.post('/api/jobs/blocked').get_json()
+        response = client.post('/api/jobs/blocked')
+        assert response.status_code == 503
+    finally:
+        release.set()
+
+    assert wait_for(client, first['id'])['state'] == 'completed'
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    assert conn.execute("SELECT COUNT(*) FROM jobs WHERE type = 'blocked'").fetchone()[0] == 1
+    conn.close()
+
+def test_jobs_resume_after_restart(portal_app):
+    """Test that queued and abandoned running jobs are picked up on start"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO jobs (id, type, state, created_at) VALUES (1, 'echo', 'queued', '2025-01-01');
+        INSERT INTO jobs (id, type, state, created_at, started_at, heartbeat_at)
+        VALUES (2, 'echo', 'running', '2025-01-01', '2025-01-01', '2025-01-01');
+    ''')
+    conn.close()
+
+    runner = JobRunner(portal_app.config['DATABASE'])
+    runner.register('echo', lambda ctx: {'job': ctx.job_id})
+    assert runner.start() == [1, 2]
+    runner.shutdown()
+
+    assert runner.get(1)['result'] == {'job': 1}
+    assert runner.get(2)['state'] == 'completed'
+
+def test_maintenance_job_reclaims_free_pages(portal_app, client):
+    """Test that the maintenance job analyzes, vacuums and reports sizes"""
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    conn.executemany('INSERT INTO words (spanish, english) VALUES (?, ?)',
+                     ((f'palabra{i}', 'x' * 500) for i in range(2000)))
+    conn.commit()
+    conn.execute('DELETE FROM words WHERE id > 10')
+    conn.commit()
+    free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    assert free_pages > 100
+    conn.close()
+
+    response = client.post('/api/jobs/maintenance', json={'tasks': ['analyze', 'vacuum']})
+    job = wait_for(client, response.get_json()['id'])
+    assert job['state'] == 'completed'
+    assert set(job['result']) == {'analyze', 'vacuum', 'size'}
+    # ANALYZE may reuse a free page for its statistics first
+    assert job['result']['vacuum']['freed_pages'] >= free_pages - 2
+    assert job['result']['size']['freelist_count'] == 0
+
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE tbl = 'words'").fetchone()[0] > 0
+    conn.close()
+
+def test_scheduler_skips_recent_jobs(portal_app):
+    """Test that scheduled jobs are not repeated within their interval"""
+    submitted = portal_app.scheduler.run_pending()
+    assert [job['type'] for job in submitted] == ['maintenance', 'compact_changes']
+    assert portal_app.scheduler.run_pending() == []
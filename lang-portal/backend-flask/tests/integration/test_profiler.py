@@ -0,0 +1,93 @@
+import pstats
+import pytest
+import threading
+from flask import jsonify
+
+@pytest.fixture
+def portal_app(make_app, tmp_path):
+    """Create an app that profiles requests sent with the admin token, two per minute"""
+    return make_app({
+        'PROFILE_DIR': str(tmp_path / 'profiles'),
+        'PROFILE_MAX_PER_MINUTE': 2,
+        'ADMIN_TOKEN': 'secret'
+    })
+
+def test_profile_written_for_requests_with_header(client, tmp_path):
+    """Test that a profiled request leaves pstats and collapsed-stack files"""
+    assert 'X-Profile' not in client.get('/api/groups').headers
+    assert list((tmp_path / 'profiles').iterdir()) == []
+
+    response = client.get('/api/groups', headers={'X-Profile': 'secret'})
+    assert response.status_code == 200
+    name = response.headers['X-Profile']
+    assert name.endswith('_GET_api_groups')
+
+    stats = pstats.Stats(str(tmp_path / 'profiles' / f'{name}.prof'))
+    assert any(func[2] == 'get_groups' for func in stats.stats)
+
+    lines = (tmp_path / 'profiles' / f'{name}.collapsed').read_text().splitlines()
+    stack, micros = lines[0].rsplit(' ', 1)
+    assert int(micros) > 0
+    assert any('get_groups' in line and 'execute' in line for line in lines)
+
+def test_header_without_the_token_is_ignored(make_app, client, tmp_path):
+    """Test that X-Profile only works with the admin token, and not at all without one"""
+    for value in ('1', 'secre', 'secrets'):
+        assert 'X-Profile' not in client.get('/api/groups', headers={'X-Profile': value}).headers
+
+    untokened = make_app({'PROFILE_DIR': str(tmp_path / 'other')}).test_client()
+    assert 'X-Profile' not in untokened.get('/api/groups', headers={'X-Profile': '1'}).headers
+    assert list((tmp_path / 'profiles').iterdir()) == []
+    assert list((tmp_path / 'other').iterdir()) == []
+
+def test_profiles_are_rate_limited(client, tmp_path):
+    """Test that no more than the configured profiles are taken per minute"""
+    names = [client.get('/api/groups', headers={'X-Profile': 'secret'}).headers.get('X-Profile')
+             for _ in range(3)]
+    assert names[2] is None
+    assert len(list((tmp_path / 'profiles').glob('*.prof'))) == 2
+    assert client.get('/api/metrics').get_json()['profiler']['skipped'] == 1
+
+def test_overlapping_requests_are_profiled_one_at_a_time(portal_app, tmp_path):
+    """Test that a request arriving while another is profiled is served unprofiled"""
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return jsonify({'done': True})
+
+    portal_app.add_url_rule('/test/blocking', 'blocking', blocking)
+    responses = {}
+
+    def get(name, path):
+        responses[name] = portal_app.test_client().get(path, headers={'X-Profile': 'secret'})
+
+    first = threading.Thread(target=get, args=('first', '/test/blocking'))
+    first.start()
+    assert started.wait(5)
+    get('second', '/api/groups')
+    release.set()
+    first.join()
+
+    assert [responses[name].status_code for name in ('first', 'second')] == [200, 200]
+    assert 'X-Profile' in responses['first'].headers
+    assert 'X-Profile' not in responses['second'].headers
+    assert len(list((tmp_path / 'profiles').glob('*.prof'))) == 1
+
+    # The profiler is free again once the first request is done
+    assert 'X-Profile' in portal_app.test_client().get('/api/groups', headers={'X-Profile': 'secret'}).headers
+
+def test_other_active_profiler_is_skipped(client, monkeypatch):
+    """Test that enable() failing because another tool profiles is not a 500"""
+    class BusyProfile:
+        def enable(self):
+            raise ValueError('Another profiling tool is already active')
+
+    monkeypatch.setattr('lib.profiler.cProfile.Profile', BusyProfile)
+    response = client.get('/api/groups', headers={'X-Profile': 'secret'})
+    assert response.status_code == 200
+    assert 'X-Profile' not in response.headers
+
+    stats = client.get('/api/metrics').get_json()['profiler']
+    assert (stats['profiled'], stats['skipped']) == (0, 1)
@@ -0,0 +1,66 @@
+import pytest
+from flask import jsonify
+
+# Never finishes on its own
+ENDLESS_QUERY = '''
+    WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter)
+    SELECT COUNT(*) FROM counter
+'''
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app with a 50 ms default budget, none for groups, and an endless route"""
+    app = make_app({
+        'DB_POOL_SIZE': 1,
+        'QUERY_BUDGET_MS': 50,
+        'QUERY_BUDGETS': {'get_groups': None, 'endless_with_budget': 100},
+    })
+
+    def endless():
+        try:
+            cursor = app.db.cursor()
+            cursor.execute(ENDLESS_QUERY)
+            return jsonify(cursor.fetchone()[0])
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    app.add_url_rule('/test/endless', 'endless', endless)
+    app.add_url_rule('/test/endless-with-budget', 'endless_with_budget', endless)
+    return app
+
+def test_overrunning_query_returns_503(client):
+    """Test that a statement past its budget is interrupted and reported"""
+    response = client.get('/test/endless')
+    assert response.status_code == 503
+    data = response.get_json()
+    assert data['endpoint'] == 'endless'
+    assert data['budget_ms'] == 50
+    assert data['query'].startswith('WITH RECURSIVE counter(n)')
+
+def test_endpoint_budgets_override_the_default(portal_app, client):
+    """Test that per-endpoint budgets apply and are counted separately"""
+    assert client.get('/test/endless-with-budget').get_json()['budget_ms'] == 100
+    client.get('/test/endless')
+
+    stats = client.get('/api/metrics').get_json()['query_budgets']
+    assert stats['default_ms'] == 50
+    assert stats['aborted'] == {'endless': 1, 'endless_with_budget': 1}
+    assert stats['last_aborted']['endpoint'] == 'endless'
+
+def test_pooled_connection_is_released_from_the_budget(portal_app, client):
+    """Test that the next request on the pooled connection is not interrupted"""
+    client.get('/test/endless')
+    assert portal_app.db.pool.qsize() == 1
+
+    connection = portal_app.db.pool.queue[0]
+    # Without the request's progress handler this runs to completion
+    assert connection.execute('''
+        WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter WHERE n < 200000)
+        SELECT COUNT(*) FROM counter
+    ''').fetchone()[0] == 200000
+
+def test_fast_requests_are_unaffected(client):
+    """Test that requests within budget, or without one, answer normally"""
+    assert client.get('/api/groups').status_code == 200
+    assert client.get('/api/study-activities').status_code == 200
+    assert client.get('/dashboard/stats').status_code == 200
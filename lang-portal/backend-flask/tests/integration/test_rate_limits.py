@@ -0,0 +1,93 @@
+import pytest
+import sqlite3
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create an app allowing two reviews per session and one new session per client"""
+    return make_app({
+        'RATE_LIMITS': {'review_word': (0.01, 2), 'create_study_session': (0.01, 1)},
+    }, seed_sql='''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1);
+        INSERT INTO study_sessions (id, group_id, study_activity_id, created_at)
+        VALUES (1, 1, 1, '2025-01-01'), (2, 1, 1, '2025-01-01');
+    ''')
+
+def review(client, session_id, **kwargs):
+    return client.post(f'/api/study_sessions/{session_id}/words/1/review', json={'correct': True}, **kwargs)
+
+def test_writes_over_the_limit_get_429(portal_app, client):
+    """Test that a looping client is turned away before reaching the database"""
+    assert review(client, 1).status_code == 200
+    assert review(client, 1).status_code == 200
+
+    response = review(client, 1)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert response.get_json()['endpoint'] == 'review_word'
+
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    assert conn.execute('SELECT COUNT(*) FROM word_review_items').fetchone()[0] == 2
+    conn.close()
+
+def test_sessions_and_clients_are_limited_separately(client):
+    """Test that other sessions and other clients keep their own buckets"""
+    review(client, 1)
+    review(client, 1)
+    assert review(client, 1).status_code == 429
+
+    assert review(client, 2).status_code == 200
+    assert review(client, 1, headers={'X-Client-Id': 'other-tab'}).status_code == 200
+
+def test_listed_endpoints_and_reads(portal_app, client):
+    """Test that each listed endpoint has its own limit and reads are never limited"""
+    body = {'group_id': 1, 'study_activity_id': 1}
+    assert client.post('/api/study_sessions', json=body).status_code == 201
+    assert client.post('/api/study_sessions', json=body).status_code == 429
+
+    assert all(client.get('/api/groups').status_code == 200 for _ in range(5))
+    stats = client.get('/api/metrics').get_json()['rate_limits']
+    assert stats['limited'] == {'create_study_session': 1}
+
+def test_read_only_posts_are_not_limited(client):
+    """Test that bursts of batches and lookups by ids, not listed, pass"""
+    body = {'requests': [{'path': '/api/groups'}, {'path': '/dashboard/stats'}]}
+    assert all(client.post('/api/batch', json=body).status_code == 200 for _ in range(30))
+    assert all(client.post('/api/words', json={'ids': [1]}).status_code == 200 for _ in range(30))
+    assert client.get('/api/metrics').get_json()['rate_limits']['limited'] == {}
+
+def test_forwarded_clients_are_limited_separately(make_app):
+    """Test that behind a proxy each X-Forwarded-For address gets its own bucket"""
+    client = make_app({
+        'RATE_LIMITS': {'create_study_session': (0.01, 1)},
+        'PROXY_COUNT': 1,
+    }, seed_sql='''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+    ''').test_client()
+    body = {'group_id': 1, 'study_activity_id': 1}
+
+    def create(address):
+        return client.post('/api/study_sessions', json=body, headers={'X-Forwarded-For': address})
+
+    assert create('10.0.0.1').status_code == 201
+    assert create('10.0.0.1').status_code == 429
+    assert create('10.0.0.2').status_code == 201
+
+def test_rotating_client_ids_do_not_reset_the_bucket(make_app):
+    """Test that a new X-Client-Id per request is still limited by its address"""
+    client = make_app({
+        'RATE_LIMITS': {'create_study_session': (0.01, 1)},
+    }, seed_sql='''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+    ''').test_client()
+    body = {'group_id': 1, 'study_activity_id': 1}
+
+    statuses = [client.post('/api/study_sessions', json=body, headers={'X-Client-Id': f'tab-{i}'}).status_code
+                for i in range(20)]
+    # One session per client id, up to the address's share of eight clients
+    assert statuses.count(201) == 8
+    assert statuses[8:] == [429] * 12
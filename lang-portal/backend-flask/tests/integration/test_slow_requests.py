@@ -0,0 +1,92 @@
+import json
+import pytest
+
+ADMIN = {'Authorization': 'Bearer secret'}
+
+SEED_SQL = '''
+    INSERT INTO groups (id, name) VALUES (1, 'Animals');
+    INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog');
+    INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (2, 1);
+'''
+
+@pytest.fixture
+def portal_app(make_app, tmp_path):
+    """Create an app that samples every request, with an admin token"""
+    return make_app({
+        'SLOW_REQUEST_MS': 0,
+        'SLOW_REQUEST_MAX': 2,
+        'SLOW_REQUEST_LOG': str(tmp_path / 'slow.log'),
+        'ADMIN_TOKEN': 'secret'
+    }, seed_sql=SEED_SQL)
+
+def slow_requests(client, query=''):
+    return client.get(f'/api/admin/slow-requests{query}', headers=ADMIN).get_json()
+
+def test_slow_request_records_statements_and_plans(client):
+    """Test that a sampled request lists its SQL with timings, rows and plans"""
+    assert client.get('/api/groups/1/words?sort_by=spanish').status_code == 200
+
+    data = slow_requests(client)
+    assert data['sampled'] == 1
+    entry = data['requests'][0]
+    assert entry['path'] == '/api/groups/1/words'
+    assert entry['query_string'] == 'sort_by=spanish'
+    assert entry['status'] == 200
+    assert entry['statements_dropped'] == 0
+
+    words_query = next(s for s in entry['statements']
+                       if 'FROM words' in s['sql'] and 'LIMIT' in s['sql'])
+    assert words_query['rows'] == 2
+    assert words_query['duration_ms'] >= 0
+    # Parameters are user data and only kept when asked for
+    assert 'parameters' not in words_query
+    assert any('word_groups' in line for line in words_query['plan'])
+
+def test_slow_requests_ring_buffer_and_log(client, tmp_path):
+    """Test that only the newest entries are kept while the log keeps all"""
+    for path in ['/api/groups', '/api/groups/1', '/api/groups/1/words']:
+        client.get(path)
+
+    data = slow_requests(client)
+    assert [entry['path'] for entry in data['requests']] == ['/api/groups/1/words', '/api/groups/1']
+    assert data['sampled'] == 3
+    assert len(slow_requests(client, '?limit=1')['requests']) == 1
+
+    with open(tmp_path / 'slow.log') as file:
+        logged = [json.loads(line) for line in file]
+    assert [entry['path'] for entry in logged] == ['/api/groups', '/api/groups/1', '/api/groups/1/words']
+
+    assert client.post('/api/admin/slow-requests', headers=ADMIN).get_json()['kept'] == 0
+    assert slow_requests(client)['requests'] == []
+
+def test_fast_requests_are_not_sampled(make_app):
+    """Test that requests under the threshold are not kept"""
+    client = make_app({'SLOW_REQUEST_MS': 60_000}).test_client()
+    client.get('/api/groups')
+
+    assert client.get('/api/metrics').get_json()['slow_requests']['sampled'] == 0
+
+def test_parameters_are_kept_when_asked_for(make_app):
+    """Test that SLOW_REQUEST_PARAMETERS keeps bound parameters in entries"""
+    app = make_app({'SLOW_REQUEST_MS': 0, 'SLOW_REQUEST_PARAMETERS': True}, seed_sql=SEED_SQL)
+    app.test_client().get('/api/groups/1/words')
+
+    statements = app.slow_requests.entries()[0]['statements']
+    words_query = next(s for s in statements if 'FROM words' in s['sql'] and 'LIMIT' in s['sql'])
+    assert words_query['parameters'][0] == 1
+
+def test_admin_endpoint_needs_token(client, make_app):
+    """Test that the slow-request log is hidden without the configured token"""
+    client.get('/api/groups')
+    assert client.get('/api/admin/slow-requests').status_code == 403
+    response = client.post('/api/admin/slow-requests', headers={'Authorization': 'Bearer wrong'})
+    assert response.status_code == 403
+    assert slow_requests(client)['kept'] == 1
+
+    response = client.options('/api/admin/slow-requests', headers={
+        'Origin': 'http://localhost:5173', 'Access-Control-Request-Method': 'POST'})
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+    # Without ADMIN_TOKEN there is no admin endpoint
+    other = make_app({'SLOW_REQUEST_MS': 0}).test_client()
+    assert other.get('/api/admin/slow-requests', headers=ADMIN).status_code == 404
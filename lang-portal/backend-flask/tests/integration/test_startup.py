@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from werkzeug.test import Client
+from app import create_app
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+def test_importing_app_loads_no_routes():
+    """Test that importing the app module neither creates an app nor imports Flask"""
+    output = run_python('-c', '''
+import sys, app
+print(hasattr(app, 'app'), 'flask' in sys.modules, any(name.startswith('routes') for name in sys.modules))
+''')
+    assert output.stdout.split() == ['False', 'False', 'False']
+
+def test_migration_commands_do_not_import_flask():
+    """Test that migrating the database does not pay for importing Flask"""
+    output = run_python('-c', '''
+import sys
+sys.path.insert(0, '.')
+import db.init_db
+print('flask' in sys.modules)
+''')
+    assert output.stdout.strip() == 'False'
+
+def test_startup_within_budget():
+    """Test that import, create_app and the first request stay within the startup budget"""
+    # Exits non-zero, failing run_python, when the median is over budget
+    output = run_python('cmd/bench_startup.py', '--runs', '3', '--json')
+    timings = json.loads(output.stdout.strip().splitlines()[-1])
+    assert timings['status'] == 200
+    assert not timings['flask_on_import']
+
+def test_lazy_app_is_created_on_first_request(tmp_path):
+    """Test that a lazy app defers creating the app until it is used"""
+    lazy = create_app({'DATABASE': str(tmp_path / 'lazy.db')}, lazy=True)
+    assert lazy._app is None
+
+    response = Client(lazy).get('/health/live')
+    assert response.status_code == 200
+    assert lazy._app is not None
+    # Attributes are those of the created app
+    assert lazy.config['DATABASE'] == str(tmp_path / 'lazy.db')
+    lazy.jobs.shutdown()
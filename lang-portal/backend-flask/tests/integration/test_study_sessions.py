@@ -56,10 +56,17 @@ def app():
                 word_id INTEGER NOT NULL,
                 correct BOOLEAN NOT NULL,
                 created_at TEXT NOT NULL,
+                review_uuid TEXT,
                 FOREIGN KEY (study_session_id) REFERENCES study_sessions (id),
                 FOREIGN KEY (word_id) REFERENCES words (id)
             )
         ''')
+
+        cursor.execute('''
+            CREATE UNIQUE INDEX idx_word_review_items_review_uuid
+            ON word_review_items (review_uuid)
+            WHERE review_uuid IS NOT NULL
+        ''')
         
         cursor.execute('''
             CREATE TABLE word_reviews (
@@ -365,4 +372,70 @@ def test_review_word_integration_nonexistent_word(client, app, test_data):
     
     assert response.status_code == 404
     data = response.get_json()
-    assert data['error'] == "Study session or word not found" 
\ No newline at end of file
+    assert data['error'] == "Study session or word not found"
+
+
+def _create_reviewed_session(client, group_id, activity_id, word_id, reviews=3):
+    """Create a session through the API and review a word several times"""
+    response = client.post('/api/study_sessions', json={
+        'group_id': group_id,
+        'study_activity_id': activity_id
+    })
+    session_id = response.get_json()['id']
+    for i in range(reviews):
+        client.post(
+            f'/api/study_sessions/{session_id}/words/{word_id}/review',
+            json={'correct': i % 2 == 0}
+        )
+    return session_id
+
+def test_reset_study_sessions_invalid_scope(client, app, test_data):
+    """Test reset with an invalid scope"""
+    response = client.post('/api/study_sessions/reset', json={'group_id': 'all'})
+    assert response.status_code == 400
+
+def test_study_sessions_sparse_fields(client, app, test_data):
+    """Test that fields= limits session and session word payloads"""
+    session_id = _create_reviewed_session(client, test_data['group_id'], test_data['activity_id'],
+                                          test_data['word_id'])
+
+    response = client.get('/api/study_sessions?fields=id,review_items_count')
+    assert response.status_code == 200
+    assert response.get_json()['items'] == [{'id': session_id, 'review_items_count': 3}]
+
+    response = client.get(f'/api/study_sessions/{session_id}?fields=spanish,correct_count')
+    assert response.get_json()['words'] == [{'spanish': 'hola', 'correct_count': 2}]
+
+    assert client.get('/api/study_sessions?fields=id,kanji').status_code == 400
+
+def test_review_word_replay_with_review_uuid(client, app, test_data):
+    """Test that resubmitting a review_uuid returns the first review without recounting"""
+    session_id = _create_reviewed_session(client, test_data['group_id'], test_data['activity_id'],
+                                          test_data['word_id'], reviews=0)
+    url = f"/api/study_sessions/{session_id}/words/{test_data['word_id']}/review"
+    review_uuid = '6F9619FF-8B86-D011-B42D-00C04FC964FF'
+
+    first = client.post(url, json={'correct': True, 'review_uuid': review_uuid})
+    assert first.status_code == 200
+    assert first.get_json()['replayed'] is False
+    assert first.get_json()['review_uuid'] == review_uuid.lower()
+
+    replay = client.post(url, json={'correct': True, 'review_uuid': review_uuid.lower()})
+    assert replay.status_code == 200
+    assert replay.get_json()['replayed'] is True
+    assert replay.get_json()['id'] == first.get_json()['id']
+    assert replay.get_json()['created_at'] == first.get_json()['created_at']
+
+    cursor = app.db.cursor()
+    cursor.execute('SELECT COUNT(*) FROM word_review_items')
+    assert cursor.fetchone()[0] == 1
+    cursor.execute('SELECT correct_count FROM word_review_items_stats WHERE word_id = ?',
+                   (test_data['word_id'],))
+    assert cursor.fetchone()[0] == 1
+
+    # The same id for a different answer is a client bug, not a replay
+    conflict = client.post(url, json={'correct': False, 'review_uuid': review_uuid})
+    assert conflict.status_code == 409
+
+    assert client.post(url, json={'correct': True, 'review_uuid': 'abc'}).status_code == 400
+    assert client.post(url, json={'correct': True, 'review_uuid': 12}).status_code == 400
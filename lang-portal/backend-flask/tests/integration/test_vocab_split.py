@@ -0,0 +1,151 @@
+import pytest
+import shutil
+import sqlite3
+from pathlib import Path
+from db.init_db import init_db, split_vocab
+from lib.vocab import VOCAB_READ_ONLY_ERROR
+
+MIGRATIONS_PATH = Path(__file__).parent.parent.parent / 'db' / 'migrations'
+
+@pytest.fixture
+def split_paths(migrated_db_path, tmp_path):
+    """A migrated database with one reviewed word, split into history and vocabulary files"""
+    conn = sqlite3.connect(migrated_db_path)
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals');
+        INSERT INTO study_activities (id, name, launch_url, preview_url) VALUES (1, 'Quiz', 'u', 'p');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (2, 1);
+        UPDATE word_review_items_stats SET correct_count = 1, wrong_count = 2 WHERE word_id = 1;
+    ''')
+    conn.close()
+    vocab_path = tmp_path / 'vocab.db'
+    split_vocab(migrated_db_path, vocab_path)
+    return migrated_db_path, vocab_path
+
+@pytest.fixture
+def portal_app(make_app, split_paths):
+    """Create an app serving the split layout"""
+    db_path, vocab_path = split_paths
+    return make_app({'VOCAB_DATABASE': str(vocab_path)})
+
+def table_names(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'table'")}
+    finally:
+        conn.close()
+
+def test_split_moves_vocabulary_tables(split_paths):
+    """Test that each file keeps only its own tables"""
+    db_path, vocab_path = split_paths
+
+    history = table_names(db_path)
+    assert 'words' not in history and 'groups' not in history
+    assert {'word_review_items_stats', 'study_sessions', 'changes', 'migrations'} <= history
+
+    vocab = table_names(vocab_path)
+    assert {'words', 'groups', 'word_groups', 'study_activities'} <= vocab
+    assert 'word_review_items_stats' not in vocab
+
+    conn = sqlite3.connect(vocab_path)
+    # Only the triggers that stay within the vocabulary tables are kept
+    triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'trigger'")}
+    assert triggers == {'groups_words_count_insert', 'groups_words_count_delete', 'groups_words_count_move'}
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    conn.close()
+
+def test_split_refuses_to_run_twice(split_paths, tmp_path):
+    """Test that an already split database or an existing target is rejected"""
+    db_path, vocab_path = split_paths
+    with pytest.raises(FileExistsError):
+        split_vocab(db_path, vocab_path)
+    with pytest.raises(ValueError):
+        split_vocab(db_path, tmp_path / 'other.db')
+
+def test_reads_join_both_databases(client):
+    """Test that vocabulary and stats from the two files are joined as before"""
+    response = client.get('/words')
+    assert response.status_code == 200
+    words = {word['spanish']: word for word in response.get_json()['words']}
+    assert words['perro']['correct_count'] == 0
+    assert words['gato']['correct_count'] == 1
+    assert words['gato']['wrong_count'] == 2
+
+    hardest = client.get('/api/words/hardest?n=1').get_json()
+    assert [word['spanish'] for word in hardest['words']] == ['gato']
+
+def test_reviews_are_written_to_history(portal_app, client):
+    """Test that reviews update stats in the writable database"""
+    session = client.post('/api/study_sessions', json={'group_id': 1, 'study_activity_id': 1})
+    assert session.status_code == 201
+    session_id = session.get_json()['id']
+
+    response = client.post(f'/api/study_sessions/{session_id}/words/2/review', json={'correct': True})
+    assert response.status_code == 200
+
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    row = conn.execute('SELECT correct_count FROM word_review_items_stats WHERE word_id = 2').fetchone()
+    assert row[0] == 1
+    conn.close()
+
+def test_vocabulary_is_read_only(portal_app, client):
+    """Test that vocabulary writes are refused with 409 and leave the file alone"""
+    response = client.post('/api/groups/1/words:bulk', json=[{'spanish': 'pez', 'english': 'fish'}])
+    assert response.status_code == 409
+    assert response.get_json()['error'] == VOCAB_READ_ONLY_ERROR
+
+    response = client.post('/api/study-activities', json={'name': 'Quiz 2', 'launch_url': 'u', 'preview_url': 'p'})
+    assert response.status_code == 409
+
+    conn = sqlite3.connect(portal_app.config['VOCAB_DATABASE'])
+    assert conn.execute('SELECT COUNT(*) FROM words').fetchone()[0] == 2
+    conn.close()
+
+def test_job_connections_attach_vocabulary_like_requests(make_app, split_paths):
+    """Test that background jobs get the configured mmap size and immutable flag"""
+    db_path, vocab_path = split_paths
+    app = make_app({
+        'VOCAB_DATABASE': str(vocab_path),
+        'VOCAB_MMAP_SIZE': 1024 * 1024,
+        'VOCAB_IMMUTABLE': True,
+    })
+    assert app.jobs.vocab_immutable is True
+
+    conn = app.jobs.connect()
+    assert conn.execute('PRAGMA vocab.mmap_size').fetchone()[0] == 1024 * 1024
+    assert conn.execute('SELECT COUNT(*) FROM words').fetchone()[0] == 2
+    conn.close()
+
+def test_migrations_run_against_both_databases(split_paths, tmp_path):
+    """Test that later migrations reach vocabulary tables and keep stats and counts in step"""
+    db_path, vocab_path = split_paths
+    migrations_path = tmp_path / 'migrations'
+    shutil.copytree(MIGRATIONS_PATH, migrations_path)
+    (migrations_path / '9999_words_notes.sql').write_text('''
+        ALTER TABLE words ADD COLUMN notes TEXT;
+        CREATE INDEX IF NOT EXISTS idx_words_notes ON words (notes);
+        INSERT INTO words (spanish, english) VALUES ('pez', 'fish');
+        INSERT INTO word_groups (word_id, group_id) SELECT id, 1 FROM words WHERE spanish = 'pez';
+        CREATE TRIGGER IF NOT EXISTS changes_words_notes AFTER UPDATE OF notes ON words
+        BEGIN
+            INSERT INTO changes (table_name, row_id, related_id, op) VALUES ('words', NEW.id, NULL, 'update');
+        END;
+    ''')
+
+    init_db(db_path=db_path, migrations_path=migrations_path, vocab_path=vocab_path)
+
+    vocab = sqlite3.connect(vocab_path)
+    assert vocab.execute("SELECT COUNT(*) FROM sqlite_schema WHERE name = 'idx_words_notes'").fetchone()[0] == 1
+    word_id = vocab.execute("SELECT id FROM words WHERE spanish = 'pez'").fetchone()[0]
+    assert vocab.execute('SELECT words_count FROM groups WHERE id = 1').fetchone()[0] == 3
+    # A trigger writing to history cannot work from the vocabulary database
+    assert vocab.execute("SELECT COUNT(*) FROM sqlite_schema WHERE name = 'changes_words_notes'").fetchone()[0] == 0
+    vocab.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM migrations WHERE filename = '9999_words_notes.sql'").fetchone()[0] == 1
+    # The new word got the stats row a trigger would have given it
+    assert conn.execute('SELECT COUNT(*) FROM word_review_items_stats WHERE word_id = ?',
+                        (word_id,)).fetchone()[0] == 1
+    conn.close()
@@ -0,0 +1,41 @@
+import pytest
+import sqlite3
+from lib.warmup import warmup
+
+@pytest.fixture
+def portal_app(make_app):
+    """Create a production-style app on a migrated temporary database"""
+    return make_app({
+        'DB_POOL_SIZE': 2,
+        'WARMUP': True,
+    })
+
+def test_not_ready_before_warmup(client):
+    """Test that readiness is only reported once warm"""
+    assert client.get('/health/live').status_code == 200
+    response = client.get('/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'warming'
+
+def test_warmup_fills_pool_and_reports_ready(portal_app, client):
+    """Test that warmup primes one connection per pool slot and flips readiness"""
+    warmup(portal_app)
+
+    assert portal_app.db.pool.qsize() == 2
+    assert client.get('/health/ready').status_code == 200
+
+    # Database was switched to WAL for concurrent workers
+    conn = sqlite3.connect(portal_app.config['DATABASE'])
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+def test_pooled_connections_are_reused(portal_app, client):
+    """Test that requests borrow pooled connections and give them back"""
+    warmup(portal_app)
+    pooled = set(map(id, list(portal_app.db.pool.queue)))
+
+    assert client.get('/api/study-activities').status_code == 200
+    assert set(map(id, list(portal_app.db.pool.queue))) == pooled
+
+def test_default_app_is_ready(make_app):
+    """Test that the development app needs no warmup"""
+    assert make_app().test_client().get('/health/ready').status_code == 200
@@ -0,0 +1,256 @@
+import pytest
+from flask import Flask
+import sqlite3
+from services.word_service import MAX_BULK_IDS
+
+@pytest.fixture
+def app():
+    """Create test app with real database connection"""
+    app = Flask(__name__)
+
+    # Use an in-memory SQLite database for testing
+    app.db = sqlite3.connect(':memory:', check_same_thread=False)
+    app.db.row_factory = sqlite3.Row
+
+    with app.app_context():
+        cursor = app.db.cursor()
+
+        cursor.execute('''
+            CREATE TABLE groups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spanish TEXT NOT NULL,
+                english TEXT NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE word_groups (
+                word_id INTEGER NOT NULL,
+                group_id INTEGER NOT NULL,
+                UNIQUE(word_id, group_id)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE word_review_items_stats (
+                word_id INTEGER PRIMARY KEY,
+                correct_count INTEGER DEFAULT 0,
+                wrong_count INTEGER DEFAULT 0,
+                last_reviewed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        app.db.commit()
+
+    from routes.words import load
+    load(app)
+
+    return app
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def test_data(app):
+    """Insert two groups, three words and stats for one word"""
+    cursor = app.db.cursor()
+    cursor.execute("INSERT INTO groups (name) VALUES ('Animals')")
+    animals_id = cursor.lastrowid
+    cursor.execute("INSERT INTO groups (name) VALUES ('Pets')")
+    pets_id = cursor.lastrowid
+
+    word_ids = {}
+    for spanish, english in [('perro', 'dog'), ('gato', 'cat'), ('vaca', 'cow')]:
+        cursor.execute('INSERT INTO words (spanish, english) VALUES (?, ?)', (spanish, english))
+        word_ids[spanish] = cursor.lastrowid
+        cursor.execute('INSERT INTO word_groups (word_id, group_id) VALUES (?, ?)',
+                       (word_ids[spanish], animals_id))
+
+    cursor.execute('INSERT INTO word_groups (word_id, group_id) VALUES (?, ?)',
+                   (word_ids['perro'], pets_id))
+    cursor.execute('''
+        INSERT INTO word_review_items_stats (word_id, correct_count, wrong_count)
+        VALUES (?, 3, 1)
+    ''', (word_ids['perro'],))
+    app.db.commit()
+
+    return {'words': word_ids, 'animals_id': animals_id, 'pets_id': pets_id}
+
+def test_get_words_by_ids_integration(client, test_data):
+    """Test fetching several words with stats and groups in one request"""
+    ids = [test_data['words']['vaca'], test_data['words']['perro']]
+    response = client.get(f'/api/words?ids={ids[0]},{ids[1]}')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    # Words come back in the requested order
+    assert [w['id'] for w in data['words']] == ids
+    assert data['missing_ids'] == []
+
+    perro = data['words'][1]
+    assert perro['spanish'] == 'perro'
+    assert perro['correct_count'] == 3
+    assert perro['wrong_count'] == 1
+    assert {g['name'] for g in perro['groups']} == {'Animals', 'Pets'}
+
+    vaca = data['words'][0]
+    assert vaca['correct_count'] == 0
+    assert vaca['wrong_count'] == 0
+    assert [g['name'] for g in vaca['groups']] == ['Animals']
+
+def test_get_words_by_ids_post_body(client, test_data):
+    """Test fetching words with ids sent in a JSON body"""
+    ids = list(test_data['words'].values())
+    response = client.post('/api/words', json={'ids': ids + [9999]})
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert [w['id'] for w in data['words']] == ids
+    assert data['missing_ids'] == [9999]
+
+def test_get_words_by_ids_deduplicates(client, test_data):
+    """Test that repeated ids are returned once"""
+    word_id = test_data['words']['gato']
+    response = client.get(f'/api/words?ids={word_id},{word_id}')
+    assert response.status_code == 200
+    assert len(response.get_json()['words']) == 1
+
+def test_get_words_by_ids_invalid_input(client, test_data):
+    """Test validation of the ids parameter"""
+    response = client.get('/api/words')
+    assert response.status_code == 400
+
+    response = client.get('/api/words?ids=1,abc')
+    assert response.status_code == 400
+
+    response = client.post('/api/words', json={'ids': [1, -2]})
+    assert response.status_code == 400
+
+    response = client.post('/api/words', json={'ids': 'not-a-list'})
+    assert response.status_code == 400
+
+    too_many = list(range(1, MAX_BULK_IDS + 2))
+    response = client.post('/api/words', json={'ids': too_many})
+    assert response.status_code == 400
+
+@pytest.fixture
+def listing_client(make_app):
+    """Client for an app on a migrated database with five reviewed words"""
+    return make_app(seed_sql='''
+        INSERT INTO words (id, spanish, english) VALUES
+            (1, 'gato', 'cat'), (2, 'Perro', 'dog'), (3, 'vaca', 'cow'),
+            (4, 'pato', 'duck'), (5, 'oso', 'bear');
+        UPDATE word_review_items_stats SET correct_count = 3, wrong_count = 1,
+            last_reviewed = '2025-01-03' WHERE word_id = 1;
+        UPDATE word_review_items_stats SET correct_count = 1, wrong_count = 3,
+            last_reviewed = '2025-01-01' WHERE word_id = 2;
+        UPDATE word_review_items_stats SET correct_count = 3, wrong_count = 0,
+            last_reviewed = '2025-01-02' WHERE word_id = 4;
+    ''').test_client()
+
+def collect_pages(client, query):
+    """Follow next_cursor through every page; return the word ids in order"""
+    ids = []
+    url = f'/words?{query}'
+    while url:
+        data = client.get(url).get_json()
+        ids += [word['id'] for word in data['words']]
+        url = f"/words?{query}&cursor={data['next_cursor']}" if data['next_cursor'] else None
+    return ids
+
+@pytest.mark.parametrize('query, expected', [
+    ('sort_by=spanish', [1, 5, 4, 2, 3]),
+    ('sort_by=spanish&order=desc', [3, 2, 4, 5, 1]),
+    ('sort_by=english', [5, 1, 3, 2, 4]),
+    ('sort_by=correct_count&order=desc', [4, 1, 2, 5, 3]),
+    ('sort_by=wrong_count', [3, 4, 5, 1, 2]),
+    ('sort_by=success_ratio&order=desc', [4, 1, 2, 5, 3]),
+    ('sort_by=last_reviewed&order=desc', [1, 4, 2, 5, 3]),
+])
+def test_list_words_keyset_pagination(listing_client, query, expected):
+    """Test that every sort walks all words once, in order, two per page"""
+    assert collect_pages(listing_client, f'{query}&per_page=2') == expected
+
+def test_list_words_fields_and_pages(listing_client):
+    """Test the word list payload and page-number access"""
+    data = listing_client.get('/words?sort_by=success_ratio&order=desc&per_page=2&page=2').get_json()
+    assert data['total_words'] == 5
+    assert data['total_pages'] == 3
+    assert data['current_page'] == 2
+    assert data['words'][0] == {
+        'id': 2, 'spanish': 'Perro', 'english': 'dog', 'correct_count': 1, 'wrong_count': 3,
+        'success_ratio': 0.25, 'last_reviewed': '2025-01-01'
+    }
+    # Words never reviewed have no ratio
+    assert data['words'][1]['success_ratio'] is None
+
+def test_list_words_counts_only_without_cursor(listing_client):
+    """Test that cursor pages skip the word count the first page carries"""
+    first = listing_client.get('/words?per_page=2').get_json()
+    assert (first['total_words'], first['total_pages']) == (5, 3)
+
+    data = listing_client.get(f"/words?per_page=2&cursor={first['next_cursor']}").get_json()
+    assert (data['total_words'], data['total_pages']) == (None, None)
+    assert len(data['words']) == 2
+
+def test_list_words_invalid_params(listing_client):
+    """Test validation of sorting and paging parameters"""
+    assert listing_client.get('/words?sort_by=kanji').status_code == 400
+    assert listing_client.get('/words?order=up').status_code == 400
+    assert listing_client.get('/words?per_page=0').status_code == 400
+    assert listing_client.get('/words?cursor=not-a-cursor').status_code == 400
+
+def test_get_word(listing_client):
+    """Test fetching a single word with stats and groups"""
+    data = listing_client.get('/words/1').get_json()
+    assert data['word']['spanish'] == 'gato'
+    assert data['word']['correct_count'] == 3
+    assert data['word']['groups'] == []
+    assert listing_client.get('/words/99').status_code == 404
+
+def test_list_words_sparse_fields(listing_client):
+    """Test that fields= limits the word list and keeps cursors working"""
+    data = listing_client.get('/words?fields=spanish&per_page=2').get_json()
+    assert data['words'] == [{'spanish': 'gato'}, {'spanish': 'oso'}]
+    data = listing_client.get(f"/words?fields=spanish&per_page=2&cursor={data['next_cursor']}").get_json()
+    assert data['words'] == [{'spanish': 'pato'}, {'spanish': 'Perro'}]
+
+    data = listing_client.get('/words?sort_by=correct_count&order=desc&fields=id,correct_count&per_page=1').get_json()
+    assert data['words'] == [{'id': 4, 'correct_count': 3}]
+    assert listing_client.get('/words?fields=').status_code == 400
+
+def test_hardest_words(listing_client):
+    """Test ranking reviewed words by smoothed error rate"""
+    data = listing_client.get('/api/words/hardest?n=2').get_json()
+    # Perro: (3 + 1) / (4 + 2); gato: (1 + 1) / (4 + 2); pato: (0 + 1) / (3 + 2)
+    assert [word['id'] for word in data['words']] == [2, 1]
+    assert data['words'][0]['difficulty'] == pytest.approx(4 / 6)
+
+    # Words never reviewed are not ranked
+    data = listing_client.get('/api/words/hardest?n=100').get_json()
+    assert [word['id'] for word in data['words']] == [2, 1, 4]
+    assert listing_client.get('/api/words/hardest?n=0').status_code == 400
+
+@pytest.mark.parametrize('sort_group_size', [2000, 0])
+def test_group_hardest_words(listing_client, monkeypatch, sort_group_size):
+    """Test that both group ranking strategies return the group's hardest words"""
+    monkeypatch.setattr('services.word_service.HARDEST_SORT_GROUP_SIZE', sort_group_size)
+    conn = sqlite3.connect(listing_client.application.config['DATABASE'])
+    conn.executescript('''
+        INSERT INTO groups (id, name, words_count) VALUES (1, 'Farm', 3);
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (3, 1), (4, 1);
+    ''')
+    conn.close()
+
+    data = listing_client.get('/api/groups/1/words/hardest?n=5').get_json()
+    assert [word['id'] for word in data['words']] == [1, 4]
+    assert listing_client.get('/api/groups/99/words/hardest').status_code == 404
@@ -2,25 +2,15 @@ import pytest
 import sqlite3
 from pathlib import Path
 from db.init_db import init_db, main as init_and_seed
-import os
-
-@pytest.fixture(autouse=True)
-def cleanup():
-    """Remove test database before and after each test"""
-    db_path = Path(__file__).parent.parent / 'words.db'
-    if db_path.exists():
-        os.remove(db_path)
-    yield
-    if db_path.exists():
-        os.remove(db_path)
-
-def test_database_initialization():
+from lib.db import Db
+
+def test_database_initialization(tmp_path):
     """Test that database is created and migrations run successfully"""
     # Run initialization
-    init_db()
+    db_path = tmp_path / 'words.db'
+    init_db(db_path=db_path)
     
     # Connect to database
-    db_path = Path(__file__).parent.parent / 'words.db'
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
@@ -40,13 +30,13 @@ def test_database_initialization():
     
     assert expected_tables.issubset(tables), "Not all expected tables were created"
 
-def test_seeding():
+def test_seeding(tmp_path):
     """Test that seed data is properly loaded"""
     # Run full initialization and seeding
-    init_and_seed()
+    db_path = tmp_path / 'words.db'
+    init_and_seed(db_path=db_path)
     
     # Connect to database
-    db_path = Path(__file__).parent.parent / 'words.db'
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
@@ -87,13 +77,9 @@ def test_seeding():
     }
     assert expected_activities == activities, "Not all study activities were created"
 
-def test_word_group_relationships():
+def test_word_group_relationships(seeded_db_path):
     """Test that words are properly associated with groups"""
-    # Initialize and seed database first
-    init_and_seed()
-    
-    db_path = Path(__file__).parent.parent / 'words.db'
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(seeded_db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -111,4 +97,168 @@ def test_word_group_relationships():
     assert words['rojo'] == 'Colors'
     assert words['uno'] == 'Numbers'
     assert words['pan'] == 'Food'
-    assert words['madre'] == 'Family' 
\ No newline at end of file
+    assert words['madre'] == 'Family'
+
+
+@pytest.fixture
+def backfill_migrations(tmp_path):
+    """Create a migrations folder with a table and a batched backfill"""
+    migrations_path = tmp_path / 'migrations'
+    migrations_path.mkdir()
+    (migrations_path / '0001_items.sql').write_text('''
+        CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, value INTEGER NOT NULL);
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 25)
+        INSERT INTO items (value) SELECT i FROM n;
+    ''')
+    (migrations_path / '0002_items_doubled.py').write_text(
+        "TABLE = 'items'\n"
+        "BATCH_SIZE = 10\n"
+        "SETUP_SQL = 'ALTER TABLE items ADD COLUMN doubled INTEGER'\n"
+        "BACKFILL_SQL = 'UPDATE items SET doubled = value * 2 WHERE id >= ? AND id < ?'\n"
+    )
+    return migrations_path
+
+def test_batched_backfill_migration(tmp_path, backfill_migrations, capsys):
+    """Test that backfill migrations run in chunks and record completion"""
+    db_path = tmp_path / 'test.db'
+    init_db(db_path=db_path, migrations_path=backfill_migrations)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    assert conn.execute('SELECT COUNT(*) FROM items WHERE doubled = value * 2').fetchone()[0] == 25
+
+    migration = conn.execute(
+        "SELECT completed, progress_id FROM migrations WHERE filename = '0002_items_doubled.py'"
+    ).fetchone()
+    assert migration['completed'] == 1
+    assert migration['progress_id'] == 30
+
+    # Three chunks of 10 ids, each reporting throughput
+    output = capsys.readouterr().out
+    assert output.count('rows/s') == 3
+
+    # Running again skips the completed backfill
+    init_db(db_path=db_path, migrations_path=backfill_migrations)
+    assert 'Skipping migration 0002_items_doubled.py' in capsys.readouterr().out
+
+def test_batched_backfill_migration_resumes(tmp_path, backfill_migrations):
+    """Test that an interrupted backfill resumes after the last committed chunk"""
+    db_path = tmp_path / 'test.db'
+    sql_only = tmp_path / 'sql_only'
+    sql_only.mkdir()
+    (sql_only / '0001_items.sql').write_text((backfill_migrations / '0001_items.sql').read_text())
+    init_db(db_path=db_path, migrations_path=sql_only)
+
+    # Simulate a backfill interrupted after its first chunk
+    conn = sqlite3.connect(db_path)
+    conn.execute('ALTER TABLE items ADD COLUMN doubled INTEGER')
+    conn.execute('UPDATE items SET doubled = -1 WHERE id < 11')
+    conn.execute('''
+        INSERT INTO migrations (filename, completed, progress_id)
+        VALUES ('0002_items_doubled.py', 0, 10)
+    ''')
+    conn.commit()
+    conn.close()
+
+    init_db(db_path=db_path, migrations_path=backfill_migrations)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM items WHERE doubled = -1').fetchone()[0] == 10
+    assert conn.execute('SELECT COUNT(*) FROM items WHERE doubled = value * 2').fetchone()[0] == 15
+    assert conn.execute(
+        "SELECT completed FROM migrations WHERE filename = '0002_items_doubled.py'"
+    ).fetchone()[0] == 1
+
+def test_snapshot_and_restore(tmp_path):
+    """Test checkpointing a database and rolling back to it"""
+    db_path = tmp_path / 'words.db'
+    init_db(db_path=db_path)
+    db = Db(database=str(db_path))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO words (spanish, english) VALUES ('gato', 'cat')")
+    conn.commit()
+
+    snapshot = db.snapshot(tmp_path / 'checkpoint.db')
+    assert not (tmp_path / 'checkpoint.db.tmp').exists()
+
+    conn.execute("DELETE FROM words")
+    conn.commit()
+
+    db.restore(snapshot)
+    # The open connection sees the restored contents
+    assert conn.execute('SELECT spanish FROM words').fetchall() == [('gato',)]
+    conn.close()
+
+def test_memory_template_clone(tmp_path):
+    """Test building a database once in memory and cloning it to files"""
+    template = Db.memory('test_template')
+    init_db(db_path=template.database)
+    template.keepalive.execute("INSERT INTO groups (name) VALUES ('Animals')")
+    template.keepalive.commit()
+
+    first = template.snapshot(tmp_path / 'first.db')
+    second = template.snapshot(tmp_path / 'second.db')
+
+    # Clones are independent of each other and of the template
+    sqlite3.connect(first).execute('DELETE FROM groups').connection.commit()
+    assert sqlite3.connect(second).execute('SELECT name FROM groups').fetchall() == [('Animals',)]
+    assert template.keepalive.execute('SELECT COUNT(*) FROM migrations').fetchone()[0] > 0
+    template.keepalive.close()
+
+def test_word_stats_backfill(tmp_path):
+    """Test that existing words get stats rows and new words get them on insert"""
+    db_path = tmp_path / 'words.db'
+    migrations_path = Path(__file__).parent.parent / 'db' / 'migrations'
+    before = tmp_path / 'before'
+    before.mkdir()
+    for migration in migrations_path.iterdir():
+        if migration.name < '0007':
+            (before / migration.name).write_text(migration.read_text())
+    init_db(db_path=db_path, migrations_path=before)
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog');
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (1, 1, 1, '2025-01-01'), (1, 1, 0, '2025-01-02');
+    ''')
+    conn.close()
+
+    init_db(db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('''
+        SELECT word_id, correct_count, wrong_count, last_reviewed, success_ratio
+        FROM word_review_items_stats ORDER BY word_id
+    ''').fetchall() == [(1, 1, 1, '2025-01-02', 0.5), (2, 0, 0, None, None)]
+
+    conn.execute("INSERT INTO words (id, spanish, english) VALUES (3, 'vaca', 'cow')")
+    assert conn.execute('SELECT correct_count FROM word_review_items_stats WHERE word_id = 3').fetchone() == (0,)
+    conn.execute('DELETE FROM words WHERE id = 3')
+    assert conn.execute('SELECT COUNT(*) FROM word_review_items_stats WHERE word_id = 3').fetchone() == (0,)
+
+def test_words_count_follows_memberships(migrated_db_path):
+    """Test that every write to word_groups keeps groups.words_count in step"""
+    conn = sqlite3.connect(migrated_db_path)
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals'), (2, 'Pets');
+        INSERT INTO words (id, spanish, english) VALUES (1, 'gato', 'cat'), (2, 'perro', 'dog'), (3, 'vaca', 'cow');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (2, 1), (3, 1);
+        INSERT OR IGNORE INTO word_groups (word_id, group_id) VALUES (1, 1);
+        DELETE FROM word_groups WHERE word_id = 3;
+        UPDATE word_groups SET group_id = 2 WHERE word_id = 2;
+    ''')
+    counts = 'SELECT id, words_count FROM groups ORDER BY id'
+    assert conn.execute(counts).fetchall() == [(1, 1), (2, 1)]
+
+    # A count left uncounted is taken from word_groups on the next write
+    conn.execute('UPDATE groups SET words_count = NULL WHERE id = 1')
+    conn.execute('INSERT INTO word_groups (word_id, group_id) VALUES (3, 1)')
+    assert conn.execute(counts).fetchall() == [(1, 2), (2, 1)]
+
+    # Count updates are not logged as group changes; renames still are
+    assert conn.execute("SELECT COUNT(*) FROM changes WHERE table_name = 'groups' AND op = 'update'").fetchone() == (0,)
+    conn.execute("UPDATE groups SET name = 'Wild animals' WHERE id = 1")
+    assert conn.execute("SELECT COUNT(*) FROM changes WHERE table_name = 'groups' AND op = 'update'").fetchone() == (1,)
+    conn.close()
@@ -0,0 +1,106 @@
+import pytest
+import sqlite3
+from lib.analytics import ReviewAnalytics
+
+@pytest.fixture
+def db():
+    """Create in-memory test database with a small review history"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE word_review_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            study_session_id INTEGER NOT NULL,
+            word_id INTEGER NOT NULL,
+            correct BOOLEAN NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+
+    # Word 1: 5 reviews, 4 correct (mastered); word 2: 5 reviews, 3 correct;
+    # word 3: 2 correct reviews in session 3 (group 20)
+    reviews = [
+        (1, 1, 1, '2025-01-01'), (1, 1, 1, '2025-01-01'), (1, 1, 0, '2025-01-02'),
+        (2, 1, 1, '2025-01-03'), (2, 1, 1, '2025-01-03'),
+        (1, 2, 0, '2025-01-01'), (1, 2, 1, '2025-01-02'), (2, 2, 1, '2025-01-03'),
+        (2, 2, 0, '2025-01-03'), (2, 2, 1, '2025-01-03'),
+        (3, 3, 1, '2025-01-05'), (3, 3, 1, '2025-01-06'),
+    ]
+    cursor.executemany('''
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (?, ?, ?, ?)
+    ''', reviews)
+    conn.commit()
+    return conn
+
+@pytest.fixture
+def analytics(db):
+    """Create an engine loaded from the test database"""
+    analytics = ReviewAnalytics(capacity=4)
+    analytics.refresh(db)
+    return analytics
+
+def test_refresh_loads_columns(analytics):
+    """Test that reviews are loaded into compact typed arrays"""
+    assert analytics.size == 12
+    assert analytics.word_id.dtype.name == 'int32'
+    assert analytics.correct.dtype.name == 'bool'
+    assert list(analytics.word_id[:3]) == [1, 1, 1]
+    assert analytics.day[0] == 20089  # 2025-01-01 in days since epoch
+
+def test_summary(analytics):
+    """Test words studied, mastered words and success rate"""
+    summary = analytics.summary()
+    assert summary['total_words_studied'] == 3
+    assert summary['mastered_words'] == 1
+    assert summary['success_rate'] == pytest.approx(9 / 12)
+
+def test_summary_ignores_reviews_without_session(analytics):
+    """Test restricting statistics to existing sessions"""
+    summary = analytics.summary(session_ids=[1, 2])
+    assert summary['total_words_studied'] == 2
+    assert summary['success_rate'] == pytest.approx(7 / 10)
+
+def test_refresh_is_incremental(db, analytics):
+    """Test that only new reviews are appended on refresh"""
+    db.execute('''
+        INSERT INTO word_review_items (study_session_id, word_id, correct, created_at)
+        VALUES (3, 4, 0, '2025-01-07')
+    ''')
+    db.commit()
+
+    analytics.refresh(db)
+    assert analytics.size == 13
+    assert analytics.summary()['total_words_studied'] == 4
+    assert analytics.session_bounds == (1, 3)
+
+def test_refresh_reloads_after_history_is_emptied(db, analytics):
+    """Test that a reset that empties the table is picked up"""
+    db.execute('DELETE FROM word_review_items')
+    db.commit()
+
+    analytics.refresh(db)
+    assert analytics.size == 0
+    assert analytics.session_bounds is None
+    assert analytics.summary()['success_rate'] == 0
+
+def test_current_streak(analytics):
+    """Test streak of consecutive review days"""
+    # Days 1, 2, 3 then 5, 6: the last run is two days long
+    assert analytics.current_streak() == 2
+    assert analytics.current_streak(today=20089 + 30) == 0
+
+def test_daily_reviews(analytics):
+    """Test per-day counts and running totals"""
+    days, counts, cumulative = analytics.daily_reviews()
+    assert list(days - 20089) == [0, 1, 2, 4, 5]
+    assert list(counts) == [3, 2, 5, 1, 1]
+    assert list(cumulative) == [3, 5, 10, 11, 12]
+
+def test_group_progress(analytics):
+    """Test per-group progress from a session to group mapping"""
+    progress = analytics.group_progress({1: 10, 2: 10, 3: 20})
+    assert progress[10] == {'reviews': 10, 'words_studied': 2, 'success_rate': 0.7}
+    assert progress[20] == {'reviews': 2, 'words_studied': 1, 'success_rate': 1.0}
@@ -0,0 +1,85 @@
+import json
+import sqlite3
+import pytest
+from lib.events import EventBroker, ChangeLogTail, TooManySubscribersError, format_sse
+
+def test_publish_fans_out_to_every_subscriber():
+    """Test that each subscriber receives its own copy of an event"""
+    broker = EventBroker()
+    first = broker.subscribe()
+    second = broker.subscribe()
+
+    assert broker.publish('review', {'word_id': 1}) == 2
+
+    assert first.get(timeout=0) == (1, 'review', {'word_id': 1})
+    assert second.get(timeout=0) == (1, 'review', {'word_id': 1})
+    assert first.get(timeout=0) is None
+
+def test_unsubscribed_clients_stop_receiving():
+    """Test that publish skips clients that disconnected"""
+    broker = EventBroker()
+    subscription = broker.subscribe()
+    broker.unsubscribe(subscription)
+
+    assert not broker.has_subscribers
+    assert broker.publish('stats', {}) == 0
+    assert subscription.get(timeout=0) is None
+
+def test_slow_subscriber_gets_resync():
+    """Test that a full buffer is replaced by a resync event"""
+    broker = EventBroker(max_queue=2)
+    slow = broker.subscribe()
+
+    for i in range(3):
+        broker.publish('review', {'n': i})
+
+    assert slow.get(timeout=0) == (3, 'resync', {'dropped': 2})
+    assert slow.get(timeout=0) is None
+
+    # Later events are delivered normally again
+    broker.publish('review', {'n': 3})
+    assert slow.get(timeout=0) == (4, 'review', {'n': 3})
+
+def test_max_subscribers():
+    """Test that subscribing beyond the limit is refused"""
+    broker = EventBroker(max_subscribers=1)
+    broker.subscribe()
+    with pytest.raises(TooManySubscribersError):
+        broker.subscribe()
+
+def test_format_sse():
+    """Test the wire format of an event"""
+    message = format_sse({'a': 1}, event='stats', event_id=7)
+    assert message == 'id: 7\nevent: stats\ndata: {"a": 1}\n\n'
+    assert json.loads(message.split('data: ')[1]) == {'a': 1}
+
+class RecordingSource:
+    def start(self, connection):
+        pass
+
+    def events(self, connection, changes):
+        return [('change', {'seq': change[0], 'table': change[1]}) for change in changes]
+
+def test_change_log_tail_publishes_new_changes(tmp_path):
+    """Test that the tail starts at the end of the log and reads in batches"""
+    path = tmp_path / 'changes.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE changes (seq INTEGER PRIMARY KEY, table_name TEXT, row_id INTEGER, related_id INTEGER, op TEXT)')
+    conn.execute("INSERT INTO changes (table_name, row_id, op) VALUES ('words', 1, 'insert')")
+    conn.commit()
+
+    broker = EventBroker()
+    subscription = broker.subscribe()
+    tail = ChangeLogTail(broker, lambda: sqlite3.connect(path), RecordingSource(), poll_interval=60, batch_size=2)
+    tail.start()
+    tail.stop()
+    assert tail.seq == 1
+
+    conn.executemany("INSERT INTO changes (table_name, row_id, op) VALUES (?, 1, 'update')",
+                     [('words',), ('groups',), ('words',)])
+    conn.commit()
+    assert tail.poll(conn) == 3
+    assert [subscription.get(timeout=0)[2] for _ in range(3)] == [
+        {'seq': 2, 'table': 'words'}, {'seq': 3, 'table': 'groups'}, {'seq': 4, 'table': 'words'}]
+    assert tail.poll(conn) == 0
+    conn.close()
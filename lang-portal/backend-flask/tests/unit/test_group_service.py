@@ -132,4 +132,54 @@ def test_get_group_words_sorting(service, test_data):
     
     assert result is not None
     words = [w['spanish'] for w in result.items]
-    assert words == sorted(words) 
\ No newline at end of file
+    assert words == sorted(words)
+
+
+def test_sample_group_words_uniform(service, test_data):
+    """Test sampling distinct words from a group"""
+    words = service.sample_group_words(test_data['group_id'], n=2)
+
+    assert len(words) == 2
+    assert len({w['id'] for w in words}) == 2
+    assert all({'id', 'spanish', 'english'} <= set(w) for w in words)
+
+def test_sample_group_words_larger_than_group(service, test_data):
+    """Test that sampling more words than the group has returns all of them"""
+    words = service.sample_group_words(test_data['group_id'], n=10)
+    assert {w['spanish'] for w in words} == {'hola', 'adios', 'gracias'}
+
+def test_sample_group_words_weak_prefers_missed_words(service, db, test_data):
+    """Test that weak weighting favours words with a high error rate"""
+    import random
+
+    cursor = db.cursor()
+    cursor.execute('''
+        CREATE TABLE word_review_items_stats (
+            word_id INTEGER PRIMARY KEY,
+            correct_count INTEGER DEFAULT 0,
+            wrong_count INTEGER DEFAULT 0
+        )
+    ''')
+    cursor.execute("SELECT id, spanish FROM words")
+    ids = {row['spanish']: row['id'] for row in cursor.fetchall()}
+    cursor.executemany(
+        'INSERT INTO word_review_items_stats (word_id, correct_count, wrong_count) VALUES (?, ?, ?)',
+        [(ids['hola'], 0, 50), (ids['adios'], 50, 0), (ids['gracias'], 50, 0)]
+    )
+    db.commit()
+
+    rng = random.Random(42)
+    picks = [service.sample_group_words(test_data['group_id'], n=1, weight='weak', rng=rng)[0]['spanish']
+             for _ in range(200)]
+    assert picks.count('hola') > 150
+
+def test_sample_group_words_invalid_params(service, test_data):
+    """Test sampling with invalid parameters"""
+    with pytest.raises(ValueError):
+        service.sample_group_words(test_data['group_id'], n=0)
+    with pytest.raises(ValueError):
+        service.sample_group_words(test_data['group_id'], n=2, weight='heavy')
+
+def test_sample_group_words_nonexistent_group(service):
+    """Test sampling from non-existent group"""
+    assert service.sample_group_words(999, n=2) is None
@@ -0,0 +1,75 @@
+import threading
+from lib.ratelimit import RateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_burst_then_refill():
+    """Test that a bucket allows its burst, then one request per refilled token"""
+    clock = FakeClock()
+    limiter = RateLimiter(limits={'review': (2, 3)}, clock=clock)
+
+    assert [limiter.acquire('review', 'a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire('review', 'a') == 0.5
+
+    clock.now = 0.5
+    assert limiter.acquire('review', 'a') == 0
+    assert limiter.acquire('review', 'a') == 0.5
+
+def test_buckets_are_per_endpoint_and_client():
+    """Test that one client's or endpoint's bucket does not drain another's"""
+    limiter = RateLimiter(limits={'review': (1, 1), 'other': (1, 1)}, clock=FakeClock())
+
+    assert limiter.acquire('review', 'a') == 0
+    assert limiter.acquire('review', 'a') > 0
+    assert limiter.acquire('review', 'b') == 0
+    assert limiter.acquire('other', 'a') == 0
+    assert limiter.stats()['limited'] == {'review': 1}
+
+def test_unlimited_endpoints():
+    """Test that endpoints set to None or not listed are never limited"""
+    limiter = RateLimiter(limits={'review': (1, 1), 'bulk': None}, clock=FakeClock())
+    assert all(limiter.acquire('bulk', 'a') == 0 for _ in range(10))
+    assert all(limiter.acquire('batch', 'a') == 0 for _ in range(10))
+    assert all(RateLimiter().acquire('review', 'a') == 0 for _ in range(10))
+
+def test_address_bucket_caps_its_clients():
+    """Test that new client keys from one address share the address's bucket"""
+    limiter = RateLimiter(limits={'review': (1, 2)}, clients_per_address=3, clock=FakeClock())
+
+    granted = [limiter.acquire('review', ('10.0.0.1', f'tab-{i}', None), address='10.0.0.1') == 0
+               for i in range(10)]
+    assert granted.count(True) == 6
+    # Refused requests created no bucket: six clients plus the address
+    assert limiter.stats()['buckets'] == 7
+    assert limiter.acquire('review', ('10.0.0.2', 'tab-0', None), address='10.0.0.2') == 0
+
+def test_least_recently_used_buckets_are_dropped():
+    """Test that the bucket count stays bounded"""
+    limiter = RateLimiter(limits={'review': (1, 1)}, max_buckets=2, clock=FakeClock())
+    for client in ('a', 'b', 'c'):
+        limiter.acquire('review', client)
+    assert limiter.stats()['buckets'] == 2
+    # 'a' was dropped, so it starts again with a full bucket
+    assert limiter.acquire('review', 'a') == 0
+
+def test_concurrent_clients_share_one_bucket():
+    """Test that threads never take more tokens than the bucket holds"""
+    limiter = RateLimiter(limits={'review': (0.001, 50)}, clock=FakeClock())
+    granted = []
+
+    def take():
+        for _ in range(20):
+            if limiter.acquire('review', 'a') == 0:
+                granted.append(1)
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(granted) == 50
@@ -0,0 +1,103 @@
+import threading
+from lib.singleflight import SingleFlight
+
+def run_concurrently(flight, count, name, args, fn):
+    """Start count callers; return their results once all have finished"""
+    results = [None] * count
+
+    def call(index):
+        results[index] = flight.do(name, args, fn)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+def wait_for_callers(flight, name, count):
+    """Wait until count callers have entered the flight"""
+    for _ in range(1000):
+        if flight.stats().get(name, {}).get('calls') == count:
+            return
+        threading.Event().wait(0.001)
+    raise AssertionError("callers did not arrive")
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers arriving during a call get its result"""
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return {'value': 42}
+
+    threads, results = run_concurrently(flight, 5, 'stats', (), compute)
+    wait_for_callers(flight, 'stats', 5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert results == [{'value': 42}] * 5
+    assert flight.stats()['stats'] == {
+        'calls': 5, 'executions': 1, 'coalesced': 4, 'errors': 0, 'in_flight': 0
+    }
+
+def test_sequential_calls_are_not_cached():
+    """Test that a finished call is not reused"""
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do('n', (), lambda: next(counter)) == 0
+    assert flight.do('n', (), lambda: next(counter)) == 1
+
+def test_different_args_or_versions_run_separately():
+    """Test that args and the data version are part of the key"""
+    version = [1]
+    flight = SingleFlight(version=lambda: version[0])
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return version[0]
+
+    first, _ = run_concurrently(flight, 1, 'words', (1,), compute)
+    wait_for_callers(flight, 'words', 1)
+    other, _ = run_concurrently(flight, 1, 'words', (2,), compute)
+    wait_for_callers(flight, 'words', 2)
+    version[0] = 2
+    newer, _ = run_concurrently(flight, 1, 'words', (1,), compute)
+    wait_for_callers(flight, 'words', 3)
+    release.set()
+    for thread in first + other + newer:
+        thread.join()
+
+    assert flight.stats()['words']['executions'] == 3
+    assert flight.stats()['words']['coalesced'] == 0
+
+def test_errors_are_shared():
+    """Test that every waiting caller sees the leader's exception"""
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def compute():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do('failing', (), compute)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_for_callers(flight, 'failing', 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ['boom'] * 3
+    assert flight.stats()['failing']['errors'] == 1
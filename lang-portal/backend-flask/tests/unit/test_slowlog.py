@@ -0,0 +1,31 @@
+import sqlite3
+from lib.slowlog import SqlTrace, TracingCursor, query_plan
+
+def test_tracing_cursor_counts_rows_and_caps_statements():
+    """Test that statements are timed with their fetched or changed rows"""
+    conn = sqlite3.connect(':memory:')
+    trace = SqlTrace(max_statements=3)
+    cursor = conn.cursor(lambda c: TracingCursor(c, trace))
+
+    cursor.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    cursor.executemany('INSERT INTO t (name) VALUES (?)', ((str(i),) for i in range(5)))
+    cursor.execute('SELECT * FROM t WHERE id > ?', (1,))
+    assert len(cursor.fetchmany(2)) == 2
+    assert len(list(cursor)) == 2
+    cursor.execute('SELECT 1')
+
+    assert [s['rows'] for s in trace.statements] == [0, 5, 4]
+    assert trace.statements[1]['parameters'] == ('0',)
+    assert trace.dropped == 1
+
+def test_query_plan_is_indented_by_depth():
+    """Test that plans render as a tree and bad statements don't raise"""
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    cursor = conn.cursor()
+
+    plan = query_plan(cursor, 'SELECT * FROM t WHERE id IN (SELECT id FROM t WHERE name = ?)', ('a',))
+    assert plan[0].startswith('SEARCH t')
+    assert any(line.startswith('  ') for line in plan)
+    assert query_plan(cursor, 'PRAGMA user_version', ()) == []
+    assert query_plan(cursor, 'SELECT * FROM missing', ())[0].startswith('(no plan')
@@ -0,0 +1,58 @@
+"""Production WSGI entry point.
+
+Run with a prefork server so each worker opens its own SQLite connections
+after fork and warms up before it accepts traffic:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from app import create_app
+from lib.warmup import warmup
+
+app = create_app({
+    'DATABASE': os.environ.get('DATABASE', 'words.db'),
+    # Set to serve the vocabulary from a separate read-only file (see Readme)
+    'VOCAB_DATABASE': os.environ.get('VOCAB_DATABASE'),
+    'VOCAB_IMMUTABLE': os.environ.get('VOCAB_IMMUTABLE') == '1',
+    # One pooled connection per worker thread
+    'DB_POOL_SIZE': int(os.environ.get('GUNICORN_THREADS', 4)),
+    # Each /api/events stream holds a worker thread until it closes; keep
+    # half of them for other requests (0 turns the stream away with 503)
+    'EVENTS_MAX_CLIENTS': int(os.environ.get('EVENTS_MAX_CLIENTS',
+                                             int(os.environ.get('GUNICORN_THREADS', 4)) // 2)),
+    'WARMUP': True,
+    # 'numpy' keeps review history in memory for faster dashboard stats
+    'ANALYTICS_ENGINE': os.environ.get('ANALYTICS_ENGINE', 'sql'),
+    # Set to profile requests sent with an X-Profile header (see Readme)
+    'PROFILE_DIR': os.environ.get('PROFILE_DIR'),
+    'PROFILE_SAMPLE_RATE': float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    'MAINTENANCE_INTERVAL': int(os.environ.get('MAINTENANCE_INTERVAL', 6 * 3600)),
+    # Bearer token for /api/admin/ endpoints; unset, they answer 404
+    'ADMIN_TOKEN': os.environ.get('ADMIN_TOKEN'),
+    # Statements running longer are interrupted with a 503 (0 turns it off);
+    # bulk imports legitimately take longer
+    'QUERY_BUDGET_MS': int(os.environ.get('QUERY_BUDGET_MS', 2000)) or None,
+    'QUERY_BUDGETS': {'bulk_add_group_words': None},
+    # (requests per second, burst) per client; only these endpoints are limited
+    'RATE_LIMITS': {
+        'review_word': (5, 20),
+        'create_study_session': (0.2, 5),
+        'bulk_add_group_words': (0.1, 2),
+        'reset_study_sessions': (2, 10),
+        'create_study_activity': (2, 10),
+        'create_job': (2, 10),
+        'cancel_job': (2, 10),
+    },
+    # Reverse proxies in front of gunicorn, so limits apply per real client
+    'PROXY_COUNT': int(os.environ.get('PROXY_COUNT', 0)),
+})
+
+if os.environ.get('SKIP_WARMUP') != '1':
+    warmup(app)
+else:
+    app.ready = True
+
+# Resume background jobs left over from before the restart
+app.jobs.start()
+# Run database maintenance and change log compaction on their intervals
+app.scheduler.start()
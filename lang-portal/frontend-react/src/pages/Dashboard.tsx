@@ -1,7 +1,13 @@
 import { useState, useEffect } from 'react'
 import { Link } from 'react-router-dom'
 import { BookOpen, Trophy, Clock, ArrowRight, Activity } from 'lucide-react'
-import { fetchRecentStudySession, fetchStudyStats, type StudyStats, type RecentSession } from '@/services/api'
+import {
+  fetchDashboard,
+  subscribeToDashboardEvents,
+  type StudyStats,
+  type RecentSession,
+  type StatsDelta
+} from '@/services/api'
 
 interface DashboardCardProps {
   title: string
@@ -30,10 +36,7 @@ export default function Dashboard() {
   useEffect(() => {
     const loadDashboardData = async () => {
       try {
-        const [sessionData, statsData] = await Promise.all([
-          fetchRecentStudySession(),
-          fetchStudyStats()
-        ])
+        const { recentSession: sessionData, stats: statsData } = await fetchDashboard()
         setRecentSession(sessionData)
         setStats(statsData)
       } catch (error) {
@@ -44,6 +47,32 @@ export default function Dashboard() {
     }
 
     loadDashboardData()
+
+    // Apply live updates while an activity runs elsewhere
+    const unsubscribe = subscribeToDashboardEvents({
+      onSession: (session) => setRecentSession(session),
+      onReview: (review) => setRecentSession(current =>
+        current && current.id === review.study_session_id
+          ? { ...current, correct_count: review.session_correct_count, wrong_count: review.session_wrong_count }
+          : current
+      ),
+      onStats: (delta: StatsDelta) => setStats(current => {
+        if (!current) return current
+        const totalReviews = current.total_reviews + (delta.total_reviews ?? 0)
+        const correctReviews = current.success_rate * current.total_reviews + (delta.correct_reviews ?? 0)
+        return {
+          ...current,
+          total_words_studied: current.total_words_studied + (delta.total_words_studied ?? 0),
+          mastered_words: current.mastered_words + (delta.mastered_words ?? 0),
+          total_sessions: current.total_sessions + (delta.total_sessions ?? 0),
+          total_reviews: totalReviews,
+          success_rate: totalReviews ? correctReviews / totalReviews : 0
+        }
+      }),
+      onResync: loadDashboardData
+    })
+
+    return unsubscribe
   }, [])
 
   return (
@@ -1,5 +1,8 @@
 const API_BASE_URL = 'http://localhost:5001';
 
+// Sent with writes so rate limits apply per tab, not per shared address
+const CLIENT_ID = crypto.randomUUID();
+
 // Group types
 export interface Group {
   id: number;
@@ -72,6 +75,7 @@ export interface StudyStats {
   total_words_studied: number;
   mastered_words: number;
   success_rate: number;
+  total_reviews: number;
   total_sessions: number;
   active_groups: number;
   current_streak: number;
@@ -162,6 +166,7 @@ export async function createStudySession(groupId: number, activityId: number) {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      'X-Client-Id': CLIENT_ID,
     },
     body: JSON.stringify({
       group_id: groupId,
@@ -184,6 +189,7 @@ export const submitStudySessionReview = async (
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      'X-Client-Id': CLIENT_ID,
     },
     body: JSON.stringify({ reviews }),
   });
@@ -252,3 +258,73 @@ export const fetchStudyStats = async (): Promise<StudyStats> => {
   }
   return response.json();
 };
+
+// Batched GETs: one round trip, all read from the same database snapshot
+export interface BatchResponse {
+  path: string;
+  status: number;
+  body: any;
+}
+
+export const fetchBatch = async (paths: string[]): Promise<BatchResponse[]> => {
+  const response = await fetch(`${API_BASE_URL}/api/batch`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ requests: paths.map(path => ({ path })) }),
+  });
+  if (!response.ok) {
+    throw new Error('Failed to fetch batch');
+  }
+  const data = await response.json();
+  return data.responses;
+};
+
+export const fetchDashboard = async (): Promise<{ recentSession: RecentSession | null; stats: StudyStats }> => {
+  const [recentSession, stats] = await fetchBatch(['/dashboard/recent-session', '/dashboard/stats']);
+  if (recentSession.status !== 200 || stats.status !== 200) {
+    throw new Error('Failed to fetch dashboard');
+  }
+  return { recentSession: recentSession.body, stats: stats.body };
+};
+
+// Live dashboard updates (Server-Sent Events)
+export interface ReviewEvent {
+  id: number;
+  study_session_id: number;
+  word_id: number;
+  correct: boolean;
+  created_at: string;
+  session_correct_count: number;
+  session_wrong_count: number;
+}
+
+export interface StatsDelta {
+  total_words_studied?: number;
+  mastered_words?: number;
+  total_reviews?: number;
+  correct_reviews?: number;
+  total_sessions?: number;
+}
+
+export interface DashboardEventHandlers {
+  onSession: (session: RecentSession) => void;
+  onReview: (review: ReviewEvent) => void;
+  onStats: (delta: StatsDelta) => void;
+  // Updates were missed (slow connection or reconnect): refetch everything
+  onResync: () => void;
+}
+
+export const subscribeToDashboardEvents = (handlers: DashboardEventHandlers): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/api/events`);
+  let connected = false;
+  source.addEventListener('session', (e) => handlers.onSession(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener('review', (e) => handlers.onReview(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener('stats', (e) => handlers.onStats(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener('resync', () => handlers.onResync());
+  source.onopen = () => {
+    // Events published while disconnected are lost
+    if (connected) handlers.onResync();
+    connected = true;
+  };
+  return () => source.close();
+};
@@ -12,6 +12,7 @@ from PIL import Image
 import io
 import hashlib
 import time
+import uuid
 from pathlib import Path
 import traceback
 
@@ -127,17 +128,39 @@ def fetch_words(api_url: str = API_URL) -> list:
         st.error("Failed to fetch words from the server. Please try again later.")
         return None
 
-def submit_review_result(word_id: int, is_correct: bool):
-    """Submit review result back to the API"""
-    try:
-        url = f"{API_URL}/api/study_sessions/{st.session_state.session_id}/words/{word_id}/review"
-        logger.info(f"Submitting review - Word ID: {word_id}, Correct: {is_correct}")
-        response = requests.post(url, json={"correct": is_correct})
-        response.raise_for_status()
-        logger.info("Review submitted successfully")
-    except requests.RequestException as e:
-        logger.error(f"Error submitting review: {str(e)}")
-        st.warning("Failed to save your answer, but you can continue with the quiz.")
+def submit_review_result(word_id: int, is_correct: bool, attempts: int = 3):
+    """Submit review result back to the API, retrying network and server errors
+    and rate limiting (429, after its Retry-After).
+
+    The answer carries its own review_uuid, so a retry of a submission that
+    did reach the API is recognised as a replay instead of counted twice.
+    """
+    url = f"{API_URL}/api/study_sessions/{st.session_state.session_id}/words/{word_id}/review"
+    payload = {"correct": is_correct, "review_uuid": str(uuid.uuid4())}
+    logger.info(f"Submitting review - Word ID: {word_id}, Correct: {is_correct}")
+    for attempt in range(attempts):
+        delay = 0.5 * 2 ** attempt
+        try:
+            response = requests.post(url, json=payload, timeout=5)
+            if response.status_code == 429:
+                # Rate limited: wait as long as the API asks, up to 5s
+                delay = min(float(response.headers.get('Retry-After', delay)), 5)
+                logger.warning(f"Review submission rate limited, retrying in {delay}s")
+            elif response.status_code < 500:
+                response.raise_for_status()
+                logger.info("Review submitted successfully")
+                return
+            else:
+                logger.warning(f"Review submission failed with status {response.status_code}")
+        except requests.HTTPError as e:
+            # Client errors won't succeed on retry
+            logger.error(f"Error submitting review: {str(e)}")
+            break
+        except requests.RequestException as e:
+            logger.warning(f"Error submitting review (attempt {attempt + 1}): {str(e)}")
+        if attempt + 1 < attempts:
+            time.sleep(delay)
+    st.warning("Failed to save your answer, but you can continue with the quiz.")
 
 def initialize_quiz():
     """Initialize a new quiz session"""
@@ -151,30 +174,25 @@ def initialize_quiz():
             st.info("Example URL: http://localhost:8085/?group_id=1&session_id=123")
             return False
         
-        # Fetch words for the group
-        url = f"{API_URL}/api/groups/{group_id}/words"
+        # Let the API sample the 4 quiz words, favouring words often missed
+        url = f"{API_URL}/api/groups/{group_id}/words/sample"
         logger.info(f"Fetching words from: {url}")
         
-        response = requests.get(url)
+        response = requests.get(url, params={"n": 4, "weight": "weak"})
         response.raise_for_status()
         data = response.json()
         
-        # Extract words from paginated response
-        words = data.get('words', [])
+        quiz_words = data.get('words', [])
         
-        logger.info(f"Received {len(words)} words")
+        logger.info(f"Received {len(quiz_words)} words")
         
-        if not words:
+        if not quiz_words:
             st.error("No words available for this group")
             return False
             
-        # Always try to get 4 questions
-        num_questions = min(4, len(words))
+        num_questions = len(quiz_words)
         logger.info(f"Will create {num_questions} questions")
         
-        quiz_words = random.sample(words, num_questions)
-        logger.info(f"Selected {len(quiz_words)} words")
-        
         # Generate/get images for each word
         quiz_images = []
         with st.spinner('Generating images...'):
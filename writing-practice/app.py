@@ -11,6 +11,8 @@ import boto3
 from botocore.config import Config
 from dotenv import load_dotenv
 import traceback
+import time
+import uuid
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -62,10 +64,10 @@ def fetch_word_collection(api_url: str = API_URL) -> List[Dict]:
         return []
     
     try:
-        url = f"{api_url}/api/groups/{group_id}/words"
+        url = f"{api_url}/api/groups/{group_id}/words/sample"
         logger.info(f"Fetching words from: {url}")
         
-        response = requests.get(url)
+        response = requests.get(url, params={"n": 10, "weight": "weak"})
         response.raise_for_status()
         data = response.json()
         
@@ -213,31 +215,54 @@ def grade_image(image, expected_sentence: str):
             "feedback": f"Error processing image: {str(e)}"
         }
 
-def submit_review_result(word_id: int, is_correct: bool):
-    """Submit review result back to the API"""
-    try:
-        # Log session and word IDs
-        logger.info(f"Attempting to submit review - Session ID: {st.session_state.session_id}, Word ID: {word_id}")
-        
-        url = f"{API_URL}/api/study_sessions/{st.session_state.session_id}/words/{word_id}/review"
-        data = {
-            "correct": is_correct
-        }
-        
-        logger.info(f"Submitting review to {url} with data: {data}")
-        response = requests.post(url, json=data)
-        
-        if response.status_code == 404:
-            logger.error("404 Error - Session or word not found")
-            logger.error(f"Response content: {response.text}")
-        
-        response.raise_for_status()
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
-        
-    except requests.RequestException as e:
-        logger.error(f"Error submitting review: {str(e)}")
-        logger.error(f"Response content: {e.response.text if hasattr(e, 'response') else 'No response'}")
+def submit_review_result(word_id: int, is_correct: bool, attempts: int = 3):
+    """Submit review result back to the API, retrying network and server errors
+    and rate limiting (429, after its Retry-After).
+
+    The answer carries its own review_uuid, so a retry of a submission that
+    did reach the API is recognised as a replay instead of counted twice.
+    """
+    # Log session and word IDs
+    logger.info(f"Attempting to submit review - Session ID: {st.session_state.session_id}, Word ID: {word_id}")
+
+    url = f"{API_URL}/api/study_sessions/{st.session_state.session_id}/words/{word_id}/review"
+    data = {
+        "correct": is_correct,
+        "review_uuid": str(uuid.uuid4())
+    }
+
+    logger.info(f"Submitting review to {url} with data: {data}")
+    for attempt in range(attempts):
+        delay = 0.5 * 2 ** attempt
+        try:
+            response = requests.post(url, json=data, timeout=5)
+
+            if response.status_code == 404:
+                logger.error("404 Error - Session or word not found")
+                logger.error(f"Response content: {response.text}")
+
+            if response.status_code == 429:
+                # Rate limited: wait as long as the API asks, up to 5s
+                delay = min(float(response.headers.get('Retry-After', delay)), 5)
+                logger.warning(f"Review submission rate limited, retrying in {delay}s")
+            elif response.status_code < 500:
+                response.raise_for_status()
+                logger.info(f"Response status: {response.status_code}")
+                logger.info(f"Response body: {response.text}")
+                return
+            else:
+                logger.warning(f"Review submission failed with status {response.status_code}")
+
+        except requests.HTTPError as e:
+            # Client errors won't succeed on retry
+            logger.error(f"Error submitting review: {str(e)}")
+            logger.error(f"Response content: {e.response.text if e.response is not None else 'No response'}")
+            return
+        except requests.RequestException as e:
+            logger.error(f"Error submitting review (attempt {attempt + 1}): {str(e)}")
+
+        if attempt + 1 < attempts:
+            time.sleep(delay)
 
 # Initialize the app
 st.title("Spanish Writing Practice")